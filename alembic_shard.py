@@ -0,0 +1,185 @@
+"""
+    Export alembic of long shot in parallel, frame range is split into shards and each shard
+    is exported by its own mayapy process from the saved scene.
+
+    Shards are merged into one archive with abcstitcher when it is found (ABCSTITCHER environment
+    variable or PATH), otherwise they are kept next to the output with a json list of the shards.
+
+    mayapy alembic_shard.py D:/shots/sh010.ma --root "|char_grp" --output D:/cache/sh010_char.abc
+                            --range 1001 1400 --shards 8 --preroll 20
+"""
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+try:
+    from shutil import which as find_executable
+except ImportError:
+    from distutils.spawn import find_executable
+
+
+def split_frame_range(start_frame, end_frame, shards, overlap=0):
+    """
+        Split frame range into continuous chunks
+
+        :param
+            start_frame(int): First frame
+            end_frame(int): Last frame
+            shards(int): Number of chunks
+            overlap(int): Extra frames written after the end of each chunk, last chunk is not extended
+
+        :return
+            (list): Start and end frame of each chunk
+    """
+    frame_count = int(end_frame - start_frame) + 1
+    shards = max(1, min(shards, frame_count))
+    size, remainder = divmod(frame_count, shards)
+
+    chunks = list()
+    chunk_start = start_frame
+    for index in range(shards):
+        chunk_end = chunk_start + size - 1 + (1 if index < remainder else 0)
+        chunks.append((chunk_start, min(chunk_end + overlap, end_frame)))
+        chunk_start = chunk_end + 1
+    return chunks
+
+
+def get_shard_path(output, index):
+    """
+        Get file path of shard
+
+        :param
+            output(str): Final alembic path
+            index(int): Number of shard
+
+        :return
+            (str): Shard alembic path
+    """
+    base, extension = os.path.splitext(output)
+    return "{0}.shard{1:03d}{2}".format(base, index, extension)
+
+
+def get_stitcher():
+    """
+        Find abcstitcher executable
+
+        :return
+            (str): Executable path, None when it is not found
+    """
+    return os.environ.get("ABCSTITCHER") or find_executable("abcstitcher")
+
+
+def export_sharded(scene, root, output, start_frame, end_frame, shards, overlap=0, preroll=0, merge=True,
+                   mayapy=None):
+    """
+        Export alembic by frame chunks in parallel mayapy process
+
+        :param
+            scene(str): Saved maya scene
+            root(str): Name of root object
+            output(str): Final alembic path
+            start_frame(int): First frame
+            end_frame(int): Last frame
+            shards(int): Number of parallel process
+            overlap(int): Extra frames written after each chunk, shards with overlap can not be merged
+            preroll(int): Frames evaluated before each chunk without writing them
+            merge(bool): Stitch the shards into the output file
+            mayapy(str): mayapy executable path
+
+        :return
+            (dict): Report with shard results and merge status
+    """
+    # Imported here, this file also runs as a script before the package import
+    from . import batch_export
+
+    if merge and overlap:
+        raise ValueError("Overlapping shards can not be merged, use overlap=0 or merge=False")
+
+    output = output.replace("\\", "/")
+    chunks = split_frame_range(start_frame, end_frame, shards, overlap)
+    jobs = list()
+    for index, (chunk_start, chunk_end) in enumerate(chunks):
+        jobs.append({"scene": scene,
+                     "root": root,
+                     "export_type": "Alembic",
+                     "frame_range": [chunk_start, chunk_end],
+                     "preroll_frame": chunk_start - preroll if preroll else None,
+                     "group": index,
+                     "output": get_shard_path(output, index)})
+
+    handle, manifest_path = tempfile.mkstemp(suffix=".json", prefix="data_trader_shards_")
+    with os.fdopen(handle, "w") as out_file:
+        json.dump({"jobs": jobs}, out_file)
+
+    try:
+        report_path = os.path.splitext(output)[0] + "_shards_report.json"
+        report = batch_export.run_batch(manifest_path, report_path, workers=len(chunks), mayapy=mayapy)
+    finally:
+        os.remove(manifest_path)
+
+    shard_files = [job["output"] for job in jobs]
+    report["output"] = output
+    report["merged"] = False
+    if report["failed"]:
+        return report
+
+    stitcher = get_stitcher() if merge else None
+    if stitcher:
+        if os.path.isfile(output):
+            os.remove(output)
+        if subprocess.call([stitcher, output] + shard_files) == 0:
+            report["merged"] = True
+            for shard_file in shard_files:
+                os.remove(shard_file)
+
+    if not report["merged"]:
+        # Consumer can load shards by frame from this list
+        with open(output + ".shards.json", "w") as out_file:
+            json.dump([{"file": shard_file, "frame_range": list(chunk)}
+                       for shard_file, chunk in zip(shard_files, chunks)], out_file, indent=4)
+
+    return report
+
+
+def main(argv=None):
+    """
+        Command line entry
+
+        :param
+            argv(list): Command line arguments
+
+        :return
+            (int): Exit code
+    """
+    parser = argparse.ArgumentParser(description="Data Trader sharded alembic export")
+    parser.add_argument("scene", help="Saved maya scene")
+    parser.add_argument("--root", required=True, help="Root object")
+    parser.add_argument("--output", required=True, help="Alembic file path")
+    parser.add_argument("--range", nargs=2, type=float, required=True, metavar=("START", "END"), help="Frame range")
+    parser.add_argument("--shards", type=int, default=4, help="Number of parallel process")
+    parser.add_argument("--overlap", type=int, default=0, help="Extra frames written after each shard")
+    parser.add_argument("--preroll", type=int, default=0, help="Frames evaluated before each shard")
+    parser.add_argument("--no-merge", dest="merge", action="store_false", help="Keep the shard files")
+    parser.add_argument("--mayapy", help="mayapy executable path")
+    args = parser.parse_args(argv)
+
+    report = export_sharded(args.scene, args.root, args.output, args.range[0], args.range[1], args.shards,
+                            args.overlap, args.preroll, args.merge, args.mayapy)
+
+    sys.stdout.write("{0} shards, {1} failed, merged: {2}, {3:.2f} sec\n".format(
+        report["job_count"], report["failed"], report["merged"], report["wall_time"]))
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    # Import through the package so relative imports work
+    package_path = os.path.dirname(os.path.abspath(__file__))
+    if os.path.dirname(package_path) not in sys.path:
+        sys.path.append(os.path.dirname(package_path))
+
+    alembic_shard = importlib.import_module(os.path.basename(package_path) + ".alembic_shard")
+    sys.exit(alembic_shard.main(sys.argv[1:]))
@@ -0,0 +1,448 @@
+"""
+    This file export data in batch mode without any dialog
+
+    Jobs are described by a json manifest, every entry is expanded as scenes x roots:
+    {
+        "workers": 4,
+        "jobs": [
+            {
+                "scenes": ["D:/shots/sh010.ma", "D:/shots/sh020.ma"],
+                "roots": ["|char_grp", "|prop_grp"],
+                "export_type": "Alembic",
+                "frame_range": [1001, 1100],
+                "output": "D:/cache/{scene}/{root}.abc"
+            }
+        ]
+    }
+
+    Output tokens: {scene}, {root}, {type}, {frame}
+    Export types: Alembic, FBX, Obj, Pose, Shader
+
+    Job without "frame_range" is static, it is written at "frame" or at the current frame of the scene.
+
+    Add "use_cache": true to skip the jobs which scene content is not changed since their last export.
+
+    Root "*" exports every assembly of maya ascii scene, scenes are read by ma_scanner without maya
+    and jobs which root is not in the scene fail before any mayapy process is started.
+
+    Add "daemons": ["127.0.0.1:7720"] to send the jobs to running export_daemon workers
+    instead of starting new mayapy process.
+"""
+import argparse
+import importlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from multiprocessing.pool import ThreadPool
+
+EXPORT_TYPES = ["Alembic", "FBX", "Obj", "Pose", "Shader"]
+
+
+def get_mayapy():
+    """
+        Find mayapy executable for the worker process
+
+        :return
+            (str): mayapy executable path
+    """
+    if os.environ.get("MAYAPY"):
+        return os.environ["MAYAPY"]
+
+    if os.path.basename(sys.executable).lower().startswith("mayapy"):
+        return sys.executable
+
+    return "mayapy"
+
+
+def clean_name(name):
+    """
+        Make node name safe to use in file path
+
+        :param
+            name(str): Name of node or file
+
+        :return
+            (str): Name without path and namespace separators
+    """
+    return name.strip("|").replace("|", "_").replace(":", "__")
+
+
+def format_output(template, scene, root, export_type, frame=None):
+    """
+        Build output path of the job from template
+
+        :param
+            template(str): Output path with tokens
+            scene(str): Maya scene path
+            root(str): Name of root object
+            export_type(str): Type of export
+            frame(int): Frame number which data will export
+
+        :return
+            (str): Output path
+    """
+    scene_name = os.path.splitext(os.path.basename(scene))[0]
+    output = template.format(scene=scene_name, root=clean_name(root), type=export_type,
+                             frame="" if frame is None else frame)
+    return output.replace("\\", "/")
+
+
+def expand_jobs(manifest):
+    """
+        Expand manifest entries into single scene and single root jobs
+
+        :param
+            manifest(dict): Loaded manifest data
+
+        :return
+            (list): Job dictionaries
+    """
+    # Package modules are imported in the functions, this file also runs as a script before the package import
+    from . import ma_scanner
+
+    jobs = list()
+    for entry in manifest.get("jobs", []):
+        export_type = entry.get("export_type")
+        if export_type not in EXPORT_TYPES:
+            raise ValueError("Export type is not supported: {0}".format(export_type))
+
+        scenes = entry.get("scenes") or [entry.get("scene")]
+        roots = entry.get("roots") or [entry.get("root")]
+        frame_range = entry.get("frame_range")
+        frame = entry.get("frame")
+
+        for scene in scenes:
+            scene_roots = roots
+            if "*" in roots and scene:
+                scene_roots = [root for root in roots if root != "*"]
+                scene_roots += ma_scanner.scan_scene(scene)["assemblies"]
+
+            for root in scene_roots:
+                if not scene or not root:
+                    raise ValueError("Job needs scene and root: {0}".format(entry))
+
+                jobs.append({"id": len(jobs),
+                             "scene": scene.replace("\\", "/"),
+                             "root": root,
+                             "export_type": export_type,
+                             "frame": frame,
+                             "frame_range": frame_range,
+                             "animated": bool(frame_range or entry.get("animated")),
+                             "bundle": bool(entry.get("bundle")),
+                             "compress": bool(entry.get("compress")),
+                             "preroll_frame": entry.get("preroll_frame"),
+                             "pose_reference": entry.get("pose_reference"),
+                             "use_cache": bool(entry.get("use_cache")),
+                             "group": entry.get("group"),
+                             "output": format_output(entry["output"], scene, root, export_type, frame)})
+    return jobs
+
+
+def validate_jobs(jobs):
+    """
+        Check scene and root of jobs without maya, maya binary scenes are not checked
+
+        :param
+            jobs(list): Job dictionaries
+
+        :return
+            (list): Failed results of the jobs which can not run
+    """
+    from . import ma_scanner
+
+    scans = dict()
+    failed = list()
+    for job in jobs:
+        error = None
+        if not os.path.isfile(job["scene"]):
+            error = "Scene not found: {0}".format(job["scene"])
+        elif job["scene"].lower().endswith(".ma"):
+            if job["scene"] not in scans:
+                try:
+                    scans[job["scene"]] = ma_scanner.scan_scene(job["scene"])
+                except Exception:
+                    # Scene is checked by maya when it is opened
+                    scans[job["scene"]] = None
+            if scans[job["scene"]] and ma_scanner.find_node(scans[job["scene"]], job["root"]) is False:
+                error = "Root not found in scene: {0}".format(job["root"])
+
+        if error:
+            result = dict(job)
+            result["status"] = "failed"
+            result["error"] = error
+            failed.append(result)
+    return failed
+
+
+def split_jobs(jobs, workers):
+    """
+        Split jobs between workers, jobs of one scene stay together so the scene is opened once,
+        jobs with different "group" value can go to different workers even for same scene
+
+        :param
+            jobs(list): Job dictionaries
+            workers(int): Number of worker process
+
+        :return
+            (list): List of job list per worker
+    """
+    scenes = dict()
+    for job in jobs:
+        scenes.setdefault((job["scene"], job.get("group")), []).append(job)
+
+    chunks = [list() for _ in range(max(1, min(workers, len(scenes))))]
+    # Biggest scene first, always to the least busy worker
+    for scene_jobs in sorted(scenes.values(), key=len, reverse=True):
+        min(chunks, key=len).extend(scene_jobs)
+    return [chunk for chunk in chunks if chunk]
+
+
+def run_job(job):
+    """
+        Export single job in the current maya session
+
+        :param
+            job(dict): Job dictionary
+
+        :return
+            (dict): Result of the job with timings
+    """
+    from maya import cmds
+    from . import utility
+
+    result = dict(job)
+    result["status"] = "ok"
+    result["error"] = None
+
+    start = time.time()
+    try:
+        current_scene = cmds.file(query=True, sceneName=True)
+        if os.path.normcase(current_scene) != os.path.normcase(job["scene"]):
+            cmds.file(job["scene"], open=True, force=True)
+        result["open_time"] = time.time() - start
+
+        output_dir = job["output"] if job["export_type"] == "Shader" else os.path.dirname(job["output"])
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+        export_start = time.time()
+        use_cache = job.get("use_cache", False)
+        if job["export_type"] == "Alembic":
+            result["cache_hit"] = utility.alembic_export(job["root"], job["animated"], job["frame"],
+                                                         file_path=job["output"], frame_range=job["frame_range"],
+                                                         preroll_frame=job.get("preroll_frame"), use_cache=use_cache)
+        elif job["export_type"] == "FBX":
+            result["cache_hit"] = utility.fbx_export(job["root"], file_path=job["output"], use_cache=use_cache)
+        elif job["export_type"] == "Obj":
+            result["cache_hit"] = utility.obj_export(job["root"], job["frame"], file_path=job["output"],
+                                                     anim_export=job["animated"], frame_range=job["frame_range"],
+                                                     use_cache=use_cache)
+        elif job["export_type"] == "Pose":
+            result["cache_hit"] = utility.pose_export(job["root"], job["frame"], file_path=job["output"],
+                                                      anim_export=job["animated"], frame_range=job["frame_range"],
+                                                      reference=job.get("pose_reference"), use_cache=use_cache)
+        elif job["export_type"] == "Shader":
+            utility.shader_export(job["root"], file_path=job["output"], bundle=job["bundle"],
+                                  compress=job["compress"])
+        result["export_time"] = time.time() - export_start
+
+    except Exception as error:
+        result["status"] = "failed"
+        result["error"] = str(error)
+
+    result["time"] = time.time() - start
+    return result
+
+
+def run_worker(job_file, result_file):
+    """
+        Worker process entry, it runs inside mayapy
+
+        :param
+            job_file(str): Json file with job list
+            result_file(str): Json file to write the results
+    """
+    start = time.time()
+    from maya import standalone
+    standalone.initialize()
+    startup_time = time.time() - start
+
+    with open(job_file, "r") as in_file:
+        jobs = json.load(in_file)
+
+    results = list()
+    for job in jobs:
+        result = run_job(job)
+        result["worker_startup_time"] = startup_time
+        results.append(result)
+
+        # Write after every job so a crash does not lose finished jobs
+        with open(result_file, "w") as out_file:
+            json.dump(results, out_file)
+
+    # Publish copies run in background threads, they must finish before the process exits
+    from . import post_export
+
+    pipeline = post_export.get_pipeline()
+    if pipeline is not None:
+        pipeline.wait()
+
+
+def run_daemon_chunk(chunk, address):
+    """
+        Run jobs one by one on a running export daemon
+
+        :param
+            chunk(list): Job dictionaries
+            address(str): Daemon address as host:port
+
+        :return
+            (list): Results of the jobs
+    """
+    from . import export_daemon
+
+    host, port = address.rsplit(":", 1)
+    results = list()
+    for job in chunk:
+        try:
+            results.append(export_daemon.submit(job, host, int(port)))
+        except Exception as error:
+            result = dict(job)
+            result["status"] = "failed"
+            result["error"] = "Export daemon {0} failed: {1}".format(address, error)
+            results.append(result)
+    return results
+
+
+def run_batch(manifest_path, report_path, workers=None, mayapy=None, daemons=None):
+    """
+        Run all the jobs of manifest in parallel mayapy process
+
+        :param
+            manifest_path(str): Json manifest path
+            report_path(str): Json report path
+            workers(int): Number of worker process, manifest value is used when it is not given
+            mayapy(str): mayapy executable path
+            daemons(list): Addresses of running export daemons, new process are started when it is not given
+
+        :return
+            (dict): Report data
+    """
+    with open(manifest_path, "r") as in_file:
+        manifest = json.load(in_file)
+
+    jobs = expand_jobs(manifest)
+    workers = workers or manifest.get("workers") or 1
+    mayapy = mayapy or manifest.get("mayapy") or get_mayapy()
+    daemons = daemons or manifest.get("daemons")
+    if daemons:
+        workers = len(daemons)
+    script_path = os.path.splitext(os.path.abspath(__file__))[0] + ".py"
+
+    temp_dir = tempfile.mkdtemp(prefix="data_trader_")
+    log_dir = os.path.splitext(report_path)[0] + "_logs"
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    def run_chunk(args):
+        index, chunk = args
+        if daemons:
+            return run_daemon_chunk(chunk, daemons[index])
+
+        job_file = os.path.join(temp_dir, "jobs_{0}.json".format(index))
+        result_file = os.path.join(temp_dir, "results_{0}.json".format(index))
+        with open(job_file, "w") as out_file:
+            json.dump(chunk, out_file)
+
+        log_file = os.path.join(log_dir, "worker_{0}.log".format(index))
+        with open(log_file, "w") as log:
+            return_code = subprocess.call([mayapy, script_path, "--worker", job_file, result_file],
+                                          stdout=log, stderr=subprocess.STDOUT)
+
+        results = list()
+        if os.path.isfile(result_file):
+            with open(result_file, "r") as in_file:
+                results = json.load(in_file)
+
+        # Worker died before finishing everything
+        done = set(result["id"] for result in results)
+        for job in chunk:
+            if job["id"] not in done:
+                result = dict(job)
+                result["status"] = "failed"
+                result["error"] = "Worker exited with code {0}, see {1}".format(return_code, log_file)
+                results.append(result)
+        return results
+
+    start = time.time()
+    invalid = validate_jobs(jobs)
+    invalid_ids = set(result["id"] for result in invalid)
+    chunks = split_jobs([job for job in jobs if job["id"] not in invalid_ids], workers)
+    pool = ThreadPool(len(chunks) or 1)
+    try:
+        chunk_results = pool.map(run_chunk, list(enumerate(chunks)))
+    finally:
+        pool.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    results = sorted([result for chunk in chunk_results for result in chunk] + invalid, key=lambda item: item["id"])
+    report = {"manifest": manifest_path,
+              "workers": len(chunks),
+              "wall_time": time.time() - start,
+              "job_count": len(results),
+              "failed": len([result for result in results if result["status"] != "ok"]),
+              "cache_hits": len([result for result in results if result.get("cache_hit")]),
+              "jobs": results}
+
+    with open(report_path, "w") as out_file:
+        json.dump(report, out_file, indent=4)
+    return report
+
+
+def main(argv=None):
+    """
+        Command line entry
+
+        :param
+            argv(list): Command line arguments
+
+        :return
+            (int): Exit code
+    """
+    parser = argparse.ArgumentParser(description="Data Trader batch export")
+    parser.add_argument("manifest", nargs="?", help="Json job manifest")
+    parser.add_argument("--report", help="Json report path, default is next to the manifest")
+    parser.add_argument("--workers", type=int, help="Number of mayapy process")
+    parser.add_argument("--mayapy", help="mayapy executable path")
+    parser.add_argument("--daemon", action="append", dest="daemons", metavar="HOST:PORT",
+                        help="Running export daemon, can be given multiple times")
+    parser.add_argument("--worker", nargs=2, metavar=("JOBS", "RESULTS"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(*args.worker)
+        return 0
+
+    if not args.manifest:
+        parser.error("manifest is required")
+
+    report_path = args.report or os.path.splitext(args.manifest)[0] + "_report.json"
+    report = run_batch(args.manifest, report_path, args.workers, args.mayapy, args.daemons)
+
+    sys.stdout.write("{0} jobs, {1} failed, {2} cached in {3:.2f} sec, report: {4}\n".format(
+        report["job_count"], report["failed"], report["cache_hits"], report["wall_time"], report_path))
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    # Import through the package so relative imports work in the worker
+    package_path = os.path.dirname(os.path.abspath(__file__))
+    if os.path.dirname(package_path) not in sys.path:
+        sys.path.append(os.path.dirname(package_path))
+
+    batch_export = importlib.import_module(os.path.basename(package_path) + ".batch_export")
+    sys.exit(batch_export.main(sys.argv[1:]))
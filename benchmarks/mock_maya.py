@@ -0,0 +1,511 @@
+"""
+    In memory stand in of the maya.cmds surface used by utility, so exports and imports run outside of maya
+
+    Only the flags used by the package are handled and short names are expected to be unique.
+    OpenMaya is installed from mock_openmaya, which works on the same scene.
+"""
+import collections
+import re
+import sys
+import time
+import types
+
+from . import mock_openmaya
+
+DAG_TYPES = ["transform", "mesh", "nurbsCurve", "joint", "camera"]
+SHAPE_TYPES = ["mesh", "nurbsCurve", "camera"]
+CREATE_PATTERN = re.compile(r'^createNode (\w+) -n "([^"]+)"')
+CONNECT_PATTERN = re.compile(r'^connectAttr "([^".]+)\.\w+" "([^".]+)\.\w+"')
+ALEMBIC_FILE_PATTERN = re.compile(r"-file (\S+?)\"")
+
+
+def as_list(items):
+    """
+        Flatten command argument into list of names
+
+        :param
+            items(str, list): Name or nested list of names
+
+        :return
+            (list): Names
+    """
+    if items is None:
+        return list()
+    if isinstance(items, (list, tuple, set)):
+        result = list()
+        for item in items:
+            result.extend(as_list(item))
+        return result
+    return [items]
+
+
+class MockNode(object):
+    def __init__(self, name, node_type, parent=None):
+        self.name = name
+        self.node_type = node_type
+        self.parent = parent
+        self.children = list()
+        self.attrs = dict()
+        self.keyable = list()
+        self.inputs = list()
+        self.outputs = list()
+        self.plug_inputs = dict()
+
+    @property
+    def path(self):
+        if self.node_type not in DAG_TYPES:
+            return self.name
+        if self.parent is None:
+            return "|" + self.name
+        return self.parent.path + "|" + self.name
+
+
+class MockScene(object):
+    """
+        Nodes, shading engine members and scene state
+    """
+    def __init__(self, scene_name="D:/shots/benchmark.ma"):
+        self.scene_name = scene_name
+        self.nodes = dict()
+        self.members = dict()
+        self.selection = list()
+        self.namespaces = set()
+        self.current_time = 1.0
+        self.playback_range = (1.0, 24.0)
+        self.create_node("shadingEngine", "initialShadingGroup")
+
+    def create_node(self, node_type, name, parent=None, attrs=None):
+        """
+            Add node to scene
+
+            :param
+                node_type(str): Type of node
+                name(str): Short name of node
+                parent(str): Name of parent dag node
+                attrs(dict): Attribute values, all of them are keyable
+
+            :return
+                (MockNode): Created node
+        """
+        parent_node = self.resolve(parent) if parent else None
+        node = MockNode(name, node_type, parent_node)
+        if parent_node:
+            parent_node.children.append(node)
+        if attrs:
+            node.attrs.update(attrs)
+            node.keyable.extend(sorted(attrs))
+        if node_type == "shadingEngine":
+            self.members[name] = list()
+
+        self.nodes[name] = node
+        return node
+
+    def connect(self, source, destination):
+        """
+            Connect two nodes
+
+            :param
+                source(str): Name of upstream node
+                destination(str): Name of downstream node
+        """
+        source_node, destination_node = self.resolve(source), self.resolve(destination)
+        destination_node.inputs.append(source_node)
+        source_node.outputs.append(destination_node)
+
+    def resolve(self, name):
+        """
+            Find node by short name, full path or plug and component name
+
+            :param
+                name(str): Name of node
+
+            :return
+                (MockNode): Node, None when it does not exist
+        """
+        return self.nodes.get(name.split(".", 1)[0].rsplit("|", 1)[-1])
+
+    def remove_node(self, node):
+        """
+            Remove node and its children
+
+            :param
+                node(MockNode): Node to remove
+        """
+        for child in list(node.children):
+            self.remove_node(child)
+        if node.parent:
+            node.parent.children.remove(node)
+        for item in node.inputs:
+            item.outputs.remove(node)
+        for item in node.outputs:
+            item.inputs.remove(node)
+            for attr in [attr for attr, source in item.plug_inputs.items() if source is node]:
+                del item.plug_inputs[attr]
+
+        self.members.pop(node.name, None)
+        del self.nodes[node.name]
+
+    def rename_node(self, node, name):
+        """
+            Rename node, set names are updated
+
+            :param
+                node(MockNode): Node to rename
+                name(str): New short name
+        """
+        del self.nodes[node.name]
+        if node.name in self.members:
+            self.members[name] = self.members.pop(node.name)
+        node.name = name
+        self.nodes[name] = node
+
+
+class MockCommands(object):
+    """
+        Implementation of the commands, every call is counted and delayed by latency
+    """
+    COMMANDS = ["connectAttr", "createNode", "currentTime", "cutKey", "delete", "evaluationManager", "file", "getAttr",
+                "listAttr", "listConnections", "listHistory", "listRelatives", "loadPlugin", "ls", "namespace",
+                "objExists", "objectType", "playbackOptions", "pluginInfo", "refresh", "select", "setAttr", "sets",
+                "undoInfo"]
+
+    def __init__(self, scene, latency=0.0):
+        self.scene = scene
+        self.latency = latency
+        self.calls = collections.Counter()
+
+    def wrap(self, name):
+        function = getattr(self, name)
+
+        def command(*args, **kwargs):
+            self.calls[name] += 1
+            if self.latency:
+                time.sleep(self.latency)
+            return function(*args, **kwargs)
+
+        command.__name__ = name
+        return command
+
+    def mel_eval(self, command):
+        self.calls["mel.eval"] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        # Alembic export writes the roots of every job
+        for file_path in ALEMBIC_FILE_PATTERN.findall(command):
+            with open(file_path, "w") as out_file:
+                out_file.write(command)
+
+    def get_nodes(self, args):
+        nodes = list()
+        for name in as_list(args):
+            node = self.scene.resolve(name)
+            if node is None:
+                raise ValueError("No object matches name: {0}".format(name))
+            nodes.append(node)
+        return nodes
+
+    def get_names(self, nodes, long_name):
+        names = [node.path if long_name else node.name for node in nodes]
+        return names or None
+
+    def ls(self, *args, **kwargs):
+        nodes = self.get_nodes(args) if args else list(self.scene.nodes.values())
+        if kwargs.get("selection", kwargs.get("sl")):
+            nodes = list(self.scene.selection)
+        if kwargs.get("type"):
+            nodes = [node for node in nodes if node.node_type in as_list(kwargs["type"])]
+        if kwargs.get("dag"):
+            nodes = [node for node in nodes if node.node_type in DAG_TYPES]
+        if kwargs.get("shapes"):
+            nodes = [node for node in nodes if node.node_type in SHAPE_TYPES]
+        if kwargs.get("assemblies"):
+            nodes = [node for node in nodes if node.node_type in DAG_TYPES and node.parent is None]
+
+        long_name = kwargs.get("long", kwargs.get("l"))
+        if kwargs.get("showType"):
+            result = list()
+            for node in nodes:
+                result.extend([node.path if long_name else node.name, node.node_type])
+            return result
+        return [node.path if long_name else node.name for node in nodes]
+
+    def listRelatives(self, *args, **kwargs):
+        nodes = self.get_nodes(args)
+        result = list()
+        if kwargs.get("parent"):
+            result = [node.parent for node in nodes if node.parent]
+        elif kwargs.get("allDescendents", kwargs.get("ad")):
+            stack = [child for node in nodes for child in reversed(node.children)]
+            while stack:
+                node = stack.pop()
+                result.append(node)
+                stack.extend(reversed(node.children))
+        else:
+            result = [child for node in nodes for child in node.children]
+
+        if kwargs.get("type"):
+            result = [node for node in result if node.node_type in as_list(kwargs["type"])]
+        return self.get_names(result, kwargs.get("fullPath", kwargs.get("f")))
+
+    def listAttr(self, node, **kwargs):
+        node = self.get_nodes(node)[0]
+        if kwargs.get("keyable", kwargs.get("k")):
+            return list(node.keyable) or None
+        return sorted(node.attrs) or None
+
+    def getAttr(self, plug, **kwargs):
+        node_name, attr = plug.rsplit(".", 1)
+        return self.get_nodes(node_name)[0].attrs[attr]
+
+    def setAttr(self, plug, *values, **kwargs):
+        node_name, attr = plug.rsplit(".", 1)
+        self.get_nodes(node_name)[0].attrs[attr] = values[0] if len(values) == 1 else values
+
+    def sets(self, *args, **kwargs):
+        members = self.scene.members
+        if kwargs.get("query", kwargs.get("q")):
+            return list(members[self.get_nodes(args)[0].name]) or None
+
+        shader = kwargs.get("forceElement", kwargs.get("fe"))
+        if shader:
+            shader = self.get_nodes(shader)[0].name
+            new_members = as_list(args)
+            self.get_nodes(new_members)
+            nodes = set(member.split(".", 1)[0] for member in new_members if "." not in member)
+            removed = set(new_members)
+            for engine, engine_members in members.items():
+                members[engine] = [member for member in engine_members
+                                   if member not in removed and member.split(".", 1)[0] not in nodes]
+            members[shader].extend(new_members)
+            return None
+
+        name = kwargs.get("name", kwargs.get("n", "set1"))
+        self.scene.create_node("objectSet", name)
+        return name
+
+    def listConnections(self, *args, **kwargs):
+        nodes = self.get_nodes(args)
+        node_type = kwargs.get("type")
+        plugs = [name.split(".", 1)[1] for name in as_list(args) if "." in name.rsplit("|", 1)[-1]]
+        if plugs:
+            # Plug connections are kept only for the anim curves made by connectAttr
+            result = [node.plug_inputs[attr] for node, attr in zip(nodes, plugs) if attr in node.plug_inputs]
+            if node_type:
+                result = [node for node in result if node.node_type.startswith(node_type)]
+        elif node_type == "shadingEngine":
+            names = set(node.name for node in nodes)
+            result = [self.scene.nodes[engine] for engine, members in self.scene.members.items()
+                      if any(member.split(".", 1)[0] in names for member in members)]
+        elif kwargs.get("connections"):
+            # Plug names are not kept, every connection is reported on input or output attribute
+            result = list()
+            for node in nodes:
+                if kwargs.get("source", True):
+                    for item in node.inputs:
+                        result.extend([node.name + ".input", item.name])
+                if kwargs.get("destination", True):
+                    for item in node.outputs:
+                        result.extend([node.name + ".output", item.name])
+            return result or None
+        else:
+            result = list()
+            for node in nodes:
+                if kwargs.get("source", True):
+                    result.extend(node.inputs)
+                if kwargs.get("destination", True):
+                    result.extend(node.outputs)
+            if node_type:
+                result = [node for node in result if node.node_type == node_type]
+        return self.get_names(result, False)
+
+    def listHistory(self, *args, **kwargs):
+        result = list()
+        stack = self.get_nodes(args)
+        while stack:
+            node = stack.pop()
+            if node in result:
+                continue
+            if kwargs.get("pruneDagObjects") and node.node_type in DAG_TYPES:
+                continue
+            result.append(node)
+            stack.extend(node.inputs)
+        return self.get_names(result, False)
+
+    def objExists(self, name):
+        return self.scene.resolve(name) is not None
+
+    def objectType(self, name):
+        return self.get_nodes(name)[0].node_type
+
+    def createNode(self, node_type, name=None, parent=None, **kwargs):
+        name = name or node_type + "1"
+        while name in self.scene.nodes:
+            name += "1"
+        return self.scene.create_node(node_type, name, parent).name
+
+    def connectAttr(self, source, destination, **kwargs):
+        source_node, destination_node = self.get_nodes([source, destination])
+        previous = destination_node.plug_inputs.get(destination.split(".", 1)[1])
+        if previous is not None:
+            previous.outputs.remove(destination_node)
+            destination_node.inputs.remove(previous)
+        self.scene.connect(source_node.name, destination_node.name)
+        destination_node.plug_inputs[destination.split(".", 1)[1]] = source_node
+
+    def cutKey(self, plug, **kwargs):
+        node = self.get_nodes(plug)[0]
+        curve = node.plug_inputs.get(plug.split(".", 1)[1])
+        if curve is not None and curve.node_type.startswith("animCurve"):
+            self.scene.remove_node(curve)
+
+    def select(self, *args, **kwargs):
+        if kwargs.get("clear"):
+            self.scene.selection = list()
+            return
+        self.scene.selection = self.get_nodes(args)
+
+    def delete(self, *args, **kwargs):
+        for node in self.get_nodes(args):
+            if node.name in self.scene.nodes:
+                self.scene.remove_node(node)
+
+    def namespace(self, **kwargs):
+        if "exists" in kwargs:
+            return kwargs["exists"] in self.scene.namespaces
+        if "moveNamespace" in kwargs:
+            source = kwargs["moveNamespace"][0]
+            for node in [node for node in self.scene.nodes.values() if node.name.startswith(source + ":")]:
+                name = node.name[len(source) + 1:]
+                while name in self.scene.nodes:
+                    name += "1"
+                self.scene.rename_node(node, name)
+        if "removeNamespace" in kwargs:
+            self.scene.namespaces.discard(kwargs["removeNamespace"])
+
+    def file(self, *args, **kwargs):
+        if kwargs.get("query", kwargs.get("q")):
+            return self.scene.scene_name
+        if kwargs.get("exportSelected", kwargs.get("es")):
+            self.export_selected(args[0], kwargs.get("type"))
+        elif kwargs.get("i") or kwargs.get("import"):
+            self.import_file(args[0], kwargs.get("namespace"))
+        elif kwargs.get("new"):
+            self.scene.__init__(self.scene.scene_name)
+
+    def export_selected(self, file_path, file_type):
+        """
+            Write selected nodes and their history as createNode and connectAttr lines
+        """
+        lines = ["//Maya ASCII scene", "//Last modified: {0}".format(time.time())]
+        if file_type == "mayaAscii":
+            history = list()
+            for node in self.scene.selection:
+                history.extend(self.listHistory(node.name) or [])
+
+            nodes = [self.scene.resolve(name) for name in reversed(history)]
+            lines += ['createNode {0} -n "{1}";'.format(node.node_type, node.name) for node in nodes]
+            lines += ['connectAttr "{0}.message" "{1}.message";'.format(item.name, node.name)
+                      for node in nodes for item in node.inputs]
+        else:
+            lines += [node.path for node in self.scene.selection]
+
+        with open(file_path, "w") as out_file:
+            out_file.write("\n".join(lines) + "\n")
+
+    def import_file(self, file_path, namespace):
+        """
+            Create the nodes of exported maya ascii file
+        """
+        prefix = namespace + ":" if namespace and namespace != ":" else ""
+        if prefix:
+            self.scene.namespaces.add(namespace)
+
+        names = dict()
+        with open(file_path, "r") as in_file:
+            for line in in_file:
+                match = CREATE_PATTERN.match(line)
+                if match:
+                    name = prefix + match.group(2)
+                    while name in self.scene.nodes:
+                        name += "1"
+                    names[match.group(2)] = name
+                    self.scene.create_node(match.group(1), name)
+                    continue
+
+                match = CONNECT_PATTERN.match(line)
+                if match:
+                    self.scene.connect(names[match.group(1)], names[match.group(2)])
+
+    def currentTime(self, *args, **kwargs):
+        if args:
+            self.scene.current_time = float(args[0])
+        return self.scene.current_time
+
+    def playbackOptions(self, **kwargs):
+        if kwargs.get("minTime", kwargs.get("min")):
+            return self.scene.playback_range[0]
+        return self.scene.playback_range[1]
+
+    def pluginInfo(self, *args, **kwargs):
+        return True
+
+    def loadPlugin(self, *args, **kwargs):
+        return None
+
+    def refresh(self, *args, **kwargs):
+        return None
+
+    def evaluationManager(self, *args, **kwargs):
+        if kwargs.get("query", kwargs.get("q")):
+            return ["parallel"]
+        return None
+
+    def undoInfo(self, *args, **kwargs):
+        if kwargs.get("query", kwargs.get("q")):
+            return True
+        return None
+
+
+class QMessageBox(object):
+    Information, Warning, Critical = range(3)
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class QFileDialog(QMessageBox):
+    AnyFile, ExistingFile, Directory, AcceptOpen, AcceptSave = range(5)
+
+
+def add_module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+    return module
+
+
+def install(scene, latency=0.0):
+    """
+        Put mock maya and qt modules in sys.modules, it must run before the package modules are imported
+
+        :param
+            scene(MockScene): Scene which the commands work on
+            latency(float): Seconds added to every command call
+
+        :return
+            (MockCommands): Commands, change its scene attribute to switch scene
+    """
+    commands = MockCommands(scene, latency)
+    cmds = add_module("maya.cmds", **dict((name, commands.wrap(name)) for name in MockCommands.COMMANDS))
+    mel = add_module("maya.mel", eval=commands.mel_eval)
+    api = add_module("maya.api", OpenMaya=add_module("maya.api.OpenMaya", **mock_openmaya.get_api(commands)),
+                     OpenMayaAnim=add_module("maya.api.OpenMayaAnim"))
+    add_module("maya", cmds=cmds, mel=mel, api=api)
+
+    widgets = add_module("PySide2.QtWidgets", QMessageBox=QMessageBox, QFileDialog=QFileDialog)
+    add_module("PySide2", QtWidgets=widgets)
+    return commands
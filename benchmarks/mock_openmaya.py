@@ -0,0 +1,371 @@
+"""
+    In memory stand in of the OpenMaya API 2.0 surface used by pose and obj sequence code, it reads and
+    writes the same mock scene as mock_maya
+
+    Attribute type comes from its name and value: translate is distance, rotate is angle, bool value is
+    boolean, int value is int and other numbers are double, anything else is left for cmds.getAttr.
+    Compound value is [(x, y, z)] like getAttr gives, its children are the X, Y and Z attributes.
+    Meshes are strips of quads which are made on first read. API calls are counted with "api." prefix,
+    they are not delayed by the command latency.
+"""
+commands = None
+
+# Same face count as the meshes of scene_generator
+MESH_FACES = 100
+
+
+def count(name):
+    commands.calls["api." + name] += 1
+
+
+class MFn(object):
+    kDagNode, kTransform, kMesh, kNurbsCurve, kCamera, kWorld = range(6)
+    kNumericAttribute, kUnitAttribute, kEnumAttribute = range(10, 13)
+
+
+NODE_FUNCTIONS = {"transform": (MFn.kDagNode, MFn.kTransform),
+                  "joint": (MFn.kDagNode, MFn.kTransform),
+                  "mesh": (MFn.kDagNode, MFn.kMesh),
+                  "nurbsCurve": (MFn.kDagNode, MFn.kNurbsCurve),
+                  "camera": (MFn.kDagNode, MFn.kCamera)}
+
+
+def get_attribute_function(node, attr):
+    """
+        :param
+            node(mock_maya.MockNode): Node of attribute
+            attr(str): Attribute name
+
+        :return
+            (int): MFn type of attribute, None for compound and other data
+    """
+    value = node.attrs.get(attr)
+    if isinstance(value, (list, tuple)):
+        return None
+    if attr.startswith(("translate", "rotate")):
+        return MFn.kUnitAttribute
+    if isinstance(value, (bool, int, float)):
+        return MFn.kNumericAttribute
+    return None
+
+
+class MObject(object):
+    """
+        Handle of node, attribute or mesh data
+    """
+    def __init__(self, node=None, attr=None, data=None):
+        self.node = node
+        self.attr = attr
+        self.data = data
+
+    def isNull(self):
+        return self.node is None and self.data is None
+
+    def hasFn(self, function):
+        if self.attr is not None:
+            return get_attribute_function(self.node, self.attr) == function
+        if self.data is not None:
+            return function == MFn.kMesh
+        return self.node is not None and function in NODE_FUNCTIONS.get(self.node.node_type, ())
+
+
+MObject.kNullObj = MObject()
+
+
+class MObjectHandle(object):
+    def __init__(self, obj):
+        self.node = obj.node
+
+    def isValid(self):
+        return commands.scene.nodes.get(self.node.name) is self.node
+
+
+class MSelectionList(object):
+    def __init__(self):
+        self.items = list()
+
+    def add(self, name):
+        count("MSelectionList.add")
+        node = commands.scene.resolve(name)
+        leaf = name.rsplit("|", 1)[-1]
+        attr = leaf.split(".", 1)[1] if "." in leaf else None
+        if node is None or (attr is not None and attr not in node.attrs):
+            raise RuntimeError("(kInvalidParameter): Object does not exist")
+        self.items.append((node, attr))
+
+    def length(self):
+        return len(self.items)
+
+    def getDependNode(self, index):
+        return MObject(self.items[index][0])
+
+    def getPlug(self, index):
+        node, attr = self.items[index]
+        if attr is None:
+            raise TypeError("Item is not a plug")
+        return MPlug(MObject(node), MObject(node, attr))
+
+
+class MFnDependencyNode(object):
+    def __init__(self, obj):
+        self.node = obj.node
+
+    def name(self):
+        return self.node.name
+
+    def attributeCount(self):
+        return len(self.node.attrs)
+
+    def attribute(self, index):
+        return MObject(self.node, list(self.node.attrs)[index])
+
+    def findPlug(self, attr, want_networked):
+        count("MFnDependencyNode.findPlug")
+        if attr in self.node.attrs or (attr == "worldMesh" and self.node.node_type == "mesh"):
+            return MPlug(MObject(self.node), MObject(self.node, attr))
+        raise RuntimeError("(kInvalidParameter): No plug named {0}".format(attr))
+
+
+class MFnAttribute(object):
+    array = False
+
+    def __init__(self, obj):
+        self.name = obj.attr
+        self.parent = MObject.kNullObj
+
+
+class MPlug(object):
+    def __init__(self, node=None, attribute=None):
+        self.node = node.node
+        self.attr = attribute.attr
+
+    @property
+    def isKeyable(self):
+        return self.attr in self.node.keyable
+
+    @property
+    def isLocked(self):
+        return False
+
+    @property
+    def isCompound(self):
+        return isinstance(self.node.attrs[self.attr], (list, tuple))
+
+    def numChildren(self):
+        value = self.node.attrs[self.attr]
+        return len(value[0] if isinstance(value, list) else value)
+
+    def child(self, index):
+        return MPlug(MObject(self.node), MObject(self.node, self.attr + "XYZ"[index]))
+
+    def partialName(self, useLongNames=False):
+        return self.attr
+
+    def attribute(self):
+        return MObject(self.node, self.attr)
+
+    def value(self, name):
+        count("MPlug." + name)
+        return self.node.attrs[self.attr]
+
+    def asBool(self, context=None):
+        return bool(self.value("asBool"))
+
+    def asInt(self, context=None):
+        return int(self.value("asInt"))
+
+    def asShort(self, context=None):
+        return int(self.value("asShort"))
+
+    def asDouble(self, context=None):
+        return float(self.value("asDouble"))
+
+    def asMAngle(self, context=None):
+        return MAngle(float(self.value("asMAngle")))
+
+    def asMDistance(self, context=None):
+        return MDistance(float(self.value("asMDistance")))
+
+    def asMTime(self, context=None):
+        return MTime(float(self.value("asMTime")))
+
+    def asMObject(self, context=None):
+        count("MPlug.asMObject")
+        return MObject(data=self.node)
+
+    def elementByLogicalIndex(self, index):
+        return self
+
+
+class MFnNumericData(object):
+    kBoolean, kByte, kChar, kShort, kInt, kInt64, kFloat, kDouble = range(8)
+
+
+class MFnNumericAttribute(MFnAttribute):
+    def __init__(self, obj):
+        super(MFnNumericAttribute, self).__init__(obj)
+        self.value = obj.node.attrs[obj.attr]
+        self.default = 1.0 if obj.attr.startswith("scale") or obj.attr == "visibility" else 0.0
+
+    def numericType(self):
+        if isinstance(self.value, bool):
+            return MFnNumericData.kBoolean
+        if isinstance(self.value, int):
+            return MFnNumericData.kInt
+        return MFnNumericData.kDouble
+
+
+class MUnitValue(object):
+    def __init__(self, value=0.0, unit=0):
+        self.value = value
+
+    def asUnits(self, unit):
+        return self.value
+
+    @staticmethod
+    def uiUnit():
+        return 0
+
+
+class MAngle(MUnitValue):
+    pass
+
+
+class MDistance(MUnitValue):
+    pass
+
+
+class MTime(MUnitValue):
+    pass
+
+
+class MFnUnitAttribute(MFnAttribute):
+    kAngle, kDistance, kTime = range(3)
+
+    def __init__(self, obj):
+        super(MFnUnitAttribute, self).__init__(obj)
+        self.unit_type = self.kAngle if obj.attr.startswith("rotate") else self.kDistance
+        self.default = MAngle(0.0) if self.unit_type == self.kAngle else MDistance(0.0)
+
+    def unitType(self):
+        return self.unit_type
+
+
+class MFnEnumAttribute(MFnAttribute):
+    default = 0
+
+
+class MDGContext(object):
+    current = None
+
+    def __init__(self, time=None):
+        self.time = time
+
+    def makeCurrent(self):
+        previous = MDGContext.current or MDGContext()
+        MDGContext.current = self
+        return previous
+
+
+class MSpace(object):
+    kObject, kWorld = range(2)
+
+
+def get_mesh_data(node):
+    """
+        Build strip of quads for mesh node once
+
+        :param
+            node(mock_maya.MockNode): Mesh node
+
+        :return
+            (dict): Points, counts, vertex ids and uvs
+    """
+    if getattr(node, "mesh_data", None) is None:
+        faces = MESH_FACES
+        row = faces + 1
+        vertices = list()
+        for face in range(faces):
+            vertices.extend([face, face + 1, row + face + 1, row + face])
+        node.mesh_data = {"points": [(float(index % row), float(index // row), 0.0, 1.0) for index in range(row * 2)],
+                          "counts": [4] * faces,
+                          "vertices": vertices,
+                          "us": [float(index % row) / faces for index in range(row * 2)],
+                          "vs": [float(index // row) for index in range(row * 2)]}
+    return node.mesh_data
+
+
+class MFnMesh(object):
+    def __init__(self, obj):
+        self.data = get_mesh_data(obj.data or obj.node)
+
+    @property
+    def numVertices(self):
+        return len(self.data["points"])
+
+    @property
+    def numNormals(self):
+        return len(self.data["points"])
+
+    @property
+    def numPolygons(self):
+        return len(self.data["counts"])
+
+    @property
+    def numFaceVertices(self):
+        return len(self.data["vertices"])
+
+    def numUVs(self):
+        return len(self.data["us"])
+
+    def getPoints(self, space=MSpace.kObject):
+        count("MFnMesh.getPoints")
+        return list(self.data["points"])
+
+    def getNormals(self, space=MSpace.kObject):
+        count("MFnMesh.getNormals")
+        return [(0.0, 0.0, 1.0)] * len(self.data["points"])
+
+    def getVertices(self):
+        count("MFnMesh.getVertices")
+        return list(self.data["counts"]), list(self.data["vertices"])
+
+    def getAssignedUVs(self):
+        count("MFnMesh.getAssignedUVs")
+        return list(self.data["counts"]), list(self.data["vertices"])
+
+    def getNormalIds(self):
+        count("MFnMesh.getNormalIds")
+        return list(self.data["counts"]), list(self.data["vertices"])
+
+    def getUVs(self):
+        count("MFnMesh.getUVs")
+        return list(self.data["us"]), list(self.data["vs"])
+
+
+class MSceneMessage(object):
+    kAfterPluginUnload = 0
+
+    @staticmethod
+    def addStringArrayCallback(message, function):
+        return 0
+
+
+API_NAMES = ["MAngle", "MDGContext", "MDistance", "MFn", "MFnAttribute", "MFnDependencyNode", "MFnEnumAttribute",
+             "MFnMesh", "MFnNumericAttribute", "MFnNumericData", "MFnUnitAttribute", "MObject", "MObjectHandle",
+             "MPlug", "MSceneMessage", "MSelectionList", "MSpace", "MTime"]
+
+
+def get_api(mock_commands):
+    """
+        Bind the classes to the commands of the scene
+
+        :param
+            mock_commands(mock_maya.MockCommands): Installed mock commands
+
+        :return
+            (dict): Classes of the OpenMaya module by name
+    """
+    global commands
+    commands = mock_commands
+    return dict((name, globals()[name]) for name in API_NAMES)
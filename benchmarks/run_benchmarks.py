@@ -0,0 +1,302 @@
+"""
+    Benchmark export and import paths on synthetic scenes with mock maya.cmds, no maya is needed
+
+    python run_benchmarks.py --sizes 100 1000 5000 --latency 0.00005 --output D:/benchmark.json
+
+    Command count, OpenMaya call count, wall time and peak python memory are reported for every path and
+    scene size. Wall time is measured in a separate run from memory, tracemalloc slows the code down.
+    Plugins are loaded before the cases, so the one time plugin query is not counted in the first case.
+
+    Pose and obj sequence paths read the mock scene through mock_openmaya, its values do not change over
+    time. Import cases measure the package code around the import command, the mock does not build the file
+    content into the scene.
+"""
+import argparse
+import importlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+def create_scene(**kwargs):
+    # Package modules are imported in the functions, this file also runs as a script before the package import
+    from . import scene_generator
+    return scene_generator.create_scene(**kwargs)
+
+
+def write_import_files(work_dir, file_count, vertex_count):
+    """
+        Write small valid files of every import type, every tenth file is broken
+
+        :return
+            (list): File paths
+    """
+    paths = list()
+    for index in range(file_count):
+        extension = [".fbx", ".obj", ".abc"][index % 3]
+        file_path = os.path.join(work_dir, "import_{0}{1}".format(index, extension))
+        with open(file_path, "wb") as out_file:
+            if index % 10 == 9:
+                out_file.write(b"\x00broken")
+            elif extension == ".fbx":
+                out_file.write(b"; FBX 7.4.0 project file\n" + b"Vertices: 0,0,0\n" * vertex_count)
+            elif extension == ".obj":
+                out_file.write(b"# obj\n" + b"v 0 0 0\n" * vertex_count)
+            else:
+                out_file.write(b"Ogawa" + b"\x00" * vertex_count)
+        paths.append(file_path)
+    return paths
+
+
+def setup_alembic_export(utility, commands, size, work_dir):
+    commands.scene = create_scene(mesh_size=size)
+    return lambda: utility.alembic_export("|geo_grp", False, 1, os.path.join(work_dir, "geo.abc"))
+
+
+def setup_alembic_batch_export(utility, commands, size, work_dir):
+    commands.scene = create_scene(mesh_size=size)
+    roots = commands.listRelatives("|geo_grp", children=True, fullPath=True)
+    return lambda: utility.export_batch(roots, "Alembic", False, 1, work_dir)
+
+
+def setup_fbx_export(utility, commands, size, work_dir):
+    commands.scene = create_scene(mesh_size=size)
+    return lambda: utility.fbx_export("|geo_grp", os.path.join(work_dir, "geo.fbx"))
+
+
+def setup_obj_export(utility, commands, size, work_dir):
+    commands.scene = create_scene(mesh_size=size)
+    return lambda: utility.obj_export("|geo_grp", 1, os.path.join(work_dir, "geo.obj"))
+
+
+def setup_obj_sequence_export(utility, commands, size, work_dir):
+    commands.scene = create_scene(mesh_size=size)
+    return lambda: utility.obj_export("|geo_grp", 1, os.path.join(work_dir, "geo.obj"), anim_export=True,
+                                      frame_range=(1, 10))
+
+
+def setup_pose_transforms(utility, commands, size, work_dir):
+    commands.scene = create_scene(rig_size=size)
+    return lambda: utility.get_pose_transforms("|rig_grp")
+
+
+def setup_pose_export(utility, commands, size, work_dir, anim_export=False):
+    commands.scene = create_scene(rig_size=size)
+    return lambda: utility.pose_export("|rig_grp", 1, os.path.join(work_dir, "rig.json"), anim_export=anim_export)
+
+
+def setup_pose_export_animated(utility, commands, size, work_dir):
+    return setup_pose_export(utility, commands, size, work_dir, anim_export=True)
+
+
+def setup_pose_import(utility, commands, size, work_dir):
+    commands.scene = create_scene(rig_size=size)
+    file_path = os.path.join(work_dir, "rig.json")
+    utility.pose_export("|rig_grp", 1, file_path)
+
+    # Move the rig away from the pose, so the import has values to set
+    for node in commands.scene.nodes.values():
+        for attr, value in node.attrs.items():
+            if isinstance(value, float):
+                node.attrs[attr] = value + 1.0
+    return lambda: utility.import_pose(file_path)
+
+
+def setup_pose_import_animated(utility, commands, size, work_dir):
+    commands.scene = create_scene(rig_size=size)
+    frames = [float(frame) for frame in range(1, 25)]
+    pose_data = {"data_trader": "Pose", "data_trader_frames": frames}
+    for node in commands.scene.nodes.values():
+        if node.name.startswith("ctrl_") and node.node_type == "transform":
+            pose_data[node.path] = dict((attr, [frame * 0.1 for frame in frames]) for attr in node.keyable
+                                        if attr.startswith(("translate", "rotate")))
+
+    file_path = os.path.join(work_dir, "rig.json")
+    with open(file_path, "w") as out_file:
+        json.dump(pose_data, out_file)
+    return lambda: utility.import_pose(file_path)
+
+
+def setup_shader_export(utility, commands, size, work_dir, bundle=False):
+    commands.scene = create_scene(mesh_size=size)
+    return lambda: utility.shader_export("|geo_grp", work_dir, bundle=bundle)
+
+
+def setup_shader_export_bundle(utility, commands, size, work_dir):
+    return setup_shader_export(utility, commands, size, work_dir, bundle=True)
+
+
+def setup_shader_export_unchanged(utility, commands, size, work_dir):
+    run = setup_shader_export(utility, commands, size, work_dir)
+    run()
+    return run
+
+
+def setup_shader_import(utility, commands, size, work_dir, bundle=False):
+    from . import scene_generator
+
+    commands.scene = create_scene(mesh_size=size)
+    utility.shader_export("|geo_grp", work_dir, bundle=bundle)
+    scene_generator.clear_shaders(commands.scene)
+    return lambda: utility.import_shader(os.path.join(work_dir, "geo_grp"))
+
+
+def setup_shader_import_bundle(utility, commands, size, work_dir):
+    return setup_shader_import(utility, commands, size, work_dir, bundle=True)
+
+
+def setup_fbx_import(utility, commands, size, work_dir):
+    commands.scene = create_scene()
+    file_path = write_import_files(work_dir, 1, size)[0]
+    return lambda: utility.import_path(file_path, "FBX")
+
+
+def setup_obj_import(utility, commands, size, work_dir):
+    commands.scene = create_scene()
+    file_path = write_import_files(work_dir, 2, size)[1]
+    return lambda: utility.import_path(file_path, "Obj")
+
+
+def setup_batch_import(utility, commands, size, work_dir):
+    commands.scene = create_scene()
+    paths = write_import_files(work_dir, max(1, size // 10), 100)
+    return lambda: utility.import_batch(paths)
+
+
+CASES = [("Alembic export", setup_alembic_export),
+         ("Alembic batch export", setup_alembic_batch_export),
+         ("FBX export", setup_fbx_export),
+         ("Obj export", setup_obj_export),
+         ("Obj sequence export", setup_obj_sequence_export),
+         ("Pose transforms", setup_pose_transforms),
+         ("Pose export", setup_pose_export),
+         ("Pose export animated", setup_pose_export_animated),
+         ("Pose import", setup_pose_import),
+         ("Pose import animated", setup_pose_import_animated),
+         ("Shader export", setup_shader_export),
+         ("Shader export unchanged", setup_shader_export_unchanged),
+         ("Shader export bundle", setup_shader_export_bundle),
+         ("Shader import", setup_shader_import),
+         ("Shader import bundle", setup_shader_import_bundle),
+         ("FBX import", setup_fbx_import),
+         ("Obj import", setup_obj_import),
+         ("Batch import", setup_batch_import)]
+
+
+def measure(utility, commands, setup, size, memory=False):
+    """
+        Build the scene and run the case once
+
+        :param
+            utility(module): Package utility module
+            commands(mock_maya.MockCommands): Installed mock commands
+            setup(function): Case setup which returns the function to measure
+            size(int): Scene size
+            memory(bool): Trace python memory instead of timing
+
+        :return
+            (tuple): Wall time, call count per command and OpenMaya method and peak memory in bytes
+    """
+    work_dir = tempfile.mkdtemp(prefix="data_trader_benchmark_")
+    try:
+        run = setup(utility, commands, size, work_dir)
+        commands.calls.clear()
+
+        if memory:
+            tracemalloc.start()
+        start = time.time()
+        try:
+            run()
+            wall_time = time.time() - start
+            peak = tracemalloc.get_traced_memory()[1] if memory else None
+        finally:
+            if memory:
+                tracemalloc.stop()
+        return wall_time, dict(commands.calls), peak
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run_benchmarks(sizes, latency=0.0, case_names=None):
+    """
+        Run every case for every scene size
+
+        :param
+            sizes(list): Number of meshes or controls of the scenes
+            latency(float): Seconds added to every command call
+            case_names(list): Run only these cases
+
+        :return
+            (list): Result of every case and size
+    """
+    from . import mock_maya
+    commands = mock_maya.install(mock_maya.MockScene(), latency)
+    from .. import utility
+
+    # Registry is filled once per session in maya, the first case would count the plugin queries
+    for plugin in utility.PLUGINS:
+        utility.load_plugin(plugin)
+
+    results = list()
+    for name, setup in CASES:
+        if case_names and name not in case_names:
+            continue
+        for size in sizes:
+            wall_time, calls, peak = measure(utility, commands, setup, size)
+            if tracemalloc:
+                peak = measure(utility, commands, setup, size, memory=True)[2]
+            api_count = sum(count for call, count in calls.items() if call.startswith("api."))
+            results.append({"case": name, "size": size, "wall_time": wall_time, "peak_memory": peak,
+                            "call_count": sum(calls.values()) - api_count, "api_call_count": api_count,
+                            "calls": calls})
+    return results
+
+
+def main(argv=None):
+    """
+        Command line entry
+
+        :param
+            argv(list): Command line arguments
+
+        :return
+            (int): Exit code
+    """
+    parser = argparse.ArgumentParser(description="Data Trader benchmarks")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 5000], help="Scene sizes")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every command call")
+    parser.add_argument("--case", action="append", dest="cases", help="Run only this case, can repeat")
+    parser.add_argument("--output", help="Write results to json file")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.latency, args.cases)
+
+    sys.stdout.write("{0:<26}{1:>8}{2:>10}{3:>12}{4:>12}{5:>12}\n".format("Case", "Size", "Calls", "API calls",
+                                                                          "Time (ms)", "Peak (KB)"))
+    for result in results:
+        peak = "-" if result["peak_memory"] is None else "{0:.1f}".format(result["peak_memory"] / 1024.0)
+        sys.stdout.write("{0:<26}{1:>8}{2:>10}{3:>12}{4:>12.2f}{5:>12}\n".format(
+            result["case"], result["size"], result["call_count"], result["api_call_count"],
+            result["wall_time"] * 1000, peak))
+
+    if args.output:
+        with open(args.output, "w") as out_file:
+            json.dump(results, out_file, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    # Import through the package so relative imports work
+    package_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if os.path.dirname(package_path) not in sys.path:
+        sys.path.append(os.path.dirname(package_path))
+
+    run_benchmarks_module = importlib.import_module(os.path.basename(package_path) + ".benchmarks.run_benchmarks")
+    sys.exit(run_benchmarks_module.main(sys.argv[1:]))
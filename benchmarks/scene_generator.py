@@ -0,0 +1,107 @@
+"""
+    Build synthetic rigs and shaded scenes of any size in mock scene
+"""
+from . import mock_maya
+
+TRANSFORM_ATTRS = ["translateX", "translateY", "translateZ", "rotateX", "rotateY", "rotateZ",
+                   "scaleX", "scaleY", "scaleZ", "visibility"]
+
+
+def build_rig(scene, size, chain_length=10):
+    """
+        Add rig of nurbs curve controls, controls are parented in chains like limbs
+
+        :param
+            scene(mock_maya.MockScene): Scene to fill
+            size(int): Number of controls
+            chain_length(int): Number of controls in one chain
+
+        :return
+            (str): Full path of rig root
+    """
+    root = scene.create_node("transform", "rig_grp")
+    parent = root.name
+    for index in range(size):
+        if index % chain_length == 0:
+            parent = root.name
+
+        attrs = dict((attr, True if attr == "visibility" else 1.0 if attr.startswith("scale") else 0.0)
+                     for attr in TRANSFORM_ATTRS)
+        control = scene.create_node("transform", "ctrl_{0}".format(index), parent, attrs)
+        scene.create_node("nurbsCurve", "ctrl_{0}Shape".format(index), control.name)
+        parent = control.name
+
+    return root.path
+
+
+def build_shaded_scene(scene, size, shader_count=None, face_count=100):
+    """
+        Add meshes with shaders, every third mesh has its faces split between two shaders
+
+        :param
+            scene(mock_maya.MockScene): Scene to fill
+            size(int): Number of meshes
+            shader_count(int): Number of shaders, one for ten meshes when it is not given
+            face_count(int): Number of faces of each mesh
+
+        :return
+            (str): Full path of geometry root
+    """
+    shader_count = shader_count or max(1, size // 10)
+    shaders = list()
+    for index in range(shader_count):
+        material = scene.create_node("lambert", "shader_{0}Mat".format(index))
+        engine = scene.create_node("shadingEngine", "shader_{0}SG".format(index))
+        scene.connect(material.name, engine.name)
+        shaders.append(engine.name)
+
+    root = scene.create_node("transform", "geo_grp")
+    for index in range(size):
+        transform = scene.create_node("transform", "mesh_{0}".format(index), root.name,
+                                      dict((attr, 0.0) for attr in TRANSFORM_ATTRS))
+        shape = scene.create_node("mesh", "mesh_{0}Shape".format(index), transform.name)
+
+        shader = shaders[index % shader_count]
+        if index % 3 or shader_count == 1:
+            scene.members[shader].append(shape.name)
+        else:
+            half = face_count // 2
+            scene.members[shader].append("{0}.f[0:{1}]".format(shape.name, half - 1))
+            other = shaders[(index + 1) % shader_count]
+            scene.members[other].append("{0}.f[{1}:{2}]".format(shape.name, half, face_count - 1))
+
+    return root.path
+
+
+def clear_shaders(scene):
+    """
+        Remove the shading networks and put every mesh back to the default shader
+
+        :param
+            scene(mock_maya.MockScene): Scene to change
+    """
+    meshes = [node.name for node in scene.nodes.values() if node.node_type == "mesh"]
+    for node in list(scene.nodes.values()):
+        if node.name in scene.nodes and node.node_type in ("shadingEngine", "lambert") and \
+                node.name != "initialShadingGroup":
+            scene.remove_node(node)
+    scene.members["initialShadingGroup"] = meshes
+
+
+def create_scene(rig_size=0, mesh_size=0):
+    """
+        Create new mock scene with rig and meshes
+
+        :param
+            rig_size(int): Number of controls
+            mesh_size(int): Number of meshes
+
+        :return
+            (mock_maya.MockScene): New scene
+    """
+    scene = mock_maya.MockScene()
+    if rig_size:
+        build_rig(scene, rig_size)
+    if mesh_size:
+        build_shaded_scene(scene, mesh_size)
+    return scene
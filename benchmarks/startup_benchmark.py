@@ -0,0 +1,145 @@
+"""
+    Benchmark tool startup inside maya, it needs the maya gui to get paint events
+
+    from data_trader.benchmarks import startup_benchmark
+    startup_benchmark.run_startup_benchmark(scene="D:/shots/heavy.ma", repeat=5, output="D:/startup.json")
+
+    Every run imports the package again and opens the window, the times are seconds from the start of the run:
+        import          package modules imported
+        window          window object is made and shown
+        first_paint     window is painted for the first time
+        interactive     outliner is filled, the tool can be used
+        plugins_warmed  export plugins are loaded in idle time, one plugin per idle event
+    Maya keeps the plugins after the first run, later runs show only the registry cost of the warmup.
+"""
+import importlib
+import json
+import sys
+import time
+
+from PySide2 import QtCore, QtWidgets
+from maya import cmds
+from maya.api import OpenMaya
+
+PACKAGE = __name__.rsplit(".", 2)[0]
+METRICS = ["import", "window", "first_paint", "interactive", "plugins_warmed"]
+
+
+class PaintWatcher(QtCore.QObject):
+    """
+        Remember the time of the first paint event of the watched widget
+    """
+    def __init__(self, start):
+        super(PaintWatcher, self).__init__()
+        self.start = start
+        self.painted = None
+
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Paint and self.painted is None:
+            self.painted = time.time() - self.start
+        return False
+
+
+def unload_package():
+    """
+        Remove the package modules so the next import runs them again, benchmark modules are kept
+    """
+    utility = sys.modules.get(PACKAGE + ".utility")
+    if utility is not None and utility.plugin_callback is not None:
+        OpenMaya.MMessage.removeCallback(utility.plugin_callback)
+
+    for name in list(sys.modules):
+        if (name == PACKAGE or name.startswith(PACKAGE + ".")) and not name.startswith(PACKAGE + ".benchmarks"):
+            del sys.modules[name]
+
+
+def measure_startup(timeout=60.0):
+    """
+        Import the package, open the window and wait until the startup work is done
+
+        :param
+            timeout(float): Seconds to wait for the deferred work
+
+        :return
+            (dict): Seconds from the start for each metric, None when it did not happen
+    """
+    unload_package()
+    application = QtWidgets.QApplication.instance()
+    times = dict((metric, None) for metric in METRICS)
+
+    start = time.time()
+    module = importlib.import_module(PACKAGE + ".data_trader_ui")
+    times["import"] = time.time() - start
+
+    ui = module.show_ui()
+    times["window"] = time.time() - start
+
+    # Deferred work runs from the event loop, so the filter and signals are in place before it
+    watcher = PaintWatcher(start)
+    ui.installEventFilter(watcher)
+    ui.ready.connect(lambda: times.__setitem__("interactive", time.time() - start))
+    ui.plugins_warmed.connect(lambda: times.__setitem__("plugins_warmed", time.time() - start))
+
+    while time.time() - start < timeout:
+        application.processEvents()
+        if watcher.painted is not None and times["plugins_warmed"] is not None:
+            break
+    times["first_paint"] = watcher.painted
+
+    ui.removeEventFilter(watcher)
+    if ui.dag_model:
+        ui.dag_model.close()
+    module.delete_window(ui.objectName() + "WorkspaceControl")
+    return times
+
+
+def summarize(runs):
+    """
+        :param
+            runs(list): Times of every run
+
+        :return
+            (dict): Minimum, median and maximum of each metric
+    """
+    summary = dict()
+    for metric in METRICS:
+        values = sorted(run[metric] for run in runs if run[metric] is not None)
+        if values:
+            summary[metric] = {"min": values[0], "median": values[len(values) // 2], "max": values[-1]}
+    return summary
+
+
+def run_startup_benchmark(scene=None, repeat=5, output=None):
+    """
+        Measure startup several times and print the summary
+
+        :param
+            scene(str): Scene to open before the runs, outliner cost grows with the scene
+            repeat(int): Number of runs
+            output(str): Json file for the runs and summary
+
+        :return
+            (dict): Runs and summary
+    """
+    if scene:
+        cmds.file(scene, open=True, force=True)
+
+    runs = [measure_startup() for _ in range(repeat)]
+    result = {"scene": cmds.file(query=True, sceneName=True) or "untitled",
+              "dag_nodes": len(cmds.ls(dag=True) or []),
+              "runs": runs,
+              "summary": summarize(runs)}
+
+    sys.stdout.write("{0:<16}{1:>10}{2:>10}{3:>10}\n".format("Metric (ms)", "Min", "Median", "Max"))
+    for metric in METRICS:
+        if metric in result["summary"]:
+            values = result["summary"][metric]
+            sys.stdout.write("{0:<16}{1:>10.1f}{2:>10.1f}{3:>10.1f}\n".format(
+                metric, values["min"] * 1000, values["median"] * 1000, values["max"] * 1000))
+        else:
+            sys.stdout.write("{0:<16}{1:>30}\n".format(metric, "not reached"))
+
+    if output:
+        with open(output, "w") as out_file:
+            json.dump(result, out_file, indent=4)
+    return result
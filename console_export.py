@@ -1,6 +1,8 @@
 """
     This file export data in console mode
 """
+import importlib
+import os
 import sys
 
 from PySide2 import QtWidgets
@@ -28,13 +30,24 @@ def get_maya_file():
 
 
 if __name__ == "__main__":
+    # Import through the package so relative imports work
+    package_path = os.path.dirname(os.path.abspath(__file__))
+    if os.path.dirname(package_path) not in sys.path:
+        sys.path.append(os.path.dirname(package_path))
+    package_name = os.path.basename(package_path)
+
+    # Manifest is given, run batch export without any dialog
+    if len(sys.argv) > 1:
+        batch_export = importlib.import_module(package_name + ".batch_export")
+        sys.exit(batch_export.main(sys.argv[1:]))
+
     # Create Qt Application for dialogs
     app = QtWidgets.QApplication(sys.argv)
 
     # Get maya file
     file_path = get_maya_file()
     if not file_path:
-        print "Maya file not found"
+        sys.stdout.write("Maya file not found\n")
         sys.exit(0)
 
     # Open Maya file
@@ -42,12 +55,7 @@ if __name__ == "__main__":
     cmds.file(file_path, o=True, force=True)
 
     # Load script for export data
-    script_path = "D:/maya_tools"
-
-    if script_path not in sys.path:
-        sys.path.append(script_path)
-
-    from data_trader import data_trader_ui
+    data_trader_ui = importlib.import_module(package_name + ".data_trader_ui")
     ui = data_trader_ui.show_ui()
 
     sys.exit(app.exec_())
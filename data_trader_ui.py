@@ -1,3 +1,4 @@
+import os
 import sys
 
 import shiboken2
@@ -5,7 +6,8 @@ from PySide2 import QtWidgets, QtCore, QtGui
 from maya import OpenMayaUI, cmds
 from maya.app.general.mayaMixin import MayaQWidgetDockableMixin
 
-from . import utility
+# Outliner model and pose library are imported when they are first used
+from . import export_queue, utility
 
 
 def delete_window(window):
@@ -23,7 +25,13 @@ def get_maya_window():
 
 
 class DataTraderUI(MayaQWidgetDockableMixin, QtWidgets.QDialog):
-    def __init__(self, parent=get_maya_window()):
+    # Outliner is built after the window is shown, plugins are loaded after that in idle time
+    ready = QtCore.Signal()
+    plugins_warmed = QtCore.Signal()
+
+    def __init__(self, parent=None):
+        if parent is None:
+            parent = get_maya_window()
         super(DataTraderUI, self).__init__(parent)
 
         # Set window parameter
@@ -38,6 +46,8 @@ class DataTraderUI(MayaQWidgetDockableMixin, QtWidgets.QDialog):
             self.setObjectName(window_title)
 
         # Set variables
+        self.name_index = None
+        self.dag_model = None
         self.start_frame = cmds.playbackOptions(query=True, minTime=True)
         self.end_frame = cmds.playbackOptions(query=True, maxTime=True)
 
@@ -48,6 +58,8 @@ class DataTraderUI(MayaQWidgetDockableMixin, QtWidgets.QDialog):
         """
             It handles application close when run from terminal
         """
+        if self.dag_model:
+            self.dag_model.close()
         sys.exit(0)
 
     def separator(self, title):
@@ -93,7 +105,10 @@ class DataTraderUI(MayaQWidgetDockableMixin, QtWidgets.QDialog):
             import_menu.addAction("FBX")
             import_menu.addAction("Obj")
             import_menu.addAction("Pose")
+            import_menu.addAction("Pose Library")
             import_menu.addAction("Shader")
+            import_menu.addSeparator()
+            import_menu.addAction("Batch Import")
             import_btn.setMenu(import_menu)
 
             import_layout.addWidget(import_btn, 0, 0)
@@ -118,11 +133,28 @@ class DataTraderUI(MayaQWidgetDockableMixin, QtWidgets.QDialog):
 
         export_layout.addWidget(self.export_type, 0, 2)
 
-        self.dag_tree = QtWidgets.QTreeWidget()
-        self.dag_tree.setHeaderLabel("Outliner")
-        self.populate_dag_data()
+        self.search_field = QtWidgets.QLineEdit()
+        self.search_field.setPlaceholderText("Search  (namespace:name, *part of name)")
+        self.search_field.textChanged.connect(self.search_dag)
+
+        self.search_type = QtWidgets.QComboBox()
+        self.search_type.addItems(["All", "transform", "mesh", "nurbsCurve", "joint", "camera"])
+        self.search_type.currentIndexChanged.connect(self.search_dag)
+
+        export_layout.addWidget(self.search_field, 1, 0, 1, 2)
+        export_layout.addWidget(self.search_type, 1, 2)
+
+        self.search_result = QtWidgets.QListWidget()
+        self.search_result.itemClicked.connect(self.reveal_search_item)
+        self.search_result.setVisible(False)
+
+        export_layout.addWidget(self.search_result, 2, 0, 1, 3)
+
+        # Model is set after the first paint, it lists the scene
+        self.dag_tree = QtWidgets.QTreeView()
+        self.dag_tree.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
 
-        export_layout.addWidget(self.dag_tree, 1, 0, 1, 3)
+        export_layout.addWidget(self.dag_tree, 3, 0, 1, 3)
 
         time_layout = QtWidgets.QHBoxLayout()
         start_label = QtWidgets.QLabel(str(self.start_frame))
@@ -134,17 +166,64 @@ class DataTraderUI(MayaQWidgetDockableMixin, QtWidgets.QDialog):
         time_layout.addWidget(self.frame)
         time_layout.addWidget(end_label)
 
-        export_layout.addLayout(time_layout, 2, 0, 1, 2)
+        export_layout.addLayout(time_layout, 4, 0, 1, 2)
 
         export_btn = QtWidgets.QPushButton("Export Data")
         export_btn.clicked.connect(self.export_data)
 
-        export_layout.addWidget(export_btn, 2, 2)
+        export_layout.addWidget(export_btn, 4, 2)
+
+        queue_btn = QtWidgets.QPushButton("Add to Queue")
+        queue_btn.setToolTip("Export in the background while working in the scene")
+        queue_btn.clicked.connect(self.queue_export)
+
+        export_layout.addWidget(queue_btn, 5, 2)
+
+        # Pose keeps only the attributes which are moved from default value
+        self.delta_pose = QtWidgets.QCheckBox("Only changed from default")
+        self.delta_pose.setEnabled(False)
+
+        export_layout.addWidget(self.delta_pose, 5, 0, 1, 2)
+
+        # File name for multiple selection, one folder is asked for all of them
+        self.name_template = QtWidgets.QLineEdit("{scene}_{root}")
+        self.name_template.setToolTip("File name when many objects are exported, tokens: {scene} {root} {type} {frame}")
+
+        export_layout.addWidget(QtWidgets.QLabel("Batch file name"), 6, 0)
+        export_layout.addWidget(self.name_template, 6, 1, 1, 2)
 
         base_layout.addLayout(export_layout)
 
+        base_layout.addLayout(self.separator("Export Queue"))
+
+        self.export_queue = export_queue.ExportQueue(self)
+        self.queue_widget = export_queue.ExportQueueWidget(self.export_queue)
+        base_layout.addWidget(self.queue_widget)
+
         # Make ui visible
         self.show(dockable=dock)
+        QtCore.QTimer.singleShot(0, self.build_outliner)
+
+    def build_outliner(self):
+        """
+            Fill the outliner after the window is shown, then start loading the plugins
+        """
+        from . import outliner_model
+
+        self.dag_model = outliner_model.DagTreeModel(self)
+        self.dag_tree.setModel(self.dag_model)
+        self.ready.emit()
+        if self.search_field.text().strip():
+            self.search_dag()
+
+        utility.warm_plugins(callback=self.on_plugins_warmed)
+
+    def on_plugins_warmed(self):
+        try:
+            self.plugins_warmed.emit()
+        except RuntimeError:
+            # Window is closed before the last plugin
+            pass
 
     def get_import_action(self):
         """
@@ -155,39 +234,123 @@ class DataTraderUI(MayaQWidgetDockableMixin, QtWidgets.QDialog):
             utility.import_file(action)
         elif action == "Pose":
             utility.import_pose()
+        elif action == "Pose Library":
+            self.show_pose_library()
+        elif action == "Batch Import":
+            self.import_directory()
         elif action == "Shader":
             utility.import_shader()
         else:
             utility.message_box("Something went wrong", QtWidgets.QMessageBox.Warning)
 
+    def import_directory(self):
+        """
+            Import every alembic, fbx and obj file of directory and show the summary
+        """
+        directory = QtWidgets.QFileDialog.getExistingDirectory(self, "Batch Import")
+        if not directory:
+            return
+
+        report = utility.import_batch(directory)
+        message = "{0} imported, {1} failed, {2} invalid in {3:.1f} sec".format(
+            report["ok"], report["failed"], report["invalid"], report["validate_time"] + report["import_time"])
+        errors = ["{0}: {1}".format(os.path.basename(info["file"]), info["error"])
+                  for info in report["files"] if info["error"]]
+        if errors:
+            message += "\n\n" + "\n".join(errors[:20])
+        utility.message_box(message, QtWidgets.QMessageBox.Warning if errors else QtWidgets.QMessageBox.Information)
+
+    def show_pose_library(self):
+        """
+            Open pose library browser, directory without catalog is made a library
+        """
+        from . import pose_library
+
+        directory = QtWidgets.QFileDialog.getExistingDirectory(self, "Pose Library")
+        if not directory:
+            return
+
+        if os.path.isfile(os.path.join(directory, pose_library.CATALOG)):
+            library = pose_library.PoseLibrary(directory)
+        else:
+            library = pose_library.create_library(directory)
+
+        self.pose_library_dialog = PoseLibraryDialog(library, self)
+        self.pose_library_dialog.show()
+
     def populate_dag_data(self):
         """
-            Add data into the tree widget
+            Reload the outliner, children are listed again when they are expanded
+        """
+        self.dag_model.reset()
+
+    def search_dag(self):
+        """
+            Show the nodes which match the search text
+        """
+        text = self.search_field.text()
+        self.search_result.clear()
+        self.search_result.setVisible(bool(text.strip()))
+        # Outliner is built after the window is shown, search runs again then
+        if not text.strip() or self.dag_model is None:
+            return
+
+        from . import outliner_model
+
+        # Index is built on first search and kept up to date by scene callbacks
+        if self.name_index is None:
+            from . import name_index
+
+            self.name_index = name_index.NameIndex()
+            self.name_index.build()
+            watcher = self.dag_model.watcher
+            watcher.node_added.connect(self.name_index.mark_changed)
+            watcher.node_removed.connect(self.name_index.mark_changed)
+            watcher.node_renamed.connect(self.rename_in_index)
+            watcher.scene_reset.connect(self.name_index.build)
+
+        node_type = self.search_type.currentText()
+        for path in self.name_index.search(text, None if node_type == "All" else node_type):
+            item = QtWidgets.QListWidgetItem(path.rsplit("|", 1)[-1])
+            item.setData(outliner_model.PATH_ROLE, path)
+            item.setToolTip(path)
+            self.search_result.addItem(item)
+
+    def rename_in_index(self, old_path, new_path):
+        """
+            Update both paths of the renamed node in name index
+
+            :param
+                old_path(str): Full path before rename
+                new_path(str): Full path after rename
+        """
+        self.name_index.mark_changed(old_path)
+        self.name_index.mark_changed(new_path)
+
+    def reveal_search_item(self, item):
         """
-        self.dag_tree.clear()
-        exceptional_item = ["persp", "top", "front", "side"]
+            Select the searched node in outliner
 
-        for obj in cmds.ls(assemblies=True):
-            if obj not in exceptional_item:
-                item_level_1 = QtWidgets.QTreeWidgetItem([obj])
-                for child in cmds.listRelatives(obj, children=True):
-                    item_level_2 = QtWidgets.QTreeWidgetItem([child])
-                    item_level_1.addChild(item_level_2)
+            :param
+                item(QtWidgets.QListWidgetItem): Clicked search result
+        """
+        from . import outliner_model
 
-                self.dag_tree.addTopLevelItem(item_level_1)
+        index = self.dag_model.index_for_path(item.data(outliner_model.PATH_ROLE))
+        if index.isValid():
+            self.dag_tree.setCurrentIndex(index)
+            self.dag_tree.scrollTo(index)
 
     def export_change(self):
         """
             It handles options that are specific to the export type
         """
         current_export_type = self.export_type.currentText()
+        self.delta_pose.setEnabled(current_export_type == "Pose")
 
         if current_export_type == "Shader":
             self.static_export.setEnabled(False)
             self.animate_export.setEnabled(False)
-        elif current_export_type == "Obj" or current_export_type == "Pose":
-            self.static_export.setChecked(True)
-            self.animate_export.setEnabled(False)
         elif current_export_type == "FBX":
             self.animate_export.setChecked(True)
             self.static_export.setEnabled(False)
@@ -195,18 +358,21 @@ class DataTraderUI(MayaQWidgetDockableMixin, QtWidgets.QDialog):
             self.static_export.setEnabled(True)
             self.animate_export.setEnabled(True)
 
-    def export_data(self):
+    def get_export_settings(self):
         """
-            Export selected item from dag_tree
+            Collect the export options from ui
+
+            :return
+                (tuple): Selected objects, export type, animated and frame number, None when they are not valid
         """
-        # Collect required data
+        from . import outliner_model
+
         export_type = self.export_type.currentText()
 
-        try:
-            obj = self.dag_tree.currentItem().text(0)
-        except AttributeError:
+        objs = [index.data(outliner_model.PATH_ROLE) for index in self.dag_tree.selectionModel().selectedRows()]
+        if not objs:
             utility.message_box("Selection not found\nPlease select object", QtWidgets.QMessageBox.Warning)
-            return
+            return None
 
         try:
             frame_number = int(self.frame.text())
@@ -215,27 +381,170 @@ class DataTraderUI(MayaQWidgetDockableMixin, QtWidgets.QDialog):
                 frame_number = None
             else:
                 utility.message_box("Frame Number is not valid", QtWidgets.QMessageBox.Critical)
-                return
+                return None
 
         if self.animate_export.isChecked():
             anim_export = True
         else:
             anim_export = False
 
+        return objs, export_type, anim_export, frame_number
+
+    def get_pose_reference(self):
+        """
+            :return
+                (str): Reference of delta pose, None to write every attribute
+        """
+        if self.export_type.currentText() == "Pose" and self.delta_pose.isChecked():
+            return "default"
+        return None
+
+    def queue_export(self):
+        """
+            Add export of selected items to the queue, output path is asked now and export runs later
+        """
+        settings = self.get_export_settings()
+        if not settings:
+            return
+        objs, export_type, anim_export, frame_number = settings
+
+        if len(objs) > 1 or export_type == "Shader":
+            file_path = utility.get_filepath(export_type, True, QtWidgets.QFileDialog.Directory)
+        else:
+            file_path = utility.get_filepath(export_type, True, QtWidgets.QFileDialog.AnyFile)
+        if not file_path:
+            return
+
+        scene = utility.get_scene_name()
+        for obj in objs:
+            output = file_path
+            if len(objs) > 1 and export_type != "Shader":
+                output = utility.get_batch_output(file_path, self.name_template.text(), obj, export_type,
+                                                  frame_number, scene)
+
+            steps = export_queue.create_steps(export_type, obj, anim_export, frame_number, output,
+                                              self.get_pose_reference())
+            name = "{0} {1}".format(export_type, obj.rsplit("|", 1)[-1])
+            self.export_queue.add(export_queue.ExportJob(name, steps))
+
+    def export_data(self):
+        """
+            Export selected items from dag_tree
+        """
+        # Collect required data
+        settings = self.get_export_settings()
+        if not settings:
+            return
+        objs, export_type, anim_export, frame_number = settings
+
+        if len(objs) > 1:
+            utility.export_batch(objs, export_type, anim_export, frame_number, template=self.name_template.text(),
+                                 pose_reference=self.get_pose_reference())
+            return
+
+        obj = objs[0]
         if export_type == "Alembic":
             utility.alembic_export(obj, anim_export, frame_number)
         elif export_type == "FBX":
             utility.fbx_export(obj)
         elif export_type == "Obj":
-            utility.obj_export(obj, frame_number)
+            utility.obj_export(obj, frame_number, anim_export=anim_export)
         elif export_type == "Pose":
-            utility.pose_export(obj, frame_number)
+            utility.pose_export(obj, frame_number, anim_export=anim_export, reference=self.get_pose_reference())
         elif export_type == "Shader":
             utility.shader_export(obj)
         else:
             utility.message_box("Export Type is currently not supported", QtWidgets.QMessageBox.Warning)
 
 
+class PoseLibraryDialog(QtWidgets.QDialog):
+    """
+        Browse poses from the library catalog, pose files are read only on import
+    """
+    def __init__(self, library, parent=None):
+        super(PoseLibraryDialog, self).__init__(parent)
+        self.library = library
+
+        self.setWindowTitle("Pose Library - " + library.directory)
+        self.setMinimumSize(360, 420)
+
+        layout = QtWidgets.QVBoxLayout(self)
+
+        filter_layout = QtWidgets.QHBoxLayout()
+        self.search_field = QtWidgets.QLineEdit()
+        self.search_field.setPlaceholderText("Search pose")
+        self.search_field.textChanged.connect(self.populate)
+
+        self.rig_filter = QtWidgets.QComboBox()
+        self.rig_filter.currentIndexChanged.connect(self.populate)
+
+        filter_layout.addWidget(self.search_field)
+        filter_layout.addWidget(self.rig_filter)
+        layout.addLayout(filter_layout)
+
+        self.pose_list = QtWidgets.QListWidget()
+        self.pose_list.itemDoubleClicked.connect(self.import_pose)
+        layout.addWidget(self.pose_list)
+
+        button_layout = QtWidgets.QHBoxLayout()
+        refresh_btn = QtWidgets.QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.refresh)
+        duplicate_btn = QtWidgets.QPushButton("Show Duplicates")
+        duplicate_btn.clicked.connect(self.show_duplicates)
+        import_btn = QtWidgets.QPushButton("Import")
+        import_btn.clicked.connect(self.import_pose)
+
+        button_layout.addWidget(refresh_btn)
+        button_layout.addWidget(duplicate_btn)
+        button_layout.addWidget(import_btn)
+        layout.addLayout(button_layout)
+
+        self.populate_rigs()
+
+    def populate_rigs(self):
+        self.rig_filter.blockSignals(True)
+        self.rig_filter.clear()
+        self.rig_filter.addItems(["All rigs"] + self.library.rigs())
+        self.rig_filter.blockSignals(False)
+        self.populate()
+
+    def populate(self, file_paths=None):
+        """
+            List the poses which match the filters
+
+            :param
+                file_paths(list): Poses to list instead of the filter result
+        """
+        if not isinstance(file_paths, list):
+            rig = self.rig_filter.currentText()
+            file_paths = self.library.search(self.search_field.text(), None if rig == "All rigs" else rig)
+
+        self.pose_list.clear()
+        for file_path in file_paths:
+            entry = self.library.poses[self.library.get_key(file_path)]
+            label = entry["name"] + ("  ({0} frames)".format(entry["frame_count"]) if entry["frame_count"] else "")
+            item = QtWidgets.QListWidgetItem(label)
+            item.setData(QtCore.Qt.UserRole, file_path)
+            item.setToolTip("{0}\n{1} controls, {2}".format(file_path, len(entry["controls"]),
+                                                            ", ".join(entry["rigs"])))
+            self.pose_list.addItem(item)
+
+    def refresh(self):
+        """
+            Catalog the files which are added or changed outside of the tool
+        """
+        self.library.sync()
+        self.populate_rigs()
+
+    def show_duplicates(self):
+        self.populate([file_path for paths in self.library.duplicates() for file_path in paths])
+
+    def import_pose(self, *args):
+        item = self.pose_list.currentItem()
+        if item:
+            utility.import_pose(item.data(QtCore.Qt.UserRole))
+
+
 def show_ui():
     """
         Calls the ui class
@@ -0,0 +1,206 @@
+"""
+    Export cache, export is skipped when the fingerprint of root and options is same as the last export
+
+    Fingerprint covers node list and types of the subtree, the parents of the root and their history, keyable
+    values, world matrix of every dag node, geometry, animation curve keys, export options and plugin version.
+    Exports are written in world space, so parents count as much as the subtree. Scenes with expression or
+    script nodes in the history are not cached, their result can change without any of these, neither are
+    roots with a value which can not be read.
+"""
+import hashlib
+import json
+import os
+import struct
+import time
+
+from maya import cmds
+from maya.api import OpenMaya
+
+from . import obj_writer, shared_file
+
+CACHE_MANIFEST = "Export_cache.json"
+CACHE_VERSION = 2
+EXPORT_PLUGINS = {"Alembic": "AbcExport", "FBX": "fbxmaya", "Obj": "objExport"}
+UNCACHEABLE_TYPES = ["expression", "script", "time"]
+
+
+def update_floats(digest, values):
+    digest.update(struct.pack("<{0}d".format(len(values)), *values))
+
+
+def update_geometry(digest, dag_path):
+    """
+        Add geometry data of shape to the hash
+
+        :param
+            digest(hashlib.sha1): Hash to update
+            dag_path(OpenMaya.MDagPath): Shape
+    """
+    if dag_path.hasFn(OpenMaya.MFn.kMesh):
+        fn_mesh = OpenMaya.MFnMesh(dag_path)
+        counts, vertices = fn_mesh.getVertices()
+        us, vs = fn_mesh.getUVs()
+        digest.update(struct.pack("<{0}i".format(len(counts)), *counts))
+        digest.update(struct.pack("<{0}i".format(len(vertices)), *vertices))
+        update_floats(digest, obj_writer.get_flat_values(fn_mesh.getPoints(OpenMaya.MSpace.kObject)))
+        update_floats(digest, list(us) + list(vs))
+    elif dag_path.hasFn(OpenMaya.MFn.kNurbsCurve):
+        update_floats(digest, obj_writer.get_flat_values(
+            OpenMaya.MFnNurbsCurve(dag_path).cvPositions(OpenMaya.MSpace.kObject)))
+
+
+def get_plugin_version(export_type):
+    """
+        :param
+            export_type(str): Type of export
+
+        :return
+            (str): Maya and export plugin version
+    """
+    version = cmds.about(version=True)
+    plugin = EXPORT_PLUGINS.get(export_type)
+    if plugin and cmds.pluginInfo(plugin, query=True, loaded=True):
+        version += " " + plugin + " " + cmds.pluginInfo(plugin, query=True, version=True)
+    return version
+
+
+def get_fingerprint(obj, export_type, options):
+    """
+        Hash everything which changes the exported file
+
+        :param
+            obj(str, list): Name of root object or list of roots
+            export_type(str): Type of export
+            options(dict): Export options like frame range, they must be json serializable
+
+        :return
+            (str): Hex digest, None when the roots can not be cached
+    """
+    from . import utility
+
+    roots = cmds.ls(obj, long=True) or []
+    nodes = roots + (cmds.listRelatives(roots, allDescendents=True, fullPath=True) or [])
+
+    # Keys, constraints and non keyable values of the parents move the exported world space result
+    for root in roots:
+        parts = root.split("|")
+        nodes.extend("|".join(parts[:count]) for count in range(2, len(parts)))
+    history = (cmds.listHistory(nodes) or []) if nodes else []
+    node_types = cmds.ls(sorted(set(nodes + history)), long=True, showType=True) or []
+
+    types = node_types[1::2]
+    if any(node_type in UNCACHEABLE_TYPES for node_type in types):
+        return None
+
+    digest = hashlib.sha1()
+    digest.update(json.dumps([CACHE_VERSION, export_type, options, get_plugin_version(export_type), node_types],
+                             sort_keys=True).encode("utf-8"))
+
+    # One query for the keys of all the curves
+    curves = cmds.ls(history, type="animCurve") if history else []
+    if curves:
+        update_floats(digest, cmds.keyframe(curves, query=True, timeChange=True, valueChange=True) or [])
+        update_floats(digest, cmds.keyTangent(curves, query=True, inAngle=True, outAngle=True) or [])
+
+    selection = OpenMaya.MSelectionList()
+    try:
+        for node in node_types[0::2]:
+            selection.add(node)
+    except RuntimeError:
+        return None
+
+    for index in range(selection.length()):
+        node = selection.getDependNode(index)
+        values = list()
+        for attr, plug in utility.get_keyable_plugs(node):
+            try:
+                value = utility.get_plug_value(plug)
+            except RuntimeError:
+                return None
+            if value is not None:
+                values.append(float(value))
+        update_floats(digest, values)
+
+        if node.hasFn(OpenMaya.MFn.kDagNode):
+            # Matrix covers values which are not keyable like rotate order, pivots and inherits transform
+            dag_path = selection.getDagPath(index)
+            matrix = dag_path.inclusiveMatrix()
+            update_floats(digest, [matrix.getElement(row, column) for row in range(4) for column in range(4)])
+            update_geometry(digest, dag_path)
+
+    return digest.hexdigest()
+
+
+def get_manifest_path(file_path):
+    return os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_MANIFEST)
+
+
+def read_manifest(file_path):
+    """
+        Read cache manifest of the output directory
+
+        :param
+            file_path(str): Output file path
+
+        :return
+            (dict): Cache entry per output file name
+    """
+    manifest_path = get_manifest_path(file_path)
+    if not os.path.isfile(manifest_path):
+        return dict()
+    try:
+        with open(manifest_path, "r") as in_file:
+            return json.load(in_file)
+    except ValueError:
+        return dict()
+
+
+def is_cached(file_path, fingerprint):
+    """
+        Check that the output is written with same fingerprint and all its files are untouched
+
+        :param
+            file_path(str): Output file path
+            fingerprint(str): Fingerprint of the export
+
+        :return
+            (bool): True when the export can be skipped
+    """
+    if fingerprint is None:
+        return False
+
+    entry = read_manifest(file_path).get(os.path.basename(file_path))
+    if not entry or entry["fingerprint"] != fingerprint or not entry["files"]:
+        return False
+
+    directory = os.path.dirname(os.path.abspath(file_path))
+    for name, size in entry["files"].items():
+        path = os.path.join(directory, name)
+        if not os.path.isfile(path) or os.path.getsize(path) != size:
+            return False
+    return True
+
+
+def record(file_path, fingerprint, files=None):
+    """
+        Remember fingerprint of written export
+
+        :param
+            file_path(str): Output file path
+            fingerprint(str): Fingerprint of the export
+            files(list): Written files, output file path when it is not given
+    """
+    if fingerprint is None:
+        return
+
+    files = files or [file_path]
+    entry = {"fingerprint": fingerprint,
+             "time": time.time(),
+             "files": dict((os.path.basename(path), os.path.getsize(path)) for path in files if os.path.isfile(path))}
+
+    # Other process can export into the same directory, read and write the manifest under its lock
+    manifest_path = get_manifest_path(file_path)
+    with shared_file.FileLock(manifest_path + ".lock"):
+        manifest = read_manifest(file_path)
+        manifest[os.path.basename(file_path)] = entry
+        shared_file.write_json(manifest, manifest_path, indent=4, sort_keys=True)
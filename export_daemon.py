@@ -0,0 +1,186 @@
+"""
+    Long running mayapy export worker
+
+    Maya standalone and the export plugins are initialized once, jobs are received over a local socket.
+    Every request and response is a single json line:
+        {"command": "export", "job": {...}}  -> result of batch_export.run_job
+        {"command": "ping"}                  -> {"status": "ok", "jobs": 12, "uptime": 340.2}
+        {"command": "shutdown"}              -> {"status": "ok"}
+
+    Start the worker:
+        mayapy export_daemon.py --port 7720
+"""
+import argparse
+import importlib
+import json
+import os
+import socket
+import sys
+import time
+
+try:
+    import SocketServer as socketserver
+except ImportError:
+    import socketserver
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 7720
+
+
+class ExportRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        """
+            Read one json request and write one json response
+        """
+        try:
+            request = json.loads(self.rfile.readline().decode("utf-8"))
+            response = self.server.run_command(request)
+        except Exception as error:
+            response = {"status": "failed", "error": str(error)}
+
+        self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+
+
+class ExportServer(socketserver.TCPServer):
+    # Maya is not thread safe, requests are handled one by one in the main thread
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        socketserver.TCPServer.__init__(self, address, ExportRequestHandler)
+        self.start_time = time.time()
+        self.job_count = 0
+        self.running = True
+
+    def run_command(self, request):
+        """
+            Run the command of request
+
+            :param
+                request(dict): Request data
+
+            :return
+                (dict): Response data
+        """
+        from maya import cmds
+        from . import batch_export
+
+        command = request.get("command")
+        if command == "ping":
+            return {"status": "ok", "jobs": self.job_count, "uptime": time.time() - self.start_time}
+
+        elif command == "shutdown":
+            self.running = False
+            return {"status": "ok"}
+
+        elif command == "export":
+            result = batch_export.run_job(request["job"])
+            # Reset scene for the next job instead of restarting the process
+            reset_start = time.time()
+            cmds.file(new=True, force=True)
+            result["reset_time"] = time.time() - reset_start
+
+            self.job_count += 1
+            return result
+
+        return {"status": "failed", "error": "Command is not supported: {0}".format(command)}
+
+    def serve(self):
+        """
+            Handle requests until shutdown command is received
+        """
+        while self.running:
+            self.handle_request()
+        self.server_close()
+
+
+def initialize():
+    """
+        Initialize maya standalone and load the export plugins
+
+        :return
+            (float): Startup time in seconds
+    """
+    start = time.time()
+    from maya import standalone
+    standalone.initialize()
+
+    from . import utility
+    # No window to keep responsive, every plugin is loaded before the first job
+    for plugin in utility.PLUGINS:
+        utility.load_plugin(plugin)
+
+    return time.time() - start
+
+
+def send(request, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=None):
+    """
+        Send request to the running worker
+
+        :param
+            request(dict): Request data
+            host(str): Host of the worker
+            port(int): Port of the worker
+            timeout(float): Socket timeout in seconds, wait forever when it is not given
+
+        :return
+            (dict): Response data
+    """
+    connection = socket.create_connection((host, port), timeout)
+    try:
+        connection.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        response = connection.makefile("rb").readline()
+    finally:
+        connection.close()
+
+    if not response:
+        raise IOError("Export worker closed the connection: {0}:{1}".format(host, port))
+    return json.loads(response.decode("utf-8"))
+
+
+def submit(job, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """
+        Export job on the running worker
+
+        :param
+            job(dict): Job dictionary, see batch_export.expand_jobs
+            host(str): Host of the worker
+            port(int): Port of the worker
+
+        :return
+            (dict): Result of the job with timings
+    """
+    return send({"command": "export", "job": job}, host, port)
+
+
+def main(argv=None):
+    """
+        Command line entry
+
+        :param
+            argv(list): Command line arguments
+
+        :return
+            (int): Exit code
+    """
+    parser = argparse.ArgumentParser(description="Data Trader export worker")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Host to listen, keep it local")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen")
+    args = parser.parse_args(argv)
+
+    startup_time = initialize()
+    server = ExportServer((args.host, args.port))
+    sys.stdout.write("Export worker ready on {0}:{1} in {2:.2f} sec\n".format(args.host, args.port, startup_time))
+    sys.stdout.flush()
+
+    server.serve()
+    return 0
+
+
+if __name__ == "__main__":
+    # Import through the package so relative imports work
+    package_path = os.path.dirname(os.path.abspath(__file__))
+    if os.path.dirname(package_path) not in sys.path:
+        sys.path.append(os.path.dirname(package_path))
+
+    export_daemon = importlib.import_module(os.path.basename(package_path) + ".export_daemon")
+    sys.exit(export_daemon.main(sys.argv[1:]))
@@ -0,0 +1,244 @@
+"""
+    Export queue, jobs run one step at a time from qt idle events so maya stays responsive
+
+    Alembic is written in frame chunks or reports its frames while it writes, see utility.iter_alembic_export.
+    FBX export has no frame hook, it is one step which can be cancelled only before it starts.
+"""
+import functools
+import time
+
+from PySide2 import QtCore, QtWidgets
+
+from . import utility
+
+QUEUED = "Queued"
+RUNNING = "Running"
+DONE = "Done"
+FAILED = "Failed"
+CANCELLED = "Cancelled"
+
+
+def iter_single_step(function, *args, **kwargs):
+    """
+        Run export which can not be split as one write step
+
+        :param
+            function(function): Export function
+
+        :return
+            (generator): Stage name, done and total count after each step
+    """
+    yield "gather", 0, 1
+    function(*args, **kwargs)
+    yield "write", 1, 1
+
+
+def create_steps(export_type, obj, anim_export, frame_number, file_path, pose_reference=None):
+    """
+        Create step generator of export, nothing runs until the first step is asked
+
+        :param
+            export_type(str): Type of export
+            obj(str): Name of object
+            anim_export(bool): export animation or static
+            frame_number(int): Frame number which data will export
+            file_path(str): Output path, directory for shader
+            pose_reference(str): "default" or pose file path to write delta pose
+
+        :return
+            (generator): Stage name, done and total count after each step
+    """
+    if export_type == "Alembic":
+        return utility.iter_alembic_export(obj, anim_export, frame_number, file_path)
+    elif export_type == "FBX":
+        return iter_single_step(utility.fbx_export, obj, file_path=file_path)
+    elif export_type == "Obj":
+        return utility.iter_obj_export(obj, frame_number, file_path, anim_export)
+    elif export_type == "Pose":
+        return utility.iter_pose_export(obj, frame_number, file_path, anim_export, reference=pose_reference)
+    elif export_type == "Shader":
+        return utility.iter_shader_export(obj, file_path, dict())
+    raise ValueError("Export type is not supported: {0}".format(export_type))
+
+
+class ExportJob(object):
+    def __init__(self, name, steps):
+        self.name = name
+        self.steps = steps
+        self.status = QUEUED
+        self.stage = ""
+        self.done = 0
+        self.total = 0
+        self.stage_times = dict()
+        self.error = None
+        self.cancel_requested = False
+
+    def run_step(self):
+        """
+            Run next step of the job and add its time to the stage
+
+            :return
+                (bool): True when more steps are left
+        """
+        start = time.time()
+        try:
+            self.stage, self.done, self.total = next(self.steps)
+            return True
+        except StopIteration:
+            self.status = DONE
+        except Exception as error:
+            self.status = FAILED
+            self.error = str(error)
+        finally:
+            stage = self.stage or "gather"
+            self.stage_times[stage] = self.stage_times.get(stage, 0.0) + time.time() - start
+        return False
+
+    def total_time(self):
+        return sum(self.stage_times.values())
+
+
+class ExportQueue(QtCore.QObject):
+    """
+        Run jobs in order on the main thread, one step per idle event
+    """
+    job_added = QtCore.Signal(object)
+    job_changed = QtCore.Signal(object)
+
+    def __init__(self, parent=None):
+        super(ExportQueue, self).__init__(parent)
+        self.jobs = list()
+
+        # Zero interval timer fires when qt has no other event to process
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.run_next_step)
+
+    def add(self, job):
+        """
+            Add job at the end of queue
+
+            :param
+                job(ExportJob): Job to run
+        """
+        self.jobs.append(job)
+        self.job_added.emit(job)
+        self.timer.start()
+
+    def cancel(self, job):
+        """
+            Cancel queued job, running job stops before its next step
+
+            :param
+                job(ExportJob): Job to cancel
+        """
+        if job.status == QUEUED:
+            job.status = CANCELLED
+            self.job_changed.emit(job)
+        elif job.status == RUNNING:
+            job.cancel_requested = True
+
+    def report_frame(self, job, done, total):
+        """
+            Show frame written inside export command of running step
+        """
+        job.stage, job.done, job.total = "write", done, total
+        self.job_changed.emit(job)
+        # Maya is busy in the export command, only paint the progress
+        QtCore.QCoreApplication.processEvents(QtCore.QEventLoop.ExcludeUserInputEvents)
+
+    def clear_finished(self):
+        """
+            Forget the jobs which are not queued or running
+        """
+        self.jobs = [job for job in self.jobs if job.status in (QUEUED, RUNNING)]
+
+    def run_next_step(self):
+        """
+            Run one step of the first unfinished job
+        """
+        jobs = [job for job in self.jobs if job.status in (QUEUED, RUNNING)]
+        if not jobs:
+            return
+
+        job = jobs[0]
+        if job.cancel_requested:
+            job.steps.close()
+            job.status = CANCELLED
+        else:
+            job.status = RUNNING
+            utility.alembic_frame_callback = functools.partial(self.report_frame, job)
+            try:
+                job.run_step()
+            finally:
+                utility.alembic_frame_callback = None
+
+        self.job_changed.emit(job)
+        self.timer.start()
+
+
+class ExportQueueWidget(QtWidgets.QWidget):
+    """
+        List of queued exports with progress and stage timings
+    """
+    def __init__(self, export_queue, parent=None):
+        super(ExportQueueWidget, self).__init__(parent)
+        self.export_queue = export_queue
+        self.job_items = dict()
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.job_tree = QtWidgets.QTreeWidget()
+        self.job_tree.setHeaderLabels(["Job", "Status", "Progress", "Time"])
+        self.job_tree.setRootIsDecorated(False)
+        layout.addWidget(self.job_tree)
+
+        button_layout = QtWidgets.QHBoxLayout()
+        cancel_btn = QtWidgets.QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.cancel_selected)
+        clear_btn = QtWidgets.QPushButton("Clear Finished")
+        clear_btn.clicked.connect(self.clear_finished)
+
+        button_layout.addWidget(cancel_btn)
+        button_layout.addWidget(clear_btn)
+        layout.addLayout(button_layout)
+
+        export_queue.job_added.connect(self.add_job)
+        export_queue.job_changed.connect(self.update_job)
+
+    def add_job(self, job):
+        item = QtWidgets.QTreeWidgetItem([job.name, job.status, "", ""])
+        self.job_tree.addTopLevelItem(item)
+
+        progress = QtWidgets.QProgressBar()
+        progress.setMaximum(1)
+        self.job_tree.setItemWidget(item, 2, progress)
+        self.job_items[id(job)] = (job, item, progress)
+
+    def update_job(self, job):
+        if id(job) not in self.job_items:
+            return
+
+        job, item, progress = self.job_items[id(job)]
+        item.setText(1, job.error and "{0}: {1}".format(job.status, job.error) or job.status)
+        item.setText(3, "{0:.2f} sec".format(job.total_time()))
+        item.setToolTip(3, "\n".join("{0}: {1:.3f} sec".format(stage, value)
+                                     for stage, value in sorted(job.stage_times.items())))
+
+        progress.setMaximum(max(job.total, 1))
+        progress.setValue(job.done)
+        progress.setFormat("{0} %v/%m".format(job.stage) if job.status == RUNNING else "%v/%m")
+
+    def cancel_selected(self):
+        for job, item, progress in self.job_items.values():
+            if item.isSelected():
+                self.export_queue.cancel(job)
+
+    def clear_finished(self):
+        self.export_queue.clear_finished()
+        for key, (job, item, progress) in list(self.job_items.items()):
+            if job.status not in (QUEUED, RUNNING):
+                self.job_tree.takeTopLevelItem(self.job_tree.indexOfTopLevelItem(item))
+                del self.job_items[key]
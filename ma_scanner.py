@@ -0,0 +1,450 @@
+"""
+    Streaming maya ascii scanner, scene content is read without maya
+
+    Only createNode, parent, connectAttr, file, requires and the needed setAttr statements are parsed, so
+    dag hierarchy, node types, shading engine members and playback range are found in seconds.
+    Result of each file is cached by modification time and size.
+
+    python ma_scanner.py D:/shots --processes 8 --output D:/shots/scan.json
+"""
+import argparse
+import hashlib
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+import time
+
+VERSION = 1
+KEYWORDS = ("createNode ", "parent ", "connectAttr ", "setAttr ", "select ", "file ", "requires ")
+DAG_TYPES = set(["transform", "joint", "mesh", "nurbsCurve", "nurbsSurface", "camera", "locator", "lattice",
+                 "baseLattice", "clusterHandle", "ikHandle", "ikEffector", "follicle", "hairSystem", "nucleus",
+                 "nParticle", "particle", "gpuCache", "aiStandIn", "directionalLight", "pointLight", "spotLight",
+                 "areaLight", "ambientLight", "volumeLight", "aiAreaLight", "aiSkyDomeLight", "place3dTexture"])
+TOKEN_PATTERN = re.compile(r'"((?:[^"\\]|\\.)*)"|(\S+)')
+PLAYBACK_PATTERN = re.compile(r"playbackOptions -min (\S+) -max (\S+) -ast (\S+) -aet (\S+)")
+GROUP_PATTERN = re.compile(r"^\.(?:iog|instObjGroups)(?:\[(\d+)\])?\.(?:og|objectGroups)\[(\d+)\]"
+                           r"\.(?:gcl|objectGrpCompList)$")
+MEMBER_PATTERN = re.compile(r"^(?:iog|instObjGroups)(?:\[(\d+)\])?(?:\.(?:og|objectGroups)\[(\d+)\])?$")
+
+
+def tokenize(statement):
+    """
+        Split statement into words, quotes are removed from strings
+
+        :param
+            statement(str): Mel statement without the last ;
+
+        :return
+            (list): Words
+    """
+    return [quoted or unquoted for quoted, unquoted in TOKEN_PATTERN.findall(statement)]
+
+
+def get_flag(tokens, *flags):
+    """
+        Get value of flag
+
+        :param
+            tokens(list): Words of statement
+            flags(str): Short and long name of flag
+
+        :return
+            (str): Value after the flag, None when flag is not given
+    """
+    for index, token in enumerate(tokens[:-1]):
+        if token in flags:
+            return tokens[index + 1]
+    return None
+
+
+def iter_statements(file_path):
+    """
+        Read the statements which scanner needs, long data blocks are skipped line by line
+
+        :param
+            file_path(str): Maya ascii file path
+
+        :return
+            (generator): Statements without the last ;
+    """
+    with io.open(file_path, "r", encoding="utf-8", errors="replace") as in_file:
+        statement = None
+        for line in in_file:
+            if statement is not None:
+                statement += " " + line.strip()
+            else:
+                stripped = line.lstrip()
+                if not stripped.startswith(KEYWORDS):
+                    continue
+                # Only setAttr of component list and scene configuration are needed
+                if stripped.startswith("setAttr ") and "gcl" not in stripped and \
+                        "objectGrpCompList" not in stripped and "playbackOptions" not in stripped:
+                    continue
+                statement = stripped.strip()
+
+            if statement.endswith(";"):
+                yield statement[:-1]
+                statement = None
+
+
+class SceneScan(object):
+    """
+        Scene content built from the statements
+    """
+    def __init__(self):
+        self.nodes = dict()
+        self.shared = set()
+        self.children = set()
+        self.paths_by_name = dict()
+        self.current = None
+        self.component_lists = dict()
+        self.members = list()
+        self.playback_range = None
+        self.animation_range = None
+        self.references = list()
+        self.requires = list()
+
+    def resolve(self, name):
+        """
+            Get full path of node name written in the file
+
+            :param
+                name(str): Name, partial path or full path
+
+            :return
+                (str): Full path, name itself when it is not found
+        """
+        name = name.lstrip(":")
+        if name.startswith("|") or name in self.nodes:
+            return name
+
+        leaf = name.rsplit("|", 1)[-1]
+        for path in reversed(self.paths_by_name.get(leaf, [])):
+            if "|" not in name or path.endswith("|" + name):
+                return path
+        return name
+
+    def add_node(self, path, node_type):
+        self.nodes[path] = node_type
+        self.paths_by_name.setdefault(path.rsplit("|", 1)[-1], list()).append(path)
+
+    def create_node(self, tokens):
+        node_type = tokens[1]
+        name = get_flag(tokens, "-n", "-name")
+        parent = get_flag(tokens, "-p", "-parent")
+        if name is None:
+            return
+
+        if parent:
+            parent_path = self.resolve(parent)
+            path = (parent_path if parent_path.startswith("|") else "|" + parent_path) + "|" + name
+            self.children.add(parent_path)
+        elif node_type in DAG_TYPES:
+            path = "|" + name
+        else:
+            path = name
+
+        self.add_node(path, node_type)
+        if "-s" in tokens or "-shared" in tokens:
+            self.shared.add(path)
+        self.current = path
+
+    def parent_node(self, tokens):
+        names = [token for token in tokens[1:] if not token.startswith("-")]
+        if len(names) < 2:
+            return
+
+        child, parent = self.resolve(names[0]), self.resolve(names[-1])
+        node_type = self.nodes.get(child)
+        if node_type is None:
+            return
+
+        path = (parent if parent.startswith("|") else "|" + parent) + "|" + child.rsplit("|", 1)[-1]
+        self.children.add(parent)
+        if "-add" in tokens or "-a" in tokens:
+            self.add_node(path, node_type)
+            return
+
+        # Move node with its children
+        for item in [item for item in self.nodes if item == child or item.startswith(child + "|")]:
+            self.add_node(path + item[len(child):], self.nodes.pop(item))
+            self.paths_by_name[item.rsplit("|", 1)[-1]].remove(item)
+
+    def set_attr(self, tokens):
+        statement = " ".join(tokens)
+        match = PLAYBACK_PATTERN.search(statement)
+        if match:
+            values = [float(value) for value in match.groups()]
+            self.playback_range = values[:2]
+            self.animation_range = values[2:]
+            return
+
+        match = GROUP_PATTERN.match(tokens[1])
+        if match and self.current:
+            instance, group = int(match.group(1) or 0), int(match.group(2))
+            components = [token for token in tokens[tokens.index("componentList") + 2:]] \
+                if "componentList" in tokens else list()
+            self.component_lists[(self.current, instance, group)] = components
+
+    def connect_attr(self, tokens):
+        plugs = [token for token in tokens[1:] if not token.startswith("-")]
+        if len(plugs) < 2 or "." not in plugs[0] or "." not in plugs[1]:
+            return
+
+        source_node, source_attr = plugs[0].split(".", 1)
+        destination_node, destination_attr = plugs[1].split(".", 1)
+        if destination_attr.split("[")[0] not in ("dsm", "dagSetMembers"):
+            return
+
+        match = MEMBER_PATTERN.match(source_attr)
+        if match:
+            self.members.append((self.resolve(destination_node), self.resolve(source_node),
+                                 int(match.group(1) or 0), match.group(2)))
+
+    def read_file(self, tokens):
+        if "-r" in tokens or "-reference" in tokens:
+            self.references.append({"namespace": get_flag(tokens, "-ns", "-namespace"), "file": tokens[-1]})
+
+    def to_dict(self):
+        """
+            :return
+                (dict): Scan result
+        """
+        shading = dict()
+        for engine, node, instance, group in self.members:
+            members = shading.setdefault(engine, list())
+            if group is None:
+                members.append(node)
+            else:
+                components = self.component_lists.get((node, instance, int(group)), [])
+                members.extend(node + "." + component for component in components)
+
+        assemblies = [path for path, node_type in self.nodes.items()
+                      if path.startswith("|") and path.count("|") == 1 and path not in self.shared and
+                      (node_type in DAG_TYPES or path in self.children)]
+
+        return {"version": VERSION,
+                "nodes": self.nodes,
+                "assemblies": sorted(assemblies),
+                "playback_range": self.playback_range,
+                "animation_range": self.animation_range,
+                "shading": shading,
+                "references": self.references,
+                "requires": self.requires}
+
+
+def scan_file(file_path):
+    """
+        Scan maya ascii file without cache
+
+        :param
+            file_path(str): Maya ascii file path
+
+        :return
+            (dict): Scan result
+    """
+    if not file_path.lower().endswith(".ma"):
+        raise ValueError("Only maya ascii file can be scanned: {0}".format(file_path))
+
+    scan = SceneScan()
+    for statement in iter_statements(file_path):
+        tokens = tokenize(statement)
+        command = tokens[0]
+        if command == "createNode" and len(tokens) > 1:
+            scan.create_node(tokens)
+        elif command == "setAttr" and len(tokens) > 1:
+            scan.set_attr(tokens)
+        elif command == "connectAttr":
+            scan.connect_attr(tokens)
+        elif command == "parent":
+            scan.parent_node(tokens)
+        elif command == "select":
+            name = get_flag(tokens, "-ne", "-noExpand")
+            scan.current = scan.resolve(name) if name else scan.current
+        elif command == "file":
+            scan.read_file(tokens)
+        elif command == "requires" and len(tokens) > 1:
+            scan.requires.append(tokens[-2] if len(tokens) > 2 else tokens[-1])
+
+    return scan.to_dict()
+
+
+def get_cache_path(file_path, cache_dir=None):
+    """
+        Get cache file of scene
+
+        :param
+            file_path(str): Maya ascii file path
+            cache_dir(str): Cache directory, temp directory is used when it is not given
+
+        :return
+            (str): Cache json path
+    """
+    cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "data_trader_scan")
+    key = hashlib.sha1(os.path.normcase(os.path.abspath(file_path)).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, key + ".json")
+
+
+def scan_scene(file_path, cache_dir=None):
+    """
+        Scan maya ascii file, cached result is used while the file is not changed
+
+        :param
+            file_path(str): Maya ascii file path
+            cache_dir(str): Cache directory, temp directory is used when it is not given
+
+        :return
+            (dict): Scan result with file, mtime, size and scan_time
+    """
+    file_stat = os.stat(file_path)
+    cache_path = get_cache_path(file_path, cache_dir)
+    if os.path.isfile(cache_path):
+        try:
+            with open(cache_path, "r") as in_file:
+                cached = json.load(in_file)
+            if cached.get("version") == VERSION and cached.get("mtime") == file_stat.st_mtime and \
+                    cached.get("size") == file_stat.st_size:
+                return cached
+        except ValueError:
+            pass
+
+    start = time.time()
+    result = scan_file(file_path)
+    result.update({"file": file_path.replace("\\", "/"),
+                   "mtime": file_stat.st_mtime,
+                   "size": file_stat.st_size,
+                   "scan_time": time.time() - start})
+
+    if not os.path.isdir(os.path.dirname(cache_path)):
+        os.makedirs(os.path.dirname(cache_path))
+    with open(cache_path, "w") as out_file:
+        json.dump(result, out_file)
+    return result
+
+
+def scan_scene_job(args):
+    """
+        Process pool entry
+
+        :param
+            args(tuple): File path and cache directory
+
+        :return
+            (tuple): File path and scan result or error message
+    """
+    file_path, cache_dir = args
+    try:
+        return file_path, scan_scene(file_path, cache_dir)
+    except Exception as error:
+        return file_path, {"error": str(error)}
+
+
+def scan_directory(directory, processes=None, cache_dir=None, recursive=True):
+    """
+        Scan every maya ascii file of directory in parallel process, call it from python or mayapy
+        not from maya ui as the pool starts new interpreter
+
+        :param
+            directory(str): Directory of scenes
+            processes(int): Number of process, cpu count when it is not given
+            cache_dir(str): Cache directory, temp directory is used when it is not given
+            recursive(bool): Scan sub directories
+
+        :return
+            (dict): Scan result per file path
+    """
+    file_paths = list()
+    for root, dirs, files in os.walk(directory):
+        file_paths.extend(os.path.join(root, name).replace("\\", "/") for name in files
+                          if name.lower().endswith(".ma"))
+        if not recursive:
+            break
+
+    jobs = [(file_path, cache_dir) for file_path in sorted(file_paths)]
+    if len(jobs) < 2 or processes == 1:
+        return dict(scan_scene_job(job) for job in jobs)
+
+    pool = multiprocessing.Pool(min(processes or multiprocessing.cpu_count(), len(jobs)))
+    try:
+        return dict(pool.map(scan_scene_job, jobs, chunksize=1))
+    finally:
+        pool.close()
+        pool.join()
+
+
+def find_node(scan, name):
+    """
+        Check node in scan result
+
+        :param
+            scan(dict): Scan result
+            name(str): Name or full path of node
+
+        :return
+            (bool): True or False, None when node can come from a reference and can not be checked
+    """
+    nodes = scan["nodes"]
+    if name in nodes or ("|" + name.lstrip("|")) in nodes:
+        return True
+
+    leaf = name.rsplit("|", 1)[-1]
+    if "|" not in name and any(path.rsplit("|", 1)[-1] == leaf for path in nodes):
+        return True
+
+    # Referenced content is not written in the scene file
+    namespace = leaf.rsplit(":", 1)[0] if ":" in leaf else None
+    if scan["references"] and (namespace is None or
+                               namespace in [reference["namespace"] for reference in scan["references"]]):
+        return None
+    return False
+
+
+def main(argv=None):
+    """
+        Command line entry
+
+        :param
+            argv(list): Command line arguments
+
+        :return
+            (int): Exit code
+    """
+    parser = argparse.ArgumentParser(description="Data Trader maya ascii scanner")
+    parser.add_argument("path", help="Maya ascii file or directory")
+    parser.add_argument("--processes", type=int, help="Number of process")
+    parser.add_argument("--cache", help="Cache directory")
+    parser.add_argument("--output", help="Write results to json file")
+    args = parser.parse_args(argv)
+
+    if os.path.isdir(args.path):
+        results = scan_directory(args.path, args.processes, args.cache)
+    else:
+        results = dict([scan_scene_job((args.path, args.cache))])
+
+    for file_path, result in sorted(results.items()):
+        if "error" in result:
+            sys.stdout.write("{0}: {1}\n".format(file_path, result["error"]))
+            continue
+        sys.stdout.write("{0}: {1} nodes, {2} assemblies, range {3}, {4:.2f} sec\n".format(
+            file_path, len(result["nodes"]), len(result["assemblies"]), result["playback_range"],
+            result["scan_time"]))
+
+    if args.output:
+        with open(args.output, "w") as out_file:
+            json.dump(results, out_file, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    # Import through the package so the process pool can find the module
+    package_path = os.path.dirname(os.path.abspath(__file__))
+    if os.path.dirname(package_path) not in sys.path:
+        sys.path.append(os.path.dirname(package_path))
+
+    ma_scanner = importlib.import_module(os.path.basename(package_path) + ".ma_scanner")
+    sys.exit(ma_scanner.main(sys.argv[1:]))
@@ -0,0 +1,218 @@
+"""
+    In memory name index of dag nodes for outliner search
+"""
+import bisect
+
+from maya import cmds
+
+# More nodes than this are merged with one sort, less are inserted in place
+SORT_THRESHOLD = 64
+
+
+def split_name(path):
+    """
+        Split namespace and leaf name of the node
+
+        :param
+            path(str): Full path of node
+
+        :return
+            (tuple): Lower case namespace and leaf name
+    """
+    name = path.rsplit("|", 1)[-1].lower()
+    if ":" in name:
+        return tuple(name.rsplit(":", 1))
+    return "", name
+
+
+def get_trigrams(text):
+    """
+        Get three letter parts of text
+
+        :param
+            text(str): Text to split
+
+        :return
+            (set): Trigrams of text
+    """
+    return set(text[index:index + 3] for index in range(len(text) - 2))
+
+
+class NameIndex(object):
+    """
+        Prefix and substring lookup of dag node names, namespace aware and filterable by node type
+    """
+    def __init__(self):
+        self.types = dict()
+        self.sorted_names = list()
+        self.sorted_paths = list()
+        self.trigrams = dict()
+        self.pending = set()
+
+    def __len__(self):
+        return len(self.types)
+
+    def build(self):
+        """
+            Index all the dag nodes of the scene with single ls call
+        """
+        self.types = dict()
+        self.sorted_names = list()
+        self.sorted_paths = list()
+        self.trigrams = dict()
+        self.pending = set()
+        self.add_nodes(cmds.ls(dag=True, long=True, showType=True) or [])
+
+    def add_nodes(self, ls_result):
+        """
+            Add nodes to the index
+
+            :param
+                ls_result(list): Result of cmds.ls with showType, name and type one after other
+        """
+        paths = list()
+        for index in range(0, len(ls_result) - 1, 2):
+            path = ls_result[index]
+            if path not in self.types:
+                paths.append(path)
+            self.types[path] = ls_result[index + 1]
+
+        names = [(split_name(path)[1], path) for path in paths]
+        for leaf, path in names:
+            for trigram in get_trigrams(leaf):
+                self.trigrams.setdefault(trigram, set()).add(path)
+
+        if len(paths) > SORT_THRESHOLD:
+            self.sorted_names.extend(names)
+            self.sorted_names.sort()
+            self.sorted_paths.extend(paths)
+            self.sorted_paths.sort()
+        else:
+            for item in names:
+                bisect.insort(self.sorted_names, item)
+            for path in paths:
+                bisect.insort(self.sorted_paths, path)
+
+    def add(self, path, node_type):
+        """
+            Add one node to the index
+
+            :param
+                path(str): Full path of node
+                node_type(str): Type of node
+        """
+        self.add_nodes([path, node_type])
+
+    def remove(self, path):
+        """
+            Remove node and all its children from the index
+
+            :param
+                path(str): Full path of node
+        """
+        # Children are next to each other in sorted paths
+        start = bisect.bisect_left(self.sorted_paths, path + "|")
+        end = bisect.bisect_left(self.sorted_paths, path + u"|\uffff")
+        paths = self.sorted_paths[start:end]
+        del self.sorted_paths[start:end]
+
+        if path in self.types:
+            position = bisect.bisect_left(self.sorted_paths, path)
+            if position < len(self.sorted_paths) and self.sorted_paths[position] == path:
+                del self.sorted_paths[position]
+            paths.append(path)
+
+        for item in paths:
+            del self.types[item]
+            for trigram in get_trigrams(split_name(item)[1]):
+                self.trigrams.get(trigram, set()).discard(item)
+
+        if len(paths) > SORT_THRESHOLD:
+            removed = set(paths)
+            self.sorted_names = [item for item in self.sorted_names if item[1] not in removed]
+            return
+
+        for item in paths:
+            name = (split_name(item)[1], item)
+            position = bisect.bisect_left(self.sorted_names, name)
+            if position < len(self.sorted_names) and self.sorted_names[position] == name:
+                del self.sorted_names[position]
+
+    def update(self, path):
+        """
+            Index node and its children again from the scene
+
+            :param
+                path(str): Full path of node
+        """
+        self.remove(path)
+        if cmds.objExists(path):
+            self.add_nodes(cmds.ls(path, dag=True, long=True, showType=True) or [])
+
+    def mark_changed(self, path):
+        """
+            Remember the changed node, index is updated on next search
+
+            :param
+                path(str): Full path of node before or after the change
+        """
+        self.pending.add(path)
+
+    def flush(self):
+        """
+            Update all the changed nodes
+        """
+        pending, self.pending = self.pending, set()
+        for path in pending:
+            self.update(path)
+
+    def search(self, text, node_type=None, limit=500):
+        """
+            Find nodes by name
+
+            :param
+                text(str): Name to search, namespace:name limits the result to namespace,
+                           *name search anywhere in the name instead of the start
+                node_type(str): Only return nodes of this type
+                limit(int): Maximum number of results
+
+            :return
+                (list): Full path of matching nodes
+        """
+        text = text.strip().lower()
+        if not text:
+            return list()
+        self.flush()
+
+        namespace = None
+        if ":" in text:
+            namespace, text = text.rsplit(":", 1)
+
+        substring = text.startswith("*")
+        text = text.lstrip("*")
+
+        if not text:
+            candidates = (path for leaf, path in self.sorted_names)
+        elif substring and len(text) >= 3:
+            # Every trigram of the text must be in the name
+            trigram_paths = [self.trigrams.get(trigram, set()) for trigram in get_trigrams(text)]
+            paths = set.intersection(*sorted(trigram_paths, key=len))
+            candidates = sorted(path for path in paths if text in split_name(path)[1])
+        elif substring:
+            candidates = (path for leaf, path in self.sorted_names if text in leaf)
+        else:
+            start = bisect.bisect_left(self.sorted_names, (text, ""))
+            end = bisect.bisect_left(self.sorted_names, (text + u"\uffff", ""))
+            candidates = (path for leaf, path in self.sorted_names[start:end])
+
+        results = list()
+        for path in candidates:
+            if node_type and self.types.get(path) != node_type:
+                continue
+            if namespace is not None and not split_name(path)[0].startswith(namespace):
+                continue
+
+            results.append(path)
+            if len(results) >= limit:
+                break
+        return results
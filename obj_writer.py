@@ -0,0 +1,207 @@
+"""
+    Native obj sequence writer
+
+    Mesh data is read with one MFnMesh call per buffer in time context, so the scene time is not changed.
+    Faces and uvs are cached from the first frame, later frames write only points and normals. Cache is
+    built again when point, face, face vertex, uv or normal count of a mesh changes.
+"""
+import itertools
+
+from maya import cmds
+from maya.api import OpenMaya
+
+
+def get_flat_values(array, size=3):
+    """
+        Flatten point or vector array into one list of floats, API arrays have no buffer so items are
+        read one by one
+
+        :param
+            array(OpenMaya.MPointArray, OpenMaya.MFloatVectorArray): Array to flatten
+            size(int): Number of components to keep per item
+
+        :return
+            (list): Flat values
+    """
+    return list(itertools.chain.from_iterable(tuple(item)[:size] for item in array))
+
+
+def get_topology_counts(fn_mesh):
+    return fn_mesh.numVertices, fn_mesh.numPolygons, fn_mesh.numFaceVertices, fn_mesh.numUVs(), fn_mesh.numNormals
+
+
+class ObjSequenceWriter(object):
+    """
+        Write meshes of object as numbered obj files
+    """
+    def __init__(self, obj):
+        objs = list(obj) if isinstance(obj, (list, tuple)) else [obj]
+        meshes = cmds.listRelatives(objs, allDescendents=True, type="mesh", fullPath=True) or []
+        meshes += [item for item in objs if cmds.objectType(item) == "mesh"]
+        self.meshes = cmds.ls(meshes, noIntermediate=True, long=True) if meshes else []
+
+        selection = OpenMaya.MSelectionList()
+        for mesh in self.meshes:
+            selection.add(mesh)
+
+        # World mesh plug gives world space data in any time context
+        self.plugs = list()
+        self.handles = list()
+        for index, mesh in enumerate(self.meshes):
+            node = selection.getDependNode(index)
+            self.handles.append(OpenMaya.MObjectHandle(node))
+            fn_node = OpenMaya.MFnDependencyNode(node)
+            self.plugs.append(fn_node.findPlug("worldMesh", False).elementByLogicalIndex(0))
+
+        self.topology = None
+        self.topology_counts = None
+
+    def read_meshes(self, context=None):
+        """
+            Read mesh data of all meshes in current context
+
+            :param
+                context(OpenMaya.MDGContext): Time context for maya before 2022, current context when it is None
+
+            :return
+                (list): OpenMaya.MFnMesh for each mesh
+        """
+        # Mesh can be deleted between the frames of step export
+        for mesh, handle in zip(self.meshes, self.handles):
+            if not handle.isValid():
+                raise RuntimeError("Mesh is deleted during export: {0}".format(mesh))
+
+        if context is None:
+            return [OpenMaya.MFnMesh(plug.asMObject()) for plug in self.plugs]
+        return [OpenMaya.MFnMesh(plug.asMObject(context)) for plug in self.plugs]
+
+    def cache_topology(self, fn_meshes):
+        """
+            Build face and uv lines once, index offsets stay same for every frame
+
+            :param
+                fn_meshes(list): OpenMaya.MFnMesh for each mesh
+        """
+        self.topology = list()
+        vertex_offset = uv_offset = normal_offset = 1
+
+        for mesh, fn_mesh in zip(self.meshes, fn_meshes):
+            counts, vertices = fn_mesh.getVertices()
+            uv_counts, uv_ids = fn_mesh.getAssignedUVs()
+            normal_counts, normal_ids = fn_mesh.getNormalIds()
+            us, vs = fn_mesh.getUVs()
+
+            uv_lines = ("vt %.6f %.6f\n" * len(us)) % tuple(itertools.chain.from_iterable(zip(us, vs)))
+
+            face_lines = list()
+            position = uv_position = 0
+            for face, count in enumerate(counts):
+                has_uv = uv_counts[face] == count
+                corners = list()
+                for corner in range(count):
+                    index = position + corner
+                    uv = str(uv_ids[uv_position + corner] + uv_offset) if has_uv else ""
+                    corners.append("{0}/{1}/{2}".format(vertices[index] + vertex_offset, uv,
+                                                        normal_ids[index] + normal_offset))
+                face_lines.append("f " + " ".join(corners) + "\n")
+                position += count
+                uv_position += uv_counts[face]
+
+            name = mesh.rsplit("|", 2)[-2] if mesh.count("|") > 1 else mesh.strip("|")
+            self.topology.append(("g {0}\n".format(name), uv_lines, "".join(face_lines)))
+
+            vertex_offset += fn_mesh.numVertices
+            uv_offset += len(us)
+            normal_offset += fn_mesh.numNormals
+
+    def write_frame(self, file_path, context=None):
+        """
+            Write meshes of current context into obj file
+
+            :param
+                file_path(str): Output obj path
+                context(OpenMaya.MDGContext): Time context for maya before 2022, current context when it is None
+        """
+        fn_meshes = self.read_meshes(context)
+        # Simulation can add or remove points between frames
+        counts = [get_topology_counts(fn_mesh) for fn_mesh in fn_meshes]
+        if counts != self.topology_counts:
+            self.cache_topology(fn_meshes)
+            self.topology_counts = counts
+
+        with open(file_path, "w") as out_file:
+            for fn_mesh, (group_line, uv_lines, face_lines) in zip(fn_meshes, self.topology):
+                points = get_flat_values(fn_mesh.getPoints(OpenMaya.MSpace.kObject))
+                normals = get_flat_values(fn_mesh.getNormals(OpenMaya.MSpace.kObject))
+
+                out_file.write(group_line)
+                out_file.write(("v %.6f %.6f %.6f\n" * (len(points) // 3)) % tuple(points))
+                out_file.write(uv_lines)
+                out_file.write(("vn %.6f %.6f %.6f\n" * (len(normals) // 3)) % tuple(normals))
+                out_file.write(face_lines)
+
+    def iter_write_sequence(self, file_pattern, frames):
+        """
+            Write one obj per frame, yield after every frame
+
+            :param
+                file_pattern(str): Output path with {frame} token like D:/cache/mesh.{frame:04d}.obj
+                frames(list): Frames to write
+
+            :return
+                (generator): Written file path of each frame
+        """
+        for frame, file_path in zip(frames, get_sequence_files(file_pattern, frames)):
+            context = OpenMaya.MDGContext(OpenMaya.MTime(frame, OpenMaya.MTime.uiUnit()))
+
+            # makeCurrent is added in maya 2022, older versions take the context in the plug read
+            if not hasattr(context, "makeCurrent"):
+                self.write_frame(file_path, context)
+                yield file_path
+                continue
+
+            previous_context = context.makeCurrent()
+            try:
+                self.write_frame(file_path)
+            finally:
+                previous_context.makeCurrent()
+            yield file_path
+
+    def write_sequence(self, file_pattern, frames):
+        """
+            Write one obj per frame
+
+            :param
+                file_pattern(str): Output path with {frame} token like D:/cache/mesh.{frame:04d}.obj
+                frames(list): Frames to write
+
+            :return
+                (list): Written file paths
+        """
+        return list(self.iter_write_sequence(file_pattern, frames))
+
+
+def get_sequence_pattern(file_path):
+    """
+        Turn obj path into numbered sequence pattern
+
+        :param
+            file_path(str): Obj file path like D:/cache/mesh.obj
+
+        :return
+            (str): Pattern like D:/cache/mesh.{frame:04d}.obj
+    """
+    base = file_path[:-4] if file_path.lower().endswith(".obj") else file_path
+    return base.replace("{", "{{").replace("}", "}}") + ".{frame:04d}.obj"
+
+
+def get_sequence_files(file_pattern, frames):
+    """
+        :param
+            file_pattern(str): Output path with {frame} token like D:/cache/mesh.{frame:04d}.obj
+            frames(list): Frames to write
+
+        :return
+            (list): File path of each frame
+    """
+    return [file_pattern.format(frame=int(frame)) for frame in frames]
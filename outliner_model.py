@@ -0,0 +1,366 @@
+"""
+    Lazy outliner model, children are listed only when the node is expanded
+"""
+from PySide2 import QtCore
+from maya import cmds
+from maya.api import OpenMaya
+
+EXCEPTIONAL_ITEMS = ["persp", "top", "front", "side"]
+PATH_ROLE = QtCore.Qt.UserRole + 1
+
+
+def get_parent_path(node):
+    """
+        Get full path of first parent of dag node
+
+        :param
+            node(OpenMaya.MObject): Dag node
+
+        :return
+            (str): Full path of parent, empty string for world
+    """
+    parent = OpenMaya.MFnDagNode(node).parent(0)
+    if parent.hasFn(OpenMaya.MFn.kWorld):
+        return ""
+    return OpenMaya.MFnDagNode(parent).fullPathName()
+
+
+def get_child_count(path):
+    """
+        Get number of children of dag node without listing them
+
+        :param
+            path(str): Full path of dag node
+
+        :return
+            (int): Number of children
+    """
+    selection = OpenMaya.MSelectionList()
+    try:
+        selection.add(path)
+        return selection.getDagPath(0).childCount()
+    except RuntimeError:
+        return 0
+
+
+def list_children(path):
+    """
+        List children of dag node
+
+        :param
+            path(str): Full path of dag node, empty string for world
+
+        :return
+            (list): Full path of children
+    """
+    if not path:
+        return [item for item in cmds.ls(assemblies=True, long=True) or []
+                if item.lstrip("|") not in EXCEPTIONAL_ITEMS]
+    return cmds.listRelatives(path, children=True, fullPath=True) or []
+
+
+class SceneWatcher(QtCore.QObject):
+    """
+        Turn maya scene callbacks into qt signals
+    """
+    hierarchy_changed = QtCore.Signal(str)
+    node_added = QtCore.Signal(str)
+    node_removed = QtCore.Signal(str)
+    node_renamed = QtCore.Signal(str, str)
+    scene_reset = QtCore.Signal()
+
+    def __init__(self, parent=None):
+        super(SceneWatcher, self).__init__(parent)
+        self.callback_ids = list()
+
+    def start(self):
+        """
+            Register maya callbacks
+        """
+        if self.callback_ids:
+            return
+
+        self.callback_ids.append(OpenMaya.MDagMessage.addAllDagChangesCallback(self.dag_changed))
+        self.callback_ids.append(OpenMaya.MNodeMessage.addNameChangedCallback(OpenMaya.MObject.kNullObj,
+                                                                             self.name_changed))
+        for message in (OpenMaya.MSceneMessage.kAfterNew, OpenMaya.MSceneMessage.kAfterOpen):
+            self.callback_ids.append(OpenMaya.MSceneMessage.addCallback(message, self.scene_changed))
+
+    def stop(self):
+        """
+            Remove maya callbacks
+        """
+        if self.callback_ids:
+            OpenMaya.MMessage.removeCallbacks(self.callback_ids)
+        self.callback_ids = list()
+
+    def dag_changed(self, message, child, parent, *args):
+        self.hierarchy_changed.emit(parent.fullPathName())
+
+        # Node is created or moved under new parent, path of the whole branch is changed
+        if message == OpenMaya.MDagMessage.kParentAdded:
+            self.node_added.emit(child.fullPathName())
+        elif message == OpenMaya.MDagMessage.kParentRemoved:
+            self.node_removed.emit(child.fullPathName())
+
+    def name_changed(self, node, previous_name, *args):
+        if node.hasFn(OpenMaya.MFn.kDagNode):
+            parent_path = get_parent_path(node)
+            self.hierarchy_changed.emit(parent_path)
+            if previous_name:
+                self.node_renamed.emit(parent_path + "|" + previous_name, OpenMaya.MFnDagNode(node).fullPathName())
+
+    def scene_changed(self, *args):
+        self.scene_reset.emit()
+
+
+class DagItem(object):
+    def __init__(self, path, parent=None, row=0):
+        self.path = path
+        self.name = path.rsplit("|", 1)[-1]
+        self.parent = parent
+        self.children = list()
+        self.fetched = False
+        self.child_count = get_child_count(path) if path else 1
+
+        # Row under the parent, model numbers the children again when they are inserted, removed or moved
+        self.row_number = row
+
+    def row(self):
+        return self.row_number
+
+    def update_rows(self, start=0):
+        """
+            Number the children from the changed row to the end
+
+            :param
+                start(int): First changed row
+        """
+        for row in range(start, len(self.children)):
+            self.children[row].row_number = row
+
+
+class DagTreeModel(QtCore.QAbstractItemModel):
+    """
+        Outliner model which fetch children of node on expand and follow the scene changes
+    """
+    def __init__(self, parent=None):
+        super(DagTreeModel, self).__init__(parent)
+
+        self.root = DagItem("")
+        self.items = {"": self.root}
+        self.dirty_paths = set()
+
+        # Many callbacks come for one edit, refresh once after them
+        self.refresh_timer = QtCore.QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(50)
+        self.refresh_timer.timeout.connect(self.refresh_dirty)
+
+        self.watcher = SceneWatcher(self)
+        self.watcher.hierarchy_changed.connect(self.mark_dirty)
+        self.watcher.scene_reset.connect(self.reset)
+        self.watcher.start()
+
+    def item_from_index(self, index):
+        if index.isValid():
+            return index.internalPointer()
+        return self.root
+
+    def index_from_item(self, item):
+        if item is self.root:
+            return QtCore.QModelIndex()
+        return self.createIndex(item.row(), 0, item)
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        item = self.item_from_index(parent)
+        if column != 0 or row < 0 or row >= len(item.children):
+            return QtCore.QModelIndex()
+        return self.createIndex(row, column, item.children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        return self.index_from_item(index.internalPointer().parent)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self.item_from_index(parent).children)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        item = self.item_from_index(parent)
+        if item.fetched:
+            return bool(item.children)
+        return item.child_count > 0
+
+    def canFetchMore(self, parent):
+        return not self.item_from_index(parent).fetched
+
+    def fetchMore(self, parent):
+        item = self.item_from_index(parent)
+        if item.fetched:
+            return
+
+        paths = list_children(item.path)
+        item.fetched = True
+        if not paths:
+            return
+
+        self.beginInsertRows(parent, 0, len(paths) - 1)
+        for path in paths:
+            self.add_item(item, path, len(item.children))
+        self.endInsertRows()
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        item = index.internalPointer()
+        if role == QtCore.Qt.DisplayRole:
+            return item.name
+        elif role in (PATH_ROLE, QtCore.Qt.ToolTipRole):
+            return item.path
+        return None
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return "Outliner"
+        return None
+
+    def index_for_path(self, path):
+        """
+            Load all the parents of node and get its index
+
+            :param
+                path(str): Full path of node
+
+            :return
+                (QtCore.QModelIndex): Index of node, invalid index when it is not found
+        """
+        item = self.root
+        parts = path.strip("|").split("|")
+        for count in range(1, len(parts) + 1):
+            if not item.fetched:
+                self.fetchMore(self.index_from_item(item))
+
+            current_path = "|" + "|".join(parts[:count])
+            children = [child for child in item.children if child.path == current_path]
+            if not children:
+                return QtCore.QModelIndex()
+            item = children[0]
+
+        return self.index_from_item(item)
+
+    def add_item(self, parent_item, path, row):
+        """
+            Create item and keep it in path lookup
+
+            :param
+                parent_item(DagItem): Parent item
+                path(str): Full path of node
+                row(int): Row under the parent
+        """
+        item = DagItem(path, parent_item, row)
+        parent_item.children.insert(row, item)
+        if row < len(parent_item.children) - 1:
+            parent_item.update_rows(row + 1)
+        self.items[path] = item
+
+    def forget_item(self, item):
+        """
+            Remove item and its loaded children from path lookup
+
+            :param
+                item(DagItem): Item to remove
+        """
+        for child in item.children:
+            self.forget_item(child)
+        if self.items.get(item.path) is item:
+            del self.items[item.path]
+
+    def mark_dirty(self, path):
+        """
+            Remember the node which children are changed
+
+            :param
+                path(str): Full path of node, empty string for world
+        """
+        if path in self.items:
+            self.dirty_paths.add(path)
+            self.refresh_timer.start()
+
+    def refresh_dirty(self):
+        """
+            Update only the changed nodes which are already loaded
+        """
+        dirty_paths, self.dirty_paths = self.dirty_paths, set()
+        for path in dirty_paths:
+            item = self.items.get(path)
+            if item:
+                self.refresh_children(item)
+
+    def refresh_children(self, item):
+        """
+            Apply the difference between loaded and current children of node
+
+            :param
+                item(DagItem): Item to refresh
+        """
+        if not item.fetched:
+            item.child_count = get_child_count(item.path)
+            if item is not self.root:
+                index = self.index_from_item(item)
+                self.dataChanged.emit(index, index)
+            return
+
+        paths = list_children(item.path)
+        if paths == [child.path for child in item.children]:
+            return
+
+        parent_index = self.index_from_item(item)
+        current = set(paths)
+        for row in reversed(range(len(item.children))):
+            child = item.children[row]
+            if child.path not in current:
+                self.beginRemoveRows(parent_index, row, row)
+                self.forget_item(child)
+                del item.children[row]
+                item.update_rows(row)
+                self.endRemoveRows()
+
+        for row, path in enumerate(paths):
+            if row < len(item.children) and item.children[row].path == path:
+                continue
+
+            child = self.items.get(path)
+            if child is not None and child.parent is item:
+                old_row = child.row()
+                self.beginMoveRows(parent_index, old_row, old_row, parent_index, row)
+                item.children.insert(row, item.children.pop(old_row))
+                item.update_rows(row)
+                self.endMoveRows()
+            else:
+                self.beginInsertRows(parent_index, row, row)
+                self.add_item(item, path, row)
+                self.endInsertRows()
+
+    def reset(self):
+        """
+            Rebuild from scratch, used when new scene is opened
+        """
+        self.beginResetModel()
+        self.root = DagItem("")
+        self.items = {"": self.root}
+        self.dirty_paths = set()
+        self.endResetModel()
+
+    def close(self):
+        """
+            Stop following the scene
+        """
+        self.refresh_timer.stop()
+        self.watcher.stop()
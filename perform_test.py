@@ -1,9 +1,30 @@
+import importlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
 import unittest
 
-from maya import standalone, cmds
 from unittest import TestCase
 
+try:
+    from maya import standalone, cmds
+except ImportError:
+    # Tests of pure python modules run without maya
+    standalone = cmds = None
 
+PACKAGE_PATH = os.path.dirname(os.path.abspath(__file__))
+if os.path.dirname(PACKAGE_PATH) not in sys.path:
+    sys.path.append(os.path.dirname(PACKAGE_PATH))
+
+
+def import_package_module(name):
+    return importlib.import_module(os.path.basename(PACKAGE_PATH) + "." + name)
+
+
+@unittest.skipIf(cmds is None, "maya is not available")
 class TestCases(TestCase):
     # Plugin unload test
     def test_unload_plugin(self):
@@ -16,8 +37,274 @@ class TestCases(TestCase):
         self.assertTrue(cmds.pluginInfo("objExport", query=True, loaded=True))
 
 
+class TestScriptEntries(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="data_trader_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    # Worker is started by file path from run_batch, package imports must work without package context
+    def test_batch_worker(self):
+        job_file = os.path.join(self.temp_dir, "jobs.json")
+        result_file = os.path.join(self.temp_dir, "results.json")
+        with open(job_file, "w") as out_file:
+            json.dump([], out_file)
+
+        process = subprocess.Popen([sys.executable, os.path.join(PACKAGE_PATH, "batch_export.py"), "--worker",
+                                    job_file, result_file], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        output, error = process.communicate()
+        error = error.decode("utf-8", "replace")
+        self.assertNotIn("relative import", error)
+        if cmds is not None:
+            self.assertEqual(process.returncode, 0, error)
+
+    # Shard script needs the batch module only when it runs
+    def test_shard_help(self):
+        process = subprocess.Popen([sys.executable, os.path.join(PACKAGE_PATH, "alembic_shard.py"), "--help"],
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        output, error = process.communicate()
+        self.assertEqual(process.returncode, 0, error.decode("utf-8", "replace"))
+
+
+@unittest.skipIf(cmds is None, "maya is not available")
+class TestMemberEncoding(TestCase):
+    def setUp(self):
+        self.utility = import_package_module("utility")
+
+    def expand(self, members):
+        # Single component names of the members, same set means same assignment
+        expanded = set()
+        for member in members:
+            match = self.utility.COMPONENT_PATTERN.match(member)
+            if match:
+                node, component, start, end = match.groups()
+                for index in range(int(start), int(end or start) + 1):
+                    expanded.add("{0}.{1}[{2}]".format(node, component, index))
+            else:
+                expanded.add(member)
+        return expanded
+
+    # Touching and overlapping ranges are merged, other members are kept as they are
+    def test_encode(self):
+        encoded = self.utility.encode_members(["|geo|body.f[0:5]", "|geo|body.f[6]", "|geo|body.f[3:4]",
+                                               "|geo|body.f[10:12]", "|geo|body.vtx[2]", "|geo|ns:arm",
+                                               "|geo|body.map[0:2].uv"])
+        self.assertEqual(encoded["objects"], ["|geo|ns:arm"])
+        self.assertEqual(encoded["components"], {"|geo|body": {"f": [0, 6, 10, 12], "vtx": [2, 2]}})
+        self.assertEqual(encoded["raw"], ["|geo|body.map[0:2].uv"])
+
+    def test_round_trip(self):
+        members = ["|geo|body.f[{0}]".format(index) for index in range(0, 200, 3)] + \
+                  ["|geo|body.f[100:150]", "|geo|hand.e[7:9]", "|geo|head", "|geo|body.f[199]"]
+        encoded = self.utility.encode_members(members)
+        # Encoded data is written as json
+        encoded = json.loads(json.dumps(encoded))
+        self.assertEqual(self.expand(self.utility.decode_members(encoded)), self.expand(members))
+
+    def test_empty(self):
+        self.assertEqual(self.utility.encode_members(None), {"objects": [], "components": {}, "raw": []})
+        self.assertEqual(self.utility.decode_members({}), [])
+
+
+class TestPoseFormat(TestCase):
+    def setUp(self):
+        self.pose_format = import_package_module("pose_format")
+        self.temp_dir = tempfile.mkdtemp(prefix="data_trader_test_")
+        self.file_path = os.path.join(self.temp_dir, "pose" + self.pose_format.EXTENSION)
+        self.pose_data = {"data_trader": "Pose", "data_trader_frames": [1.0, 2.0, 3.0],
+                          u"|rig|hand_L_ctrl": {"tx": 1.5, "visibility": True, "ty": [0.0, 0.5, 1.0]},
+                          u"|rig|ns:foot_\u00e9_ctrl": {"rotate": [(10.0, 20.0, 30.0)]},
+                          u"|rig|arm_R_ctrl": {"rz": -2}}
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    # Every value comes back with the type json pose file gives
+    def test_round_trip(self):
+        self.assertEqual(self.pose_format.write_pose(self.file_path, self.pose_data), [])
+        self.assertEqual(self.pose_format.read_pose(self.file_path),
+                         {"data_trader": "Pose", "data_trader_frames": [1.0, 2.0, 3.0],
+                          u"|rig|hand_L_ctrl": {"tx": 1.5, "visibility": 1.0, "ty": [0.0, 0.5, 1.0]},
+                          u"|rig|ns:foot_\u00e9_ctrl": {"rotate": [(10.0, 20.0, 30.0)]},
+                          u"|rig|arm_R_ctrl": {"rz": -2.0}})
+
+    # Nodes are found by binary search without reading the others
+    def test_node_lookup(self):
+        self.pose_format.write_pose(self.file_path, self.pose_data)
+        with self.pose_format.PoseFile(self.file_path) as pose_file:
+            self.assertEqual(pose_file.node_names(), sorted(key for key in self.pose_data
+                                                            if not key.startswith("data_trader")))
+            self.assertEqual(pose_file.frames, [1.0, 2.0, 3.0])
+            self.assertEqual(pose_file.get_values(u"|rig|arm_R_ctrl"), {"rz": -2.0})
+            self.assertEqual(pose_file.get_values(u"|rig|ns:foot_\u00e9_ctrl"), {"rotate": [(10.0, 20.0, 30.0)]})
+            self.assertIsNone(pose_file.get_values(u"|rig|missing_ctrl"))
+
+    # Values which binary file can not keep are reported before writing
+    def test_unpackable(self):
+        self.pose_data[u"|rig|arm_R_ctrl"].update({"label": "left", "translate": [(0, 0, 0)] * 3})
+        self.assertEqual(self.pose_format.get_unpackable(self.pose_data),
+                         [u"|rig|arm_R_ctrl.label", u"|rig|arm_R_ctrl.translate"])
+        self.assertEqual(self.pose_format.write_pose(self.file_path, self.pose_data),
+                         [u"|rig|arm_R_ctrl.label", u"|rig|arm_R_ctrl.translate"])
+
+    def test_not_pose_file(self):
+        with open(self.file_path, "wb") as out_file:
+            out_file.write(b"\x00" * 64)
+        self.assertRaises(ValueError, self.pose_format.PoseFile, self.file_path)
+
+
+class TestPoseLibrary(TestCase):
+    def setUp(self):
+        self.pose_library = import_package_module("pose_library")
+        self.temp_dir = tempfile.mkdtemp(prefix="data_trader_test_")
+        os.makedirs(os.path.join(self.temp_dir, "hero", "walk"))
+        with open(os.path.join(self.temp_dir, "hero", "Assign_info.json"), "w") as out_file:
+            json.dump({"shader_1SG": ["|hero|body"]}, out_file)
+        with open(os.path.join(self.temp_dir, "hero", "walk", "contact.json"), "w") as out_file:
+            json.dump({"data_trader": "Pose", "|hero|foot_ctrl": {"tx": 1, "visibility": True}}, out_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    # Same values give same hash whatever number type the file has
+    def test_value_hash(self):
+        self.assertEqual(self.pose_library.get_value_hash({"|a": {"tx": 1, "v": True, "rx": -0.0, "ry": 0.1 + 0.2}}),
+                         self.pose_library.get_value_hash({"|a": {"tx": 1.0, "v": 1.0, "rx": 0.0, "ry": 0.3}}))
+
+    # Files which are not poses are read once, until they change
+    def test_rejected(self):
+        library = self.pose_library.create_library(self.temp_dir)
+        self.assertEqual(list(library.poses), ["hero/walk/contact.json"])
+        self.assertIn("hero/Assign_info.json", library.rejected)
+        self.assertEqual(self.pose_library.PoseLibrary(self.temp_dir).refresh(), (0, 0))
+
+    def test_find_library(self):
+        file_path = os.path.join(self.temp_dir, "hero", "walk", "contact.json")
+        self.assertIsNone(self.pose_library.find_library(file_path))
+        self.pose_library.create_library(self.temp_dir)
+        self.assertEqual(self.pose_library.find_library(file_path), self.temp_dir)
+
+
+class TestSplitFrameRange(TestCase):
+    def setUp(self):
+        self.alembic_shard = import_package_module("alembic_shard")
+
+    def test_even(self):
+        self.assertEqual(self.alembic_shard.split_frame_range(1, 100, 4), [(1, 25), (26, 50), (51, 75), (76, 100)])
+
+    # First chunks get one frame more when the range does not divide evenly
+    def test_remainder(self):
+        self.assertEqual(self.alembic_shard.split_frame_range(1001, 1010, 3), [(1001, 1004), (1005, 1007),
+                                                                               (1008, 1010)])
+
+    def test_more_shards_than_frames(self):
+        self.assertEqual(self.alembic_shard.split_frame_range(5, 7, 10), [(5, 5), (6, 6), (7, 7)])
+        self.assertEqual(self.alembic_shard.split_frame_range(5, 5, 4), [(5, 5)])
+        self.assertEqual(self.alembic_shard.split_frame_range(1, 10, 0), [(1, 10)])
+
+    def test_negative_frames(self):
+        self.assertEqual(self.alembic_shard.split_frame_range(-10, 9, 2), [(-10, -1), (0, 9)])
+
+    # Overlap extends the end of each chunk but never past the last frame
+    def test_overlap(self):
+        self.assertEqual(self.alembic_shard.split_frame_range(1, 30, 3, overlap=2), [(1, 12), (11, 22), (21, 30)])
+        self.assertEqual(self.alembic_shard.split_frame_range(1, 3, 3, overlap=5), [(1, 3), (2, 3), (3, 3)])
+
+    def test_chunks_cover_range(self):
+        for shards in range(1, 12):
+            chunks = self.alembic_shard.split_frame_range(1001, 1050, shards)
+            self.assertEqual(chunks[0][0], 1001)
+            self.assertEqual(chunks[-1][1], 1050)
+            for previous, current in zip(chunks, chunks[1:]):
+                self.assertEqual(current[0], previous[1] + 1)
+
+
+SCENE = """//Maya ASCII 2022 scene
+requires maya "2022";
+requires "mtoa" "4.0.0";
+file -rdi 1 -ns "hero" -rfn "heroRN" "D:/assets/hero.ma";
+file -r -ns "hero" -dr 1 -rfn "heroRN" "D:/assets/hero.ma";
+createNode transform -s -n "persp";
+createNode camera -s -n "perspShape" -p "persp";
+createNode transform -n "geo_grp";
+createNode transform -n "body" -p "geo_grp";
+createNode mesh -n "bodyShape" -p "body";
+    setAttr -k off ".v";
+    setAttr -s 2 ".iog[0].og";
+    setAttr ".iog[0].og[0].gcl" -type "componentList" 1 "f[0:9]";
+    setAttr ".iog[0].og[1].gcl" -type "componentList" 2 "f[10:15]" "f[20]";
+    setAttr -s 3 ".vt[0:2]"  0 0 0 1 0 0
+         0 1 0;
+createNode transform -n "prop";
+createNode transform -n "wheel";
+parent "wheel" "prop";
+createNode lambert -n "red";
+createNode shadingEngine -n "redSG";
+createNode shadingEngine -n "blueSG";
+createNode script -n "sceneConfigurationScriptNode";
+    setAttr ".b" -type "string" "playbackOptions -min 1001 -max 1100 -ast 990 -aet 1120 ";
+connectAttr "|geo_grp|body|bodyShape.iog.og[0]" "redSG.dsm" -na;
+connectAttr "bodyShape.iog.og[1]" "blueSG.dsm" -na;
+connectAttr "|prop.iog" "redSG.dsm" -na;
+connectAttr "red.oc" "redSG.ss";
+// End of scene.ma
+"""
+
+
+class TestMaScanner(TestCase):
+    def setUp(self):
+        self.ma_scanner = import_package_module("ma_scanner")
+        self.temp_dir = tempfile.mkdtemp(prefix="data_trader_test_")
+        self.file_path = os.path.join(self.temp_dir, "scene.ma")
+        with open(self.file_path, "w") as out_file:
+            out_file.write(SCENE)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    # Shared default cameras are not assemblies, moved node goes under its new parent
+    def test_assemblies(self):
+        scan = self.ma_scanner.scan_file(self.file_path)
+        self.assertEqual(scan["assemblies"], ["|geo_grp", "|prop"])
+        self.assertEqual(scan["nodes"]["|geo_grp|body|bodyShape"], "mesh")
+        self.assertEqual(scan["nodes"]["|prop|wheel"], "transform")
+        self.assertNotIn("|wheel", scan["nodes"])
+
+    def test_membership(self):
+        scan = self.ma_scanner.scan_file(self.file_path)
+        self.assertEqual(scan["shading"], {"redSG": ["|geo_grp|body|bodyShape.f[0:9]", "|prop"],
+                                           "blueSG": ["|geo_grp|body|bodyShape.f[10:15]",
+                                                      "|geo_grp|body|bodyShape.f[20]"]})
+
+    def test_scene_settings(self):
+        scan = self.ma_scanner.scan_file(self.file_path)
+        self.assertEqual(scan["playback_range"], [1001.0, 1100.0])
+        self.assertEqual(scan["animation_range"], [990.0, 1120.0])
+        self.assertEqual(scan["references"], [{"namespace": "hero", "file": "D:/assets/hero.ma"}])
+        self.assertEqual(scan["requires"], ["maya", "mtoa"])
+
+    # Node of referenced namespace can not be checked from the file
+    def test_find_node(self):
+        scan = self.ma_scanner.scan_file(self.file_path)
+        self.assertTrue(self.ma_scanner.find_node(scan, "body"))
+        self.assertTrue(self.ma_scanner.find_node(scan, "|prop|wheel"))
+        self.assertIsNone(self.ma_scanner.find_node(scan, "hero:root_ctrl"))
+        self.assertFalse(self.ma_scanner.find_node(scan, "other:root_ctrl"))
+
+    def test_cache(self):
+        cache_dir = os.path.join(self.temp_dir, "cache")
+        scan = self.ma_scanner.scan_scene(self.file_path, cache_dir)
+        self.assertTrue(os.path.isfile(self.ma_scanner.get_cache_path(self.file_path, cache_dir)))
+        self.assertEqual(self.ma_scanner.scan_scene(self.file_path, cache_dir)["scan_time"], scan["scan_time"])
+
+    def test_not_maya_ascii(self):
+        self.assertRaises(ValueError, self.ma_scanner.scan_file, os.path.join(self.temp_dir, "scene.mb"))
+
+
 if __name__ == "__main__":
     # Open Maya
-    standalone.initialize()
+    if standalone is not None:
+        standalone.initialize()
 
     unittest.main()
@@ -0,0 +1,301 @@
+"""
+    Compact binary pose file
+
+    Node and attribute names are kept once in a string table and values are packed float64 arrays,
+    the file is read through mmap so values of one node are found without reading the whole file.
+
+    Layout, little endian:
+        header          magic, version, meta size, string count, node count, attribute count
+        meta            json of the data_trader keys like frames
+        string offsets  uint32 for each string and end of the last one
+        strings         utf-8 names
+        nodes           name string, first attribute, attribute count, sorted by name
+        attributes      name string, kind, first value, value count
+        values          float64
+"""
+import json
+import mmap
+import struct
+
+EXTENSION = ".dtpose"
+MAGIC = b"DTPOSE"
+VERSION = 1
+
+HEADER = struct.Struct("<6sHIIII")
+NODE = struct.Struct("<III")
+ATTRIBUTE = struct.Struct("<IBII")
+OFFSET = struct.Struct("<I")
+
+SCALAR = 0
+ANIMATED = 1
+COMPOUND = 2
+
+
+def is_binary_pose(file_path):
+    """
+        Check the format from file extension
+
+        :param
+            file_path(str): Pose file path
+
+        :return
+            (bool): True for binary pose file
+    """
+    return file_path.lower().endswith(EXTENSION)
+
+
+def pack_value(value, frame_count):
+    """
+        Get kind and float values of attribute value
+
+        :param
+            value(bool, int, float, list): Value from pose data
+            frame_count(int): Number of frames of animated pose
+
+        :return
+            (tuple): Kind and list of floats, None when value can not be packed
+    """
+    if isinstance(value, (bool, int, float)):
+        return SCALAR, [float(value)]
+
+    if isinstance(value, list) and value:
+        # Compound value comes as [(x, y, z)] from getAttr
+        if len(value) == 1 and isinstance(value[0], (list, tuple)):
+            value = value[0]
+            kind = COMPOUND
+        elif frame_count and len(value) == frame_count:
+            kind = ANIMATED
+        else:
+            return None
+
+        if all(isinstance(item, (bool, int, float)) for item in value):
+            return kind, [float(item) for item in value]
+    return None
+
+
+def get_unpackable(pose_data):
+    """
+        Find the values which binary pose file can not keep, like strings and animated compounds
+
+        :param
+            pose_data(dict): Pose data same as json pose file
+
+        :return
+            (list): Plugs which value can not be packed
+    """
+    frame_count = len(pose_data.get("data_trader_frames") or [])
+    return sorted(node + "." + attr for node, attrs in pose_data.items() if not node.startswith("data_trader")
+                  for attr, value in attrs.items() if pack_value(value, frame_count) is None)
+
+
+def write_pose(file_path, pose_data):
+    """
+        Write pose data as binary pose file
+
+        :param
+            file_path(str): Output path
+            pose_data(dict): Pose data same as json pose file
+
+        :return
+            (list): Plugs which value could not be packed
+    """
+    meta = dict((key, value) for key, value in pose_data.items() if key.startswith("data_trader"))
+    frame_count = len(meta.get("data_trader_frames") or [])
+
+    strings = list()
+    string_index = dict()
+
+    def add_string(text):
+        if text not in string_index:
+            string_index[text] = len(strings)
+            strings.append(text.encode("utf-8"))
+        return string_index[text]
+
+    nodes = list()
+    attributes = list()
+    values = list()
+    skipped = list()
+
+    # Sorted nodes allow binary search by name in reader
+    items = [(key.encode("utf-8"), key) for key in pose_data if not key.startswith("data_trader")]
+    for encoded, node in sorted(items):
+        first_attribute = len(attributes)
+        for attr, value in sorted(pose_data[node].items()):
+            packed = pack_value(value, frame_count)
+            if packed is None:
+                skipped.append(node + "." + attr)
+                continue
+
+            kind, floats = packed
+            attributes.append(ATTRIBUTE.pack(add_string(attr), kind, len(values), len(floats)))
+            values.extend(floats)
+        nodes.append(NODE.pack(add_string(node), first_attribute, len(attributes) - first_attribute))
+
+    meta_data = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+    offsets = [0]
+    for text in strings:
+        offsets.append(offsets[-1] + len(text))
+
+    with open(file_path, "wb") as out_file:
+        out_file.write(HEADER.pack(MAGIC, VERSION, len(meta_data), len(strings), len(nodes), len(attributes)))
+        out_file.write(meta_data)
+        out_file.write(struct.pack("<{0}I".format(len(offsets)), *offsets))
+        out_file.write(b"".join(strings))
+        out_file.write(b"".join(nodes))
+        out_file.write(b"".join(attributes))
+        out_file.write(struct.pack("<{0}d".format(len(values)), *values))
+
+    return skipped
+
+
+class PoseFile(object):
+    """
+        Random access reader of binary pose file
+
+        with PoseFile("D:/poses/walk.dtpose") as pose_file:
+            values = pose_file.get_values("|rig|hand_L_ctrl")
+    """
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.in_file = open(file_path, "rb")
+        self.data = mmap.mmap(self.in_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, meta_size, self.string_count, self.node_count, self.attribute_count = \
+            HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version > VERSION:
+            self.close()
+            raise ValueError("Not a supported pose file: {0}".format(file_path))
+
+        position = HEADER.size
+        self.meta = json.loads(self.data[position:position + meta_size].decode("utf-8"))
+        self.offsets_start = position + meta_size
+        self.strings_start = self.offsets_start + (self.string_count + 1) * OFFSET.size
+        self.nodes_start = self.strings_start + self.get_offset(self.string_count)
+        self.attributes_start = self.nodes_start + self.node_count * NODE.size
+        self.values_start = self.attributes_start + self.attribute_count * ATTRIBUTE.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.data.close()
+        self.in_file.close()
+
+    def get_offset(self, index):
+        return OFFSET.unpack_from(self.data, self.offsets_start + index * OFFSET.size)[0]
+
+    def get_string_bytes(self, index):
+        start = self.strings_start + self.get_offset(index)
+        return self.data[start:self.strings_start + self.get_offset(index + 1)]
+
+    def get_string(self, index):
+        return self.get_string_bytes(index).decode("utf-8")
+
+    def get_node(self, index):
+        return NODE.unpack_from(self.data, self.nodes_start + index * NODE.size)
+
+    @property
+    def frames(self):
+        return self.meta.get("data_trader_frames")
+
+    def node_names(self):
+        """
+            Get all node names, values are not read
+
+            :return
+                (list): Node names
+        """
+        return [self.get_string(self.get_node(index)[0]) for index in range(self.node_count)]
+
+    def find_node(self, node):
+        """
+            Binary search node in sorted node table
+
+            :param
+                node(str): Node name as it is written
+
+            :return
+                (int): Index of node, None when it is not found
+        """
+        encoded = node.encode("utf-8")
+        low, high = 0, self.node_count
+        while low < high:
+            middle = (low + high) // 2
+            name = self.get_string_bytes(self.get_node(middle)[0])
+            if name < encoded:
+                low = middle + 1
+            elif name > encoded:
+                high = middle
+            else:
+                return middle
+        return None
+
+    def read_node(self, index):
+        """
+            Read attribute values of node by index
+
+            :param
+                index(int): Index of node
+
+            :return
+                (dict): Value of each attribute
+        """
+        name_index, first_attribute, attribute_count = self.get_node(index)
+        values = dict()
+        for attribute in range(first_attribute, first_attribute + attribute_count):
+            attr_index, kind, first_value, value_count = ATTRIBUTE.unpack_from(
+                self.data, self.attributes_start + attribute * ATTRIBUTE.size)
+            floats = list(struct.unpack_from("<{0}d".format(value_count), self.data,
+                                             self.values_start + first_value * 8))
+
+            if kind == SCALAR:
+                values[self.get_string(attr_index)] = floats[0]
+            elif kind == COMPOUND:
+                values[self.get_string(attr_index)] = [tuple(floats)]
+            else:
+                values[self.get_string(attr_index)] = floats
+        return values
+
+    def get_values(self, node):
+        """
+            Read attribute values of one node
+
+            :param
+                node(str): Node name as it is written
+
+            :return
+                (dict): Value of each attribute, None when node is not in the file
+        """
+        index = self.find_node(node)
+        if index is None:
+            return None
+        return self.read_node(index)
+
+    def to_dict(self):
+        """
+            Read whole file in the same form as json pose file
+
+            :return
+                (dict): Pose data
+        """
+        pose_data = dict(self.meta)
+        for index in range(self.node_count):
+            pose_data[self.get_string(self.get_node(index)[0])] = self.read_node(index)
+        return pose_data
+
+
+def read_pose(file_path):
+    """
+        Read whole binary pose file
+
+        :param
+            file_path(str): Pose file path
+
+        :return
+            (dict): Pose data same as json pose file
+    """
+    with PoseFile(file_path) as pose_file:
+        return pose_file.to_dict()
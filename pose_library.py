@@ -0,0 +1,349 @@
+"""
+    Pose library, a directory of pose files with catalog index
+
+    Catalog keeps name, rigs, controls, value hash and capture time of every pose, browsing and
+    filtering use only the catalog. Pose export into the library updates the catalog. Capture time is the
+    modified time of the pose file, pose files do not keep it so same pose writes same file.
+
+    Many artists can export into the same library, the catalog is read, changed and written while
+    holding its lock file, and the written file replaces the catalog in one rename.
+"""
+import hashlib
+import json
+import os
+import time
+
+from . import pose_format, shared_file
+
+CATALOG = "catalog.json"
+CATALOG_LOCK = "catalog.json.lock"
+POSE_EXTENSIONS = (".json", pose_format.EXTENSION)
+# Pose file is looked up in the library of its directory and this many parents of it
+LIBRARY_DEPTH = 4
+VALUE_PRECISION = 5
+
+
+def is_library(directory):
+    """
+        :param
+            directory(str): Directory to check
+
+        :return
+            (bool): True when the directory has a pose catalog, other tools can write catalog.json too
+    """
+    catalog_path = os.path.join(directory, CATALOG)
+    if not os.path.isfile(catalog_path):
+        return False
+    try:
+        with open(catalog_path, "r") as in_file:
+            catalog = json.load(in_file)
+    except (IOError, OSError, ValueError):
+        return False
+    return isinstance(catalog, dict) and "poses" in catalog
+
+
+def find_library(file_path):
+    """
+        Find the library which contain the file
+
+        :param
+            file_path(str): Pose file path
+
+        :return
+            (str): Library directory, None when the file is not in a library
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    for _ in range(LIBRARY_DEPTH + 1):
+        if is_library(directory):
+            return directory
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            break
+        directory = parent
+    return None
+
+
+def read_pose_file(file_path):
+    """
+        Read json or binary pose file
+
+        :param
+            file_path(str): Pose file path
+
+        :return
+            (dict): Pose data, None when file is not a pose
+    """
+    try:
+        if pose_format.is_binary_pose(file_path):
+            return pose_format.read_pose(file_path)
+        with open(file_path, "r") as in_file:
+            pose_data = json.load(in_file)
+    except (IOError, OSError, ValueError):
+        return None
+
+    if not isinstance(pose_data, dict) or pose_data.get("data_trader") != "Pose":
+        return None
+    return pose_data
+
+
+def get_value_hash(pose_data):
+    """
+        Hash of the pose values, same pose saved twice gets same hash. Numbers are hashed as rounded floats,
+        so 1, 1.0 and True of json and binary pose files give same hash
+
+        :param
+            pose_data(dict): Pose data
+
+        :return
+            (str): Hex digest
+    """
+    def rounded(value):
+        if isinstance(value, (bool, int, float)):
+            # Negative zero is written as 0.0
+            return round(float(value), VALUE_PRECISION) + 0.0
+        if isinstance(value, (list, tuple)):
+            return [rounded(item) for item in value]
+        return value
+
+    values = dict((node, dict((attr, rounded(value)) for attr, value in attrs.items()))
+                  for node, attrs in pose_data.items() if not node.startswith("data_trader"))
+    return hashlib.sha1(json.dumps(values, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def get_rigs(controls):
+    """
+        Get rig names from controls, namespace of the control or its top node
+
+        :param
+            controls(list): Full path of controls
+
+        :return
+            (list): Rig names
+    """
+    rigs = set()
+    for control in controls:
+        leaf = control.rsplit("|", 1)[-1]
+        if ":" in leaf:
+            rigs.add(leaf.rsplit(":", 1)[0])
+        else:
+            rigs.add(control.strip("|").split("|")[0])
+    return sorted(rigs)
+
+
+class PoseLibrary(object):
+    """
+        Catalog of the poses in library directory
+
+        library = PoseLibrary("D:/poses")
+        library.refresh()
+        walks = library.search("walk", rig="hero")
+    """
+    def __init__(self, directory):
+        self.directory = directory.replace("\\", "/")
+        self.catalog_path = os.path.join(self.directory, CATALOG)
+        self.poses = dict()
+        # Files which are not poses like the export sidecar json files, they are read again when changed
+        self.rejected = dict()
+        self.load()
+
+    def lock(self):
+        """
+            :return
+                (shared_file.FileLock): Lock of the catalog, hold it from load to save
+        """
+        return shared_file.FileLock(os.path.join(self.directory, CATALOG_LOCK))
+
+    def load(self):
+        """
+            Read the catalog again, changes which are not saved are dropped
+        """
+        self.poses = dict()
+        self.rejected = dict()
+        if os.path.isfile(self.catalog_path):
+            with open(self.catalog_path, "r") as in_file:
+                catalog = json.load(in_file)
+            self.poses = catalog.get("poses", dict())
+            self.rejected = catalog.get("rejected", dict())
+
+    def get_key(self, file_path):
+        return os.path.relpath(os.path.abspath(file_path), os.path.abspath(self.directory)).replace("\\", "/")
+
+    def get_path(self, key):
+        return os.path.join(self.directory, key).replace("\\", "/")
+
+    def add(self, file_path, pose_data=None):
+        """
+            Add or update one pose in the catalog
+
+            :param
+                file_path(str): Pose file path inside the library
+                pose_data(dict): Pose data, file is read when it is not given
+
+            :return
+                (dict): Catalog entry, None when the file is not a pose
+        """
+        if pose_data is None:
+            pose_data = read_pose_file(file_path)
+        if pose_data is None:
+            return None
+
+        controls = sorted(key for key in pose_data if not key.startswith("data_trader"))
+        file_stat = os.stat(file_path)
+        entry = {"name": os.path.splitext(os.path.basename(file_path))[0],
+                 "rigs": get_rigs(controls),
+                 "controls": controls,
+                 "frame_count": len(pose_data.get("data_trader_frames") or []),
+                 "delta": bool(pose_data.get("data_trader_delta")),
+                 "value_hash": get_value_hash(pose_data),
+                 "captured": file_stat.st_mtime,
+                 "mtime": file_stat.st_mtime,
+                 "size": file_stat.st_size}
+        self.poses[self.get_key(file_path)] = entry
+        return entry
+
+    def refresh(self):
+        """
+            Catalog new and changed files and forget the deleted ones, unchanged files are not read
+
+            :return
+                (tuple): Number of added or updated and removed poses
+        """
+        found = set()
+        updated = 0
+        for root, dirs, files in os.walk(self.directory):
+            for file_name in files:
+                if file_name == CATALOG or not file_name.lower().endswith(POSE_EXTENSIONS):
+                    continue
+
+                file_path = os.path.join(root, file_name)
+                key = self.get_key(file_path)
+                found.add(key)
+
+                file_stat = os.stat(file_path)
+                entry = self.poses.get(key)
+                if entry and entry["mtime"] == file_stat.st_mtime and entry["size"] == file_stat.st_size:
+                    continue
+                if self.rejected.get(key) == [file_stat.st_mtime, file_stat.st_size]:
+                    continue
+
+                if self.add(file_path):
+                    self.rejected.pop(key, None)
+                    updated += 1
+                else:
+                    self.poses.pop(key, None)
+                    self.rejected[key] = [file_stat.st_mtime, file_stat.st_size]
+
+        removed = [key for key in self.poses if key not in found]
+        for key in removed:
+            del self.poses[key]
+        for key in [key for key in self.rejected if key not in found]:
+            del self.rejected[key]
+        return updated, len(removed)
+
+    def save(self):
+        """
+            Write the catalog, the file is replaced only when writing is finished
+        """
+        shared_file.write_json({"version": 1, "updated": time.time(), "poses": self.poses, "rejected": self.rejected},
+                               self.catalog_path, separators=(",", ":"), sort_keys=True)
+
+    def sync(self):
+        """
+            Read the catalog, catalog the changed files and write it under the lock, poses which other
+            process added meanwhile are kept
+
+            :return
+                (tuple): Number of added or updated and removed poses
+        """
+        with self.lock():
+            self.load()
+            result = self.refresh()
+            self.save()
+        return result
+
+    def rigs(self):
+        """
+            :return
+                (list): All rig names in the library
+        """
+        return sorted(set(rig for entry in self.poses.values() for rig in entry["rigs"]))
+
+    def search(self, text="", rig=None, control=None, animated=None):
+        """
+            Filter poses by catalog data
+
+            :param
+                text(str): Part of pose name or path
+                rig(str): Only poses of this rig
+                control(str): Only poses which contain this control
+                animated(bool): Only animated or only static poses
+
+            :return
+                (list): Pose file paths
+        """
+        text = text.lower()
+        result = list()
+        for key, entry in sorted(self.poses.items()):
+            if text and text not in key.lower():
+                continue
+            if rig and rig not in entry["rigs"]:
+                continue
+            if control and control not in entry["controls"]:
+                continue
+            if animated is not None and bool(entry["frame_count"]) != animated:
+                continue
+            result.append(self.get_path(key))
+        return result
+
+    def duplicates(self):
+        """
+            Group poses which have same values
+
+            :return
+                (list): List of pose file paths for every value shared by more than one pose
+        """
+        groups = dict()
+        for key, entry in sorted(self.poses.items()):
+            groups.setdefault(entry["value_hash"], list()).append(self.get_path(key))
+        return [paths for paths in groups.values() if len(paths) > 1]
+
+
+def create_library(directory):
+    """
+        Make directory a pose library and catalog the poses which are already in it
+
+        :param
+            directory(str): Library directory
+
+        :return
+            (PoseLibrary): Library
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    library = PoseLibrary(directory)
+    library.sync()
+    return library
+
+
+def update_catalog(file_path, pose_data):
+    """
+        Add the written pose to the catalog of its library
+
+        :param
+            file_path(str): Written pose file path
+            pose_data(dict): Written pose data
+
+        :return
+            (bool): True when the file is in a library
+    """
+    directory = find_library(file_path)
+    if directory is None:
+        return False
+
+    library = PoseLibrary(directory)
+    with library.lock():
+        library.load()
+        library.add(file_path, pose_data)
+        library.save()
+    return True
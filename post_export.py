@@ -0,0 +1,270 @@
+"""
+    Post export pipeline, compression, checksum and publish copy run in background threads
+
+    Each file is read once: the content is hashed, copied in chunks and gzip compressed at the same time.
+    Without publish root the files are only hashed, gzip is written only next to the published copy.
+    Published files are written next to their target under temp name and renamed when complete, so a
+    reader never sees half written file. Sidecar manifest lists size and sha256 of every published file.
+
+    post_export.configure("//server/publish/sh010")
+    utility.alembic_export("|char_grp", True, file_path="D:/cache/char.abc")   # returns after local write
+    post_export.get_pipeline().wait()
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+from . import shared_file
+
+PUBLISH_ROOT_VARIABLE = "DATA_TRADER_PUBLISH_ROOT"
+COMPRESS_EXTENSIONS = (".obj", ".json")
+CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class HashingWriter(object):
+    """
+        File wrapper which hash and count the written bytes
+    """
+    def __init__(self, out_file):
+        self.out_file = out_file
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.digest.update(data)
+        self.size += len(data)
+        self.out_file.write(data)
+
+    def flush(self):
+        self.out_file.flush()
+
+
+def copy_chunks(in_file, out_files, chunk_size=CHUNK_SIZE):
+    """
+        Hash the file and write every chunk to the outputs
+
+        :param
+            in_file(file): Source opened in binary mode
+            out_files(list): Files which get the content
+            chunk_size(int): Bytes read at once
+
+        :return
+            (tuple): Sha256 hex digest and size
+    """
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = in_file.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+        size += len(chunk)
+        for out_file in out_files:
+            out_file.write(chunk)
+    return digest.hexdigest(), size
+
+
+def process_file(file_path, target_path, compress, chunk_size=CHUNK_SIZE):
+    """
+        Hash the file and write its copy and gzip in one read, gzip is written only next to the copy so it
+        never shadows a newer local file
+
+        :param
+            file_path(str): Local exported file
+            target_path(str): Copy path, None to only hash the file
+            compress(bool): Write gzip of the content next to the copy
+            chunk_size(int): Bytes read at once
+
+        :return
+            (dict): Sizes, hashes and written paths
+    """
+    start = time.time()
+    target_dir = os.path.dirname(target_path) if target_path else None
+    if target_dir and not os.path.isdir(target_dir):
+        try:
+            os.makedirs(target_dir)
+        except OSError:
+            # Other thread made it
+            pass
+
+    gzip_path = target_path + ".gz" if target_path and compress else None
+    suffix = ".part{0}".format(threading.current_thread().ident)
+    gzip_writer = None
+
+    try:
+        with open(file_path, "rb") as in_file:
+            if not target_path:
+                sha256, size = copy_chunks(in_file, [], chunk_size)
+            elif not gzip_path:
+                with open(target_path + suffix, "wb") as copy_file:
+                    sha256, size = copy_chunks(in_file, [copy_file], chunk_size)
+            else:
+                with open(target_path + suffix, "wb") as copy_file, open(gzip_path + suffix, "wb") as gzip_out:
+                    gzip_writer = HashingWriter(gzip_out)
+                    with gzip.GzipFile(filename=os.path.basename(file_path), mode="wb",
+                                       fileobj=gzip_writer) as gzip_file:
+                        sha256, size = copy_chunks(in_file, [copy_file, gzip_file], chunk_size)
+    except BaseException:
+        # Half written temp files are not left in publish directory
+        for path in (target_path, gzip_path):
+            if path and os.path.isfile(path + suffix):
+                os.remove(path + suffix)
+        raise
+
+    if target_path:
+        shared_file.replace_file(target_path + suffix, target_path)
+    if gzip_path:
+        shared_file.replace_file(gzip_path + suffix, gzip_path)
+
+    return {"source": file_path,
+            "target": target_path,
+            "size": size,
+            "sha256": sha256,
+            "gzip": gzip_path,
+            "gzip_size": gzip_writer.size if gzip_writer else None,
+            "gzip_sha256": gzip_writer.digest.hexdigest() if gzip_writer else None,
+            "time": time.time() - start}
+
+
+class PostExportPipeline(object):
+    """
+        Thread pool which process exported files while maya continues
+    """
+    def __init__(self, publish_root=None, workers=4, compress_extensions=COMPRESS_EXTENSIONS):
+        self.publish_root = publish_root
+        self.compress_extensions = tuple(compress_extensions)
+        self.pool = ThreadPool(workers)
+        self.pending = list()
+        self.lock = threading.Lock()
+
+    def get_target(self, file_path, source_root):
+        if not self.publish_root:
+            return None
+        relative_path = os.path.relpath(file_path, source_root) if source_root else os.path.basename(file_path)
+        return os.path.join(self.publish_root, relative_path).replace("\\", "/")
+
+    def is_output(self, name, names):
+        """
+            Check the file is written by the pipeline, older versions left gzip next to its source
+        """
+        if ".part" in name:
+            return True
+        return name.endswith(".gz") and name[:-3] in names and name[:-3].lower().endswith(self.compress_extensions)
+
+    def run(self, name, files, manifest_path):
+        """
+            Process files of one export and write their sidecar manifest
+        """
+        results = list()
+        for file_path, target_path in files:
+            try:
+                result = process_file(file_path, target_path, file_path.lower().endswith(self.compress_extensions))
+                result["status"] = "ok"
+            except Exception as error:
+                result = {"source": file_path, "target": target_path, "status": "failed", "error": str(error)}
+            results.append(result)
+
+        manifest = {"export": name, "time": time.time(), "files": results}
+        temp_path = manifest_path + ".part"
+        with open(temp_path, "w") as out_file:
+            json.dump(manifest, out_file, indent=4)
+        shared_file.replace_file(temp_path, manifest_path)
+        return manifest
+
+    def submit(self, output, files=None):
+        """
+            Queue files of one export, it returns immediately
+
+            :param
+                output(str): Exported file or directory
+                files(list): Files of the export, all files under output directory or output itself when
+                             it is not given
+
+            :return
+                (multiprocessing.pool.AsyncResult): Result which gives the manifest
+        """
+        output = output.replace("\\", "/").rstrip("/")
+        source_root = None
+        if files is None:
+            if os.path.isdir(output):
+                files = [os.path.join(root, name) for root, dirs, names in os.walk(output) for name in names
+                         if not self.is_output(name, names)]
+            else:
+                files = [output]
+        if os.path.isdir(output):
+            source_root = os.path.dirname(output)
+
+        pairs = [(file_path, self.get_target(file_path, source_root)) for file_path in sorted(files)]
+        manifest_path = (self.get_target(output, source_root) or output) + ".manifest.json"
+        manifest_dir = os.path.dirname(manifest_path)
+        if manifest_dir and not os.path.isdir(manifest_dir):
+            os.makedirs(manifest_dir)
+
+        async_result = self.pool.apply_async(self.run, (os.path.basename(output), pairs, manifest_path))
+        with self.lock:
+            self.pending = [item for item in self.pending if not item.ready()] + [async_result]
+        return async_result
+
+    def wait(self):
+        """
+            Wait until every queued export is processed
+
+            :return
+                (list): Manifest of each export
+        """
+        with self.lock:
+            pending, self.pending = self.pending, list()
+        return [async_result.get() for async_result in pending]
+
+
+_pipeline = None
+
+
+def configure(publish_root=None, workers=4, compress_extensions=COMPRESS_EXTENSIONS):
+    """
+        Start the pipeline, exports are processed after this call
+
+        :param
+            publish_root(str): Shared directory to copy the exports, environment variable is used when it is
+                               not given, without it files are only hashed
+            workers(int): Number of threads
+            compress_extensions(tuple): Extensions which get gzip copy
+
+        :return
+            (PostExportPipeline): Pipeline
+    """
+    global _pipeline
+    _pipeline = PostExportPipeline(publish_root or os.environ.get(PUBLISH_ROOT_VARIABLE), workers,
+                                   compress_extensions)
+    return _pipeline
+
+
+def get_pipeline():
+    """
+        :return
+            (PostExportPipeline): Configured pipeline, one is started when publish root variable is set
+    """
+    if _pipeline is None and os.environ.get(PUBLISH_ROOT_VARIABLE):
+        configure()
+    return _pipeline
+
+
+def submit(output, files=None):
+    """
+        Queue export for post processing when the pipeline is configured
+
+        :param
+            output(str): Exported file or directory
+            files(list): Files of the export
+
+        :return
+            (multiprocessing.pool.AsyncResult): Result which gives the manifest, None when pipeline is off
+    """
+    pipeline = get_pipeline()
+    if pipeline is None:
+        return None
+    return pipeline.submit(output, files)
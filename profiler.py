@@ -0,0 +1,183 @@
+"""
+    Opt-in profiler of maya.cmds and mel calls made by the export and import code
+
+    with profiler.profile() as result:
+        utility.pose_export("|char_grp", 1001, "D:/pose.json")
+    result.write_flame("D:/pose_export.folded")
+    result.write_summary("D:/pose_export.json")
+
+    Flame file is in collapsed stack format, it can be opened with flamegraph.pl or speedscope.
+
+    Functions of maya.cmds and maya.mel are wrapped, so every package module is measured, also the ones
+    which are imported inside the block. Calls which do not come from package code are not counted.
+"""
+import contextlib
+import json
+import os
+import sys
+import time
+
+PACKAGE_PATH = os.path.dirname(os.path.abspath(__file__))
+
+
+def get_module_name(code):
+    """
+        Get module name of code when it is part of the package
+
+        :param
+            code(code): Code object of frame
+
+        :return
+            (str): Module name, None for code outside the package
+    """
+    file_path = os.path.abspath(code.co_filename)
+    if os.path.dirname(file_path) != PACKAGE_PATH or file_path == os.path.abspath(__file__):
+        return None
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+def get_call_stack(depth=2):
+    """
+        Get the package functions which lead to the call, outermost first
+
+        :param
+            depth(int): Number of frames to skip
+
+        :return
+            (tuple): module.function names
+    """
+    stack = list()
+    frame = sys._getframe(depth)
+    while frame is not None:
+        module_name = get_module_name(frame.f_code)
+        if module_name:
+            stack.append("{0}.{1}".format(module_name, frame.f_code.co_name))
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+
+def wrap_command(function, command, profile_result):
+    """
+        Get function which times the command when package code calls it
+
+        :param
+            function(function): Command function of maya.cmds or maya.mel
+            command(str): Name of command like cmds.ls
+            profile_result(ProfileResult): Result to add the call
+
+        :return
+            (function): Wrapper of the command
+    """
+    def wrapper(*args, **kwargs):
+        stack = get_call_stack()
+        if not stack:
+            return function(*args, **kwargs)
+
+        start = time.time()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profile_result.add(stack, command, time.time() - start)
+
+    wrapper.profiled_command = function
+    return wrapper
+
+
+class ProfileResult(object):
+    """
+        Call count and time of commands by the calling stack
+    """
+    def __init__(self):
+        self.stacks = dict()
+        self.wall_time = 0.0
+
+    def add(self, stack, command, duration):
+        """
+            Add one command call
+
+            :param
+                stack(tuple): Calling functions, outermost first
+                command(str): Name of command like cmds.ls
+                duration(float): Time of the call in seconds
+        """
+        key = stack + (command,)
+        count, total = self.stacks.get(key, (0, 0.0))
+        self.stacks[key] = (count + 1, total + duration)
+
+    def summary(self):
+        """
+            Group the calls by command and by calling function
+
+            :return
+                (dict): Wall time, command time and count by command and by function
+        """
+        commands = dict()
+        functions = dict()
+        for key, (count, total) in self.stacks.items():
+            command = key[-1]
+            function = key[-2]
+
+            command_info = commands.setdefault(command, {"count": 0, "time": 0.0})
+            command_info["count"] += count
+            command_info["time"] += total
+
+            function_info = functions.setdefault(function, {"count": 0, "time": 0.0, "commands": dict()})
+            function_info["count"] += count
+            function_info["time"] += total
+            function_info["commands"][command] = function_info["commands"].get(command, 0) + count
+
+        return {"wall_time": self.wall_time,
+                "command_time": sum(item["time"] for item in commands.values()),
+                "call_count": sum(item["count"] for item in commands.values()),
+                "commands": commands,
+                "functions": functions}
+
+    def write_flame(self, file_path):
+        """
+            Write collapsed stacks, value is time in microseconds
+
+            :param
+                file_path(str): Output path
+        """
+        with open(file_path, "w") as out_file:
+            for key, (count, total) in sorted(self.stacks.items()):
+                out_file.write("{0} {1}\n".format(";".join(key), max(1, int(total * 1000000))))
+
+    def write_summary(self, file_path):
+        """
+            Write summary as json
+
+            :param
+                file_path(str): Output path
+        """
+        with open(file_path, "w") as out_file:
+            json.dump(self.summary(), out_file, indent=4, sort_keys=True)
+
+
+@contextlib.contextmanager
+def profile():
+    """
+        Time cmds and mel calls of the package inside the block, maya.cmds and maya.mel are restored after it
+
+        :return
+            (ProfileResult): Result which is filled while the block runs
+    """
+    from maya import cmds, mel
+
+    profile_result = ProfileResult()
+    originals = list()
+    for module, prefix in ((cmds, "cmds"), (mel, "mel")):
+        for name, original in list(vars(module).items()):
+            # Nested profile keeps the outer wrapper
+            if name.startswith("_") or not callable(original) or hasattr(original, "profiled_command"):
+                continue
+            originals.append((module, name, original))
+            setattr(module, name, wrap_command(original, "{0}.{1}".format(prefix, name), profile_result))
+
+    start = time.time()
+    try:
+        yield profile_result
+    finally:
+        profile_result.wall_time = time.time() - start
+        for module, name, original in originals:
+            setattr(module, name, original)
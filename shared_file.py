@@ -0,0 +1,103 @@
+"""
+    Files shared by processes, lock file around read modify write and replace of the file in one rename
+
+    Post export, export cache and pose library write their json files with these, a reader never sees half
+    written file and two writers do not drop the changes of each other.
+"""
+import errno
+import json
+import os
+import tempfile
+import time
+
+
+def replace_file(temp_path, file_path):
+    """
+        Move complete temp file to its final name
+
+        :param
+            temp_path(str): Written temp file
+            file_path(str): Final path
+    """
+    try:
+        os.replace(temp_path, file_path)
+    except AttributeError:
+        # Python 2 rename does not overwrite on windows
+        if os.path.isfile(file_path):
+            os.remove(file_path)
+        os.rename(temp_path, file_path)
+
+
+class FileLock(object):
+    """
+        Lock file around read modify write of a file shared by processes, lock of a crashed process is
+        taken over when it is older than stale seconds
+
+        with shared_file.FileLock(manifest_path + ".lock"):
+            manifest = read(manifest_path)
+            ...
+    """
+    def __init__(self, path, timeout=30.0, stale=60.0, interval=0.05):
+        self.path = path
+        self.timeout = timeout
+        self.stale = stale
+        self.interval = interval
+
+    def acquire(self):
+        start = time.time()
+        while True:
+            try:
+                handle = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except OSError as error:
+                if error.errno not in (errno.EEXIST, errno.EACCES):
+                    raise
+            else:
+                os.write(handle, str(os.getpid()).encode("ascii"))
+                os.close(handle)
+                return
+
+            try:
+                if time.time() - os.path.getmtime(self.path) > self.stale:
+                    os.remove(self.path)
+                    continue
+            except OSError:
+                # Owner removed the lock meanwhile
+                continue
+
+            if time.time() - start > self.timeout:
+                raise IOError("File is locked by other process: {0}".format(self.path))
+            time.sleep(self.interval)
+
+    def release(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+
+def write_json(data, file_path, **kwargs):
+    """
+        Write json to temp file next to the file and replace the file with it when writing is finished
+
+        :param
+            data(dict): Json data
+            file_path(str): Final path
+            kwargs: Arguments of json.dump
+    """
+    directory, name = os.path.split(os.path.abspath(file_path))
+    handle, temp_path = tempfile.mkstemp(suffix=".tmp", prefix=name + ".", dir=directory)
+    try:
+        with os.fdopen(handle, "w") as out_file:
+            json.dump(data, out_file, **kwargs)
+        replace_file(temp_path, file_path)
+    except BaseException:
+        if os.path.isfile(temp_path):
+            os.remove(temp_path)
+        raise
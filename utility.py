@@ -1,19 +1,92 @@
+import gzip
+import hashlib
 import json
 import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from multiprocessing.pool import ThreadPool
 
 from PySide2 import QtWidgets
 from maya import cmds, mel
+from maya.api import OpenMaya
+
+# Export modules are imported in the functions which use them, opening the window does not load them
+from . import pose_format
+
+
+SHADER_MANIFEST = "Shader_manifest.json"
+SHADER_BUNDLE = "Shader_bundle.ma"
+ASSIGN_INFO = "Assign_info.json"
+# Version 2 lists only the members under the exported object, files without version list all members of the engine
+ASSIGN_VERSION = 2
+EXPORT_EXTENSIONS = {"Alembic": ".abc", "FBX": ".fbx", "Obj": ".obj", "Pose": ".json"}
+IMPORT_TYPES = {".abc": "Alembic", ".fbx": "FBX", ".obj": "Obj"}
+OBJ_KEYWORDS = ("#", "v", "f", "g", "o", "mtllib")
+SET_MEMBER_ATTRIBUTES = ("dagSetMembers", "dsm", "groupNodes", "gn")
+PLUGINS = ("AbcExport", "AbcImport", "fbxmaya", "objExport")
+COMPONENT_PATTERN = re.compile(r"^(.+?)\.(\w+)\[(\d+)(?::(\d+))?\]$")
+# Frames of one AbcExport call when step export stitches the chunks into one file
+ALEMBIC_CHUNK_SIZE = 50
+
+# Plugins known to be loaded in this maya session, same for every window and export
+LOADED_PLUGINS = set()
+plugin_callback = None
+
+
+def forget_plugin(names, *args):
+    """
+        Remove unloaded plugin from the registry, it is loaded again by the next export
+    """
+    if names:
+        LOADED_PLUGINS.discard(names[0])
 
 
 def load_plugin(plugin_name):
     """
-        Load the plugin in maya as per the operating system
+        Load the plugin in maya as per the operating system, plugin in the registry is not queried again
 
         :param
             plugin_name(str): Name of the plugin
     """
+    global plugin_callback
+    if plugin_name in LOADED_PLUGINS:
+        return
+
     if not cmds.pluginInfo(plugin_name, query=True, loaded=True):
         cmds.loadPlugin(plugin_name)
+    LOADED_PLUGINS.add(plugin_name)
+
+    if plugin_callback is None:
+        plugin_callback = OpenMaya.MSceneMessage.addStringArrayCallback(
+            OpenMaya.MSceneMessage.kAfterPluginUnload, forget_plugin)
+
+
+def warm_plugins(plugins=PLUGINS, callback=None):
+    """
+        Load the plugins before they are needed, one plugin per idle event of maya so the window stays
+        responsive between them. Missing plugin is left for the export to report.
+
+        :param
+            plugins(tuple): Name of the plugins
+            callback(function): Called when every plugin is tried
+    """
+    pending = [plugin for plugin in plugins if plugin not in LOADED_PLUGINS]
+
+    def warm_next():
+        if pending:
+            try:
+                load_plugin(pending.pop(0))
+            except RuntimeError:
+                pass
+        if pending:
+            cmds.evalDeferred(warm_next, lowestPriority=True)
+        elif callback is not None:
+            callback()
+
+    cmds.evalDeferred(warm_next, lowestPriority=True)
 
 
 def get_filepath(file_type, export, file_mode):
@@ -34,24 +107,21 @@ def get_filepath(file_type, export, file_mode):
     else:
         file_dialog.setAcceptMode(QtWidgets.QFileDialog.AcceptOpen)
 
+    # Plugins are loaded by the export and import, not by the dialog
     if file_type == "Alembic":
-        load_plugin("AbcExport")
-        load_plugin("AbcImport")
         file_dialog.setNameFilter("Alembic(*.abc)")
         file_dialog.setFileMode(file_mode)
 
     elif file_type == "FBX":
-        load_plugin("fbxmaya")
         file_dialog.setNameFilter("FBX(*.fbx)")
         file_dialog.setFileMode(file_mode)
 
     elif file_type == "Obj":
-        load_plugin("objExport")
         file_dialog.setNameFilter("OBJ(*.obj)")
         file_dialog.setFileMode(file_mode)
 
     elif file_type == "Pose":
-        file_dialog.setNameFilter("Json(*.json")
+        file_dialog.setNameFilter("Pose(*.json *{0})".format(pose_format.EXTENSION))
         file_dialog.setFileMode(file_mode)
 
     elif file_type == "Shader":
@@ -67,249 +137,1728 @@ def get_filepath(file_type, export, file_mode):
 """Export Code Block Start"""
 
 
-def alembic_export(obj, anim_export, frame_number=None):
+def get_frame_range(frame_range=None):
+    """
+        Get start and end frame of export
+
+        :param
+            frame_range(tuple): Start and end frame, playback range is used when it is not given
+
+        :return
+            (tuple): Start and end frame
+    """
+    if frame_range:
+        return frame_range[0], frame_range[1]
+    return cmds.playbackOptions(query=True, minTime=True), cmds.playbackOptions(query=True, maxTime=True)
+
+
+def get_frames(frame_range=None):
+    """
+        Get every frame of export
+
+        :param
+            frame_range(tuple): Start and end frame, playback range is used when it is not given
+
+        :return
+            (list): Frames from start, one frame apart
+    """
+    start_frame, end_frame = get_frame_range(frame_range)
+    return [start_frame + index for index in range(int(end_frame - start_frame) + 1)]
+
+
+def get_static_frame(frame_number=None):
+    """
+        Get frame of static export
+
+        :param
+            frame_number(int): Frame number which data will export
+
+        :return
+            (float): Frame number, current frame when it is not given
+    """
+    if frame_number is None:
+        return cmds.currentTime(query=True)
+    return frame_number
+
+
+# Called with done and total frame count while AbcExport writes, see on_alembic_frame
+alembic_frame_callback = None
+
+
+def on_alembic_frame(frame, start_frame, total):
+    """
+        Run by AbcExport after every written frame of job with frame callback
+    """
+    if alembic_frame_callback is not None:
+        alembic_frame_callback(min(max(int(frame - start_frame) + 1, 0), total), total)
+
+
+def get_alembic_job(roots, file_path, start_frame, end_frame, frame_callback=False):
+    """
+        Build job argument of AbcExport command
+
+        :param
+            roots(list): Name of root objects
+            file_path(str): Output path
+            start_frame(float): First frame
+            end_frame(float): Last frame
+            frame_callback(bool): Report every written frame to alembic_frame_callback
+
+        :return
+            (str): Job argument with -j flag
+    """
+    root_flags = " ".join("-root {0}".format(root) for root in roots)
+    callback_flag = ""
+    if frame_callback:
+        # Job is split at spaces, python command must not have any
+        callback_flag = "-pythonPerFrameCallback __import__('{0}',fromlist=['on_alembic_frame'])." \
+                        "on_alembic_frame(#FRAME#,{1},{2}) ".format(__name__, start_frame,
+                                                                  int(end_frame - start_frame) + 1)
+    return '-j "-frameRange {0} {1} {4}-uvWrite -worldSpace -writeVisibility ' \
+           '-dataFormat ogawa {2} -file {3}"'.format(start_frame, end_frame, root_flags, file_path, callback_flag)
+
+
+def alembic_export(obj, anim_export, frame_number=None, file_path=None, frame_range=None, preroll_frame=None,
+                   use_cache=False):
     """
         Export alembic data
 
         :param
-            obj(str): Name of object
+            obj(str, list): Name of object, all objects of list go to one file
             anim_export(bool): export animation or static
-            frame_number(int): Frame number which data will export
+            frame_number(int): Frame number which data will export, current frame when it is not given
+            file_path(str): Output path, ask the user when it is not given
+            frame_range(tuple): Start and end frame, playback range is used when it is not given
+            preroll_frame(float): Scene is evaluated from this frame but only the frame range is written
+            use_cache(bool): Skip the export when nothing is changed since the last export to this path
+
+        :return
+            (bool): True when the export is skipped by cache
     """
-    file_path = get_filepath("Alembic", True, QtWidgets.QFileDialog.AnyFile)
+    from . import export_cache, post_export
+
+    if not file_path:
+        file_path = get_filepath("Alembic", True, QtWidgets.QFileDialog.AnyFile)
+    load_plugin("AbcExport")
+
     if anim_export:
-        start_frame = cmds.playbackOptions(query=True, minTime=True)
-        end_frame = cmds.playbackOptions(query=True, maxTime=True)
+        start_frame, end_frame = get_frame_range(frame_range)
+    else:
+        start_frame = end_frame = get_static_frame(frame_number)
+
+    fingerprint = None
+    if use_cache:
+        options = {"frames": [start_frame, end_frame], "preroll": preroll_frame, "file": os.path.basename(file_path)}
+        fingerprint = export_cache.get_fingerprint(obj, "Alembic", options)
+        if export_cache.is_cached(file_path, fingerprint):
+            return True
+
+    roots = list(obj) if isinstance(obj, (list, tuple)) else [obj]
+    preroll_flag = "" if preroll_frame is None else "-preRollStartFrame {0} ".format(preroll_frame)
+    mel.eval("AbcExport {0}{1};".format(preroll_flag, get_alembic_job(roots, file_path, start_frame, end_frame)))
+
+    export_cache.record(file_path, fingerprint)
+    post_export.submit(file_path)
+    return False
+
 
-        command = 'AbcExport -j "-frameRange {0} {1} -uvWrite -worldSpace -writeVisibility ' \
-                  '-dataFormat ogawa -root {2} -file {3}";'.format(start_frame, end_frame, obj, file_path)
+def alembic_export_batch(objs, file_paths, anim_export, frame_number=None, frame_range=None):
+    """
+        Export every object to its own alembic file with one AbcExport call, timeline is evaluated once
+
+        :param
+            objs(list): Name of objects
+            file_paths(list): Output path for each object
+            anim_export(bool): export animation or static
+            frame_number(int): Frame number which data will export, current frame when it is not given
+            frame_range(tuple): Start and end frame, playback range is used when it is not given
+    """
+    from . import post_export
+
+    load_plugin("AbcExport")
+
+    if anim_export:
+        start_frame, end_frame = get_frame_range(frame_range)
     else:
-        command = 'AbcExport -j "-frameRange {0} {0} -uvWrite -worldSpace -writeVisibility ' \
-                  '-dataFormat ogawa -root {1} -file {2}";'.format(frame_number, obj, file_path)
+        start_frame = end_frame = get_static_frame(frame_number)
 
-    mel.eval(command)
+    jobs = [get_alembic_job([obj], file_path, start_frame, end_frame) for obj, file_path in zip(objs, file_paths)]
+    mel.eval("AbcExport {0};".format(" ".join(jobs)))
 
+    for file_path in file_paths:
+        post_export.submit(file_path)
 
-def fbx_export(obj):
+
+def iter_alembic_export(obj, anim_export, frame_number, file_path, frame_range=None, chunk_size=ALEMBIC_CHUNK_SIZE):
     """
-        Export fbx data
+        Export alembic data step by step. When abcstitcher is found long range is written in frame chunks and
+        stitched into the file, so the export can stop between chunks. Chunks start their evaluation at their
+        first frame like the shards of alembic_shard, simulation needs chunk_size None. Otherwise the range is
+        written in one call which reports every frame to alembic_frame_callback.
 
         :param
-            obj(str): Name of object
+            obj(str, list): Name of object, all objects of list go to one file
             anim_export(bool): export animation or static
-            frame_number(int): Frame number which data will export
+            frame_number(int): Frame number which data will export, current frame when it is not given
+            file_path(str): Output path
+            frame_range(tuple): Start and end frame, playback range is used when it is not given
+            chunk_size(int): Frames of one chunk, None writes the range in one call
+
+        :return
+            (generator): Stage name, done and total count after each step
+    """
+    from . import alembic_shard, post_export
+
+    load_plugin("AbcExport")
+
+    if anim_export:
+        start_frame, end_frame = get_frame_range(frame_range)
+    else:
+        start_frame = end_frame = get_static_frame(frame_number)
+    roots = list(obj) if isinstance(obj, (list, tuple)) else [obj]
+    total = int(end_frame - start_frame) + 1
+    yield "gather", 0, total
+
+    stitcher = alembic_shard.get_stitcher() if chunk_size and total > chunk_size else None
+    if stitcher is None:
+        mel.eval("AbcExport {0};".format(get_alembic_job(roots, file_path, start_frame, end_frame, True)))
+        yield "write", total, total
+    else:
+        chunks = alembic_shard.split_frame_range(start_frame, end_frame, -(-total // chunk_size))
+        shard_files = [alembic_shard.get_shard_path(file_path, index) for index in range(len(chunks))]
+        try:
+            for (chunk_start, chunk_end), shard_file in zip(chunks, shard_files):
+                mel.eval("AbcExport {0};".format(get_alembic_job(roots, shard_file, chunk_start, chunk_end)))
+                yield "write", int(chunk_end - start_frame) + 1, total
+
+            if os.path.isfile(file_path):
+                os.remove(file_path)
+            if subprocess.call([stitcher, file_path] + shard_files) != 0:
+                raise RuntimeError("Alembic chunks can not be stitched: {0}".format(file_path))
+        finally:
+            # Cancelled export leaves no chunk behind
+            for shard_file in shard_files:
+                if os.path.isfile(shard_file):
+                    os.remove(shard_file)
+
+    post_export.submit(file_path)
+    yield "post", total, total
+
+
+def fbx_export(obj, file_path=None, use_cache=False):
+    """
+        Export fbx data
+
+        :param
+            obj(str, list): Name of object, all objects of list go to one file
+            file_path(str): Output path, ask the user when it is not given
+            use_cache(bool): Skip the export when nothing is changed since the last export to this path
+
+        :return
+            (bool): True when the export is skipped by cache
     """
-    file_path = get_filepath("FBX", True, QtWidgets.QFileDialog.AnyFile)
+    from . import export_cache, post_export
+
+    if not file_path:
+        file_path = get_filepath("FBX", True, QtWidgets.QFileDialog.AnyFile)
+    load_plugin("fbxmaya")
+
+    fingerprint = None
+    if use_cache:
+        fingerprint = export_cache.get_fingerprint(obj, "FBX", {"frames": get_frame_range(),
+                                                               "file": os.path.basename(file_path)})
+        if export_cache.is_cached(file_path, fingerprint):
+            return True
+
     cmds.select(obj, replace=True)
 
     cmds.file(file_path, force=True, type="FBX export", exportSelected=True)
 
+    export_cache.record(file_path, fingerprint)
+    post_export.submit(file_path)
+    return False
 
-def obj_export(obj, frame_number):
+
+def obj_export(obj, frame_number, file_path=None, anim_export=False, frame_range=None, use_cache=False):
     """
-        Export obj data
+        Export obj data, animation is written as numbered obj sequence by the native writer
 
         :param
-            obj(str): Name of object
+            obj(str, list): Name of object, all objects of list go to one file
+            frame_number(int): Frame number which data will export
+            file_path(str): Output path, ask the user when it is not given
+            anim_export(bool): export animation or static
+            frame_range(tuple): Start and end frame, playback range is used when it is not given
+            use_cache(bool): Skip the export when nothing is changed since the last export to this path
+
+        :return
+            (bool): True when the export is skipped by cache
+    """
+    from . import export_cache, obj_writer
+
+    if not file_path:
+        file_path = get_filepath("Obj", True, QtWidgets.QFileDialog.AnyFile)
+
+    fingerprint = None
+    files = [file_path]
+    if use_cache:
+        frames = get_frame_range(frame_range) if anim_export else [frame_number]
+        fingerprint = export_cache.get_fingerprint(obj, "Obj", {"frames": frames, "anim": anim_export,
+                                                               "file": os.path.basename(file_path)})
+        if anim_export:
+            # Same names as the writer gives the files
+            files = obj_writer.get_sequence_files(obj_writer.get_sequence_pattern(file_path), get_frames(frame_range))
+        if export_cache.is_cached(file_path, fingerprint):
+            return True
+
+    for _ in iter_obj_export(obj, frame_number, file_path, anim_export, frame_range):
+        pass
+
+    export_cache.record(file_path, fingerprint, files)
+    return False
+
+
+def iter_obj_export(obj, frame_number, file_path, anim_export=False, frame_range=None):
+    """
+        Export obj data step by step
+
+        :param
+            obj(str, list): Name of object, all objects of list go to one file
             frame_number(int): Frame number which data will export
+            file_path(str): Output path
+            anim_export(bool): export animation or static
+            frame_range(tuple): Start and end frame, playback range is used when it is not given
+
+        :return
+            (generator): Stage name, done and total count after each step
     """
-    file_path = get_filepath("Obj", True, QtWidgets.QFileDialog.AnyFile)
+    from . import obj_writer, post_export
+
+    if anim_export:
+        frames = get_frames(frame_range)
+        writer = obj_writer.ObjSequenceWriter(obj)
+        yield "gather", 0, len(frames)
+
+        written = list()
+        for written_path in writer.iter_write_sequence(obj_writer.get_sequence_pattern(file_path), frames):
+            written.append(written_path)
+            yield "write", len(written), len(frames)
+
+        post_export.submit(file_path, written)
+        yield "post", len(frames), len(frames)
+        return
+
+    load_plugin("objExport")
 
     if frame_number:
         cmds.currentTime(frame_number)
     cmds.select(obj, replace=True)
+    yield "gather", 0, 1
 
     cmds.file(file_path, force=True, options="groups=1;ptgroups=1;materials=1;smoothing=1;normals=1",
               type="OBJexport", exportSelected=True)
+    yield "write", 1, 1
 
+    post_export.submit(file_path)
+    yield "post", 1, 1
 
-def pose_export(obj, frame_number):
-    """
-        Export pose data
 
-        :param
-            obj(str): Name of object
-            frame_number(int): Fame number which data will export
+def get_pose_transforms(obj):
     """
-    file_path = get_filepath("Pose", True, QtWidgets.QFileDialog.AnyFile)
+        Get the transforms which hold pose values
 
-    if frame_number:
-        cmds.currentTime(frame_number)
+        :param
+            obj(str, list): Name of object or list of objects
 
+        :return
+            (list): Full path of transforms
+    """
     # Hope it is a rig and we get curves
     curves = cmds.listRelatives(obj, allDescendents=True, type="nurbsCurve", fullPath=True)
-    transforms = list()
 
     # Not a rig let's get everything
     if not curves:
-        curves = [obj]
-        curves += cmds.listRelatives(obj, allDescendents=True, type="transform", fullPath=True)
+        curves = list(obj) if isinstance(obj, (list, tuple)) else [obj]
+        curves += cmds.listRelatives(obj, allDescendents=True, type="transform", fullPath=True) or []
 
-    for curve in curves:
-        transforms.append(cmds.listRelatives(curve, parent=True, fullPath=True)[0])
-    # Remove duplicate items
-    transforms = list(set(transforms))
+    # One query for all the parents, duplicate items are removed
+    return list(set(cmds.listRelatives(curves, parent=True, fullPath=True) or []))
 
-    anim_data = {"data_trader": "Pose"}
-    for transform in transforms:
-        value_data = dict()
-        attribute = cmds.listAttr(transform, keyable=True)
 
-        if not attribute:
+def get_keyable_plugs(node):
+    """
+        Get keyable plugs of node, same as cmds.listAttr(keyable=True)
+
+        :param
+            node(OpenMaya.MObject): Dependency node
+
+        :return
+            (list): Tuple of attribute name and OpenMaya.MPlug
+    """
+    fn_node = OpenMaya.MFnDependencyNode(node)
+    plugs = list()
+
+    for index in range(fn_node.attributeCount()):
+        attribute = fn_node.attribute(index)
+        fn_attribute = OpenMaya.MFnAttribute(attribute)
+
+        # Elements of multi attribute need index, listAttr does not return them either
+        if fn_attribute.array or (not fn_attribute.parent.isNull() and
+                                  OpenMaya.MFnAttribute(fn_attribute.parent).array):
             continue
 
-        for attr in attribute:
-            try:
-                value_data[attr] = cmds.getAttr(transform + "." + attr)
-            except Exception:
-                pass
-        anim_data[transform] = value_data
+        plug = OpenMaya.MPlug(node, attribute)
+        if plug.isKeyable:
+            plugs.append((fn_attribute.name, plug))
 
-    with open(file_path, "w") as out_file:
-        json.dump(anim_data, out_file, indent=4)
+    return plugs
 
 
-def shader_export(obj):
+def get_plug_value(plug, context=None):
     """
-        Export shader data
+        Read plug value in the same unit as cmds.getAttr
 
         :param
-            obj(str): Name of object
+            plug(OpenMaya.MPlug): Plug to read
+            context(OpenMaya.MDGContext): Time context for maya before 2022, current context when it is None
+
+        :return
+            (bool, int, float): Value of plug, None when type is not handled
     """
-    file_path = get_filepath("Shader", True, QtWidgets.QFileDialog.Directory)
-    # Create folder for the selected object
-    # Name should not contain : so replace them with __
-    tmp_name = obj.replace(":", "__") if ":" in obj else obj
-    file_path = os.path.join(file_path, tmp_name).replace("\\", "/")
+    attribute = plug.attribute()
+    args = (context,) if context is not None else ()
+
+    if attribute.hasFn(OpenMaya.MFn.kNumericAttribute):
+        numeric_type = OpenMaya.MFnNumericAttribute(attribute).numericType()
+        if numeric_type == OpenMaya.MFnNumericData.kBoolean:
+            return plug.asBool(*args)
+        elif numeric_type in (OpenMaya.MFnNumericData.kByte, OpenMaya.MFnNumericData.kChar,
+                              OpenMaya.MFnNumericData.kShort, OpenMaya.MFnNumericData.kInt,
+                              OpenMaya.MFnNumericData.kInt64):
+            return plug.asInt(*args)
+        elif numeric_type in (OpenMaya.MFnNumericData.kFloat, OpenMaya.MFnNumericData.kDouble):
+            return plug.asDouble(*args)
+
+    elif attribute.hasFn(OpenMaya.MFn.kUnitAttribute):
+        unit_type = OpenMaya.MFnUnitAttribute(attribute).unitType()
+        if unit_type == OpenMaya.MFnUnitAttribute.kAngle:
+            return plug.asMAngle(*args).asUnits(OpenMaya.MAngle.uiUnit())
+        elif unit_type == OpenMaya.MFnUnitAttribute.kDistance:
+            return plug.asMDistance(*args).asUnits(OpenMaya.MDistance.uiUnit())
+        elif unit_type == OpenMaya.MFnUnitAttribute.kTime:
+            return plug.asMTime(*args).asUnits(OpenMaya.MTime.uiUnit())
+
+    elif attribute.hasFn(OpenMaya.MFn.kEnumAttribute):
+        return plug.asShort(*args)
+
+    return None
+
+
+def capture_pose(transforms):
+    """
+        Read keyable values of all transforms through the API instead of getAttr per attribute
 
-    if not os.path.exists(file_path):
-        os.makedirs(file_path)
+        :param
+            transforms(list): Full path of transforms
 
-    meshes = cmds.listRelatives(obj, allDescendents=True, type="mesh", fullPath=True)
+        :return
+            (dict): Attribute values per transform
+    """
+    selection = OpenMaya.MSelectionList()
+    for transform in transforms:
+        selection.add(transform)
 
-    shader_data = {"data_trader": "Shader"}
-    for mesh in meshes:
-        shaders = cmds.listConnections(mesh, type="shadingEngine")
+    pose_data = dict()
+    for index, transform in enumerate(transforms):
+        plugs = get_keyable_plugs(selection.getDependNode(index))
 
-        if not shaders:
+        if not plugs:
             continue
-        shaders = list(set(shaders))
-
-        for shader in shaders:
-            assign_object = cmds.sets(shader, query=True)
-            shader_data[shader] = assign_object
 
-            if shader == "initialShadingGroup":
-                continue
-            tmp_name = shader.replace(":", "__") if ":" in shader else shader
-            shader_path = os.path.join(file_path, tmp_name + ".ma")
+        value_data = dict()
+        for attr, plug in plugs:
             try:
-                cmds.select(shader, replace=True, noExpand=True)
-                cmds.file(shader_path, force=True, type="mayaAscii", exportSelected=True)
+                value = get_plug_value(plug)
+                # Compound and other data types, let maya convert them
+                if value is None:
+                    value = cmds.getAttr(transform + "." + attr)
+                value_data[attr] = value
             except Exception:
                 pass
+        pose_data[transform] = value_data
 
-    json_file = os.path.join(file_path, "Assign_info.json")
-    with open(json_file, "w") as out_file:
-        json.dump(shader_data, out_file, indent=4)
+    return pose_data
 
 
-"""Export Code Block End"""
-"""Import Code Block Start"""
+def get_plug_default(plug):
+    """
+        Read default value of plug in the same unit as get_plug_value
 
+        :param
+            plug(OpenMaya.MPlug): Plug to read
 
-def import_file(import_type):
+        :return
+            (bool, int, float): Default value of plug, None when type is not handled
     """
-        Import file like obj, fbx, abc
+    attribute = plug.attribute()
+
+    if attribute.hasFn(OpenMaya.MFn.kNumericAttribute):
+        fn_attribute = OpenMaya.MFnNumericAttribute(attribute)
+        if fn_attribute.numericType() in (OpenMaya.MFnNumericData.kBoolean, OpenMaya.MFnNumericData.kByte,
+                                          OpenMaya.MFnNumericData.kChar, OpenMaya.MFnNumericData.kShort,
+                                          OpenMaya.MFnNumericData.kInt, OpenMaya.MFnNumericData.kInt64,
+                                          OpenMaya.MFnNumericData.kFloat, OpenMaya.MFnNumericData.kDouble):
+            return fn_attribute.default
+
+    elif attribute.hasFn(OpenMaya.MFn.kUnitAttribute):
+        default = OpenMaya.MFnUnitAttribute(attribute).default
+        if isinstance(default, (OpenMaya.MAngle, OpenMaya.MDistance, OpenMaya.MTime)):
+            return default.asUnits(type(default).uiUnit())
+
+    elif attribute.hasFn(OpenMaya.MFn.kEnumAttribute):
+        return OpenMaya.MFnEnumAttribute(attribute).default
+
+    return None
+
+
+def capture_default_pose(transforms):
+    """
+        Read default values of keyable attributes, used as reference of delta pose
+
         :param
-            import_type(str): Type of file that is needed
+            transforms(list): Full path of transforms
+
+        :return
+            (dict): Default attribute values per transform
     """
-    if import_type == "Alembic":
-        file_path = get_filepath("Alembic", False, QtWidgets.QFileDialog.ExistingFile)
-        command = 'AbcImport - mode import "{0}";'.format(file_path)
-        mel.eval(command)
+    selection = OpenMaya.MSelectionList()
+    for transform in transforms:
+        selection.add(transform)
 
-    elif import_type == "FBX":
-        file_path = get_filepath("FBX", False, QtWidgets.QFileDialog.ExistingFile)
-        cmds.file(file_path, i=True, type="FBX", mergeNamespacesOnClash=True, namespace=":", options="fbx",
-                  importTimeRange="combine")
+    pose_data = dict()
+    for index, transform in enumerate(transforms):
+        value_data = dict()
+        for attr, plug in get_keyable_plugs(selection.getDependNode(index)):
+            value = get_plug_default(plug)
+            if value is not None:
+                value_data[attr] = value
+        pose_data[transform] = value_data
 
-    elif import_type == "Obj":
-        file_path = get_filepath("Obj", False, QtWidgets.QFileDialog.ExistingFile)
-        cmds.file(file_path, i=True, type="OBJ", mergeNamespacesOnClash=True, namespace=":", options="mo=1",
-                  importTimeRange="combine")
+    return pose_data
 
 
-def import_pose():
+def get_flat_pose_value(value):
     """
-        Import pose value from file
+        Get numbers of pose value, compound value comes as [(x, y, z)]
+
+        :param
+            value(bool, int, float, list): Value from pose data
+
+        :return
+            (list): Float values, None when value is not numeric
+    """
+    if isinstance(value, (bool, int, float)):
+        return [float(value)]
+    if isinstance(value, (list, tuple)):
+        flat_value = list()
+        for item in value:
+            item_value = get_flat_pose_value(item)
+            if item_value is None:
+                return None
+            flat_value.extend(item_value)
+        return flat_value
+    return None
+
+
+def is_same_value(value, reference, tolerance):
     """
-    file_path = get_filepath("Pose", False, QtWidgets.QFileDialog.ExistingFile)
+        Compare pose value with reference value, animated value is same when every frame matches
 
-    with open(file_path, "r") as in_file:
-        in_data = json.load(in_file)
+        :param
+            value(bool, int, float, list): Value from pose data
+            reference(bool, int, float, list): Value from reference pose
+            tolerance(float): Allowed difference
+
+        :return
+            (bool): True when value does not need to be stored
+    """
+    flat_value, flat_reference = get_flat_pose_value(value), get_flat_pose_value(reference)
+    if flat_value is None or flat_reference is None:
+        return value == reference
+
+    # Static reference is compared with every frame of animated value
+    if len(flat_reference) == 1:
+        flat_reference = flat_reference * len(flat_value)
+    if len(flat_value) != len(flat_reference):
+        return False
+    return all(abs(item - reference_item) <= tolerance for item, reference_item in zip(flat_value, flat_reference))
 
-    if in_data["data_trader"] != "Pose":
-        message_box("This file is not supported", QtWidgets.QMessageBox.Critical)
-        return
 
-    for obj in in_data.keys():
-        if obj == "data_trader":
+def get_pose_delta(pose_data, reference_data, tolerance=1e-4):
+    """
+        Keep only the attributes which differ from reference pose
+
+        :param
+            pose_data(dict): Captured pose data
+            reference_data(dict): Reference pose data
+            tolerance(float): Values closer than this to the reference are dropped
+
+        :return
+            (dict): Pose data with changed attributes
+    """
+    delta_data = dict((key, value) for key, value in pose_data.items() if key.startswith("data_trader"))
+    for node, values in pose_data.items():
+        if node.startswith("data_trader"):
             continue
 
-        if cmds.objExists(obj):
-            for attr, value in in_data[obj].items():
-                try:
-                    cmds.setAttr(obj + "." + attr, value)
-                except Exception:
-                    pass
+        reference_values = reference_data.get(node, dict())
+        changed = dict((attr, value) for attr, value in values.items()
+                       if attr not in reference_values or not is_same_value(value, reference_values[attr], tolerance))
+        if changed:
+            delta_data[node] = changed
 
+    return delta_data
 
-def shader_assign(obj, shader):
+
+def capture_pose_animation(transforms, frames):
     """
-        Assign shader to the object.
+        Sample keyable values of all transforms in time context, current time is not changed
 
         :param
-            obj(list): Objects which will get the shader.
-            shader(str): Name of the shader
+            transforms(list): Full path of transforms
+            frames(list): Frames to sample
+
+        :return
+            (dict): Value per frame for each attribute, single value when attribute is not animated
     """
-    for item in obj:
-        try:
-            current_shader = cmds.listConnections(item, type="shadingEngine")
+    anim_data = dict()
+    for _ in iter_capture_pose_animation(transforms, frames, anim_data):
+        pass
+    return anim_data
 
-            if current_shader:
-                cmds.sets(item, remove=current_shader)
 
-            cmds.sets(item, edit=True, forceElement=shader)
-        except Exception:
-            pass
+def check_nodes(handles, names):
+    """
+        Fail step export when a node is deleted while the export waits for the next idle event, plugs of
+        deleted node must not be read
 
+        :param
+            handles(list): OpenMaya.MObjectHandle of each node
+            names(list): Name of each node
+    """
+    for handle, name in zip(handles, names):
+        if not handle.isValid():
+            raise RuntimeError("Node is deleted during export: {0}".format(name))
 
-def import_shader():
-    file_path = get_filepath("Shader", False, QtWidgets.QFileDialog.Directory)
-    assign_data = os.path.join(file_path, "Assign_info.json").replace("\\", "/")
 
-    if not os.path.isfile(assign_data):
-        message_box("Json file is missing", QtWidgets.QMessageBox.Critical)
-        return
+def iter_capture_pose_animation(transforms, frames, anim_data):
+    """
+        Sample keyable values frame by frame, see capture_pose_animation
 
-    with open(assign_data, "r") as in_file:
-        in_data = json.load(in_file)
+        :param
+            transforms(list): Full path of transforms
+            frames(list): Frames to sample
+            anim_data(dict): Sampled values are added to it after the last frame
 
-    if in_data["data_trader"] != "Shader":
-        message_box("This file is not supported", QtWidgets.QMessageBox.Critical)
-        return
+        :return
+            (generator): Number of sampled frames
+    """
+    selection = OpenMaya.MSelectionList()
+    for transform in transforms:
+        selection.add(transform)
+
+    plug_data = list()
+    handles = list()
+    for index, transform in enumerate(transforms):
+        node = selection.getDependNode(index)
+        handles.append(OpenMaya.MObjectHandle(node))
+        for attr, plug in get_keyable_plugs(node):
+            plug_data.append((transform, attr, plug, list()))
+
+    for index, frame in enumerate(frames):
+        check_nodes(handles, transforms)
+        context = OpenMaya.MDGContext(OpenMaya.MTime(frame, OpenMaya.MTime.uiUnit()))
+
+        # makeCurrent is added in maya 2022, older versions take the context in the plug read
+        previous_context = context.makeCurrent() if hasattr(context, "makeCurrent") else None
+        plug_context = context if previous_context is None else None
+        try:
+            for transform, attr, plug, values in plug_data:
+                try:
+                    value = get_plug_value(plug, plug_context)
+                    if value is None:
+                        value = cmds.getAttr(transform + "." + attr, time=frame)
+                    values.append(value)
+                except Exception:
+                    pass
+        finally:
+            if previous_context is not None:
+                previous_context.makeCurrent()
+        yield index + 1
 
-    for shader in in_data.keys():
-        if shader == "data_trader":
+    for transform, attr, plug, values in plug_data:
+        if len(values) != len(frames):
             continue
 
-        if not cmds.objExists(shader):
-            tmp_name = shader.replace(":", "__") if ":" in shader else shader
-            shader_path = os.path.join(file_path, tmp_name + ".ma")
-            cmds.file(shader_path, i=True, type="mayaAscii", mergeNamespacesOnClash=True, namespace=":")
+        # Static channel does not need value for every frame
+        if all(value == values[0] for value in values):
+            values = values[0]
+        anim_data.setdefault(transform, dict())[attr] = values
+
 
-        shader_assign(in_data[shader], shader)
+def pose_export(obj, frame_number, file_path=None, anim_export=False, frame_range=None, reference=None,
+                tolerance=1e-4, use_cache=False):
+    """
+        Export pose data
+
+        :param
+            obj(str, list): Name of object, all objects of list go to one file
+            frame_number(int): Fame number which data will export
+            file_path(str): Output path, ask the user when it is not given, .dtpose writes binary pose file
+            anim_export(bool): export animation or static
+            frame_range(tuple): Start and end frame, playback range is used when it is not given
+            reference(str): "default" or pose file path, only attributes which differ from it are written
+            tolerance(float): Values closer than this to the reference are not written
+            use_cache(bool): Skip the export when nothing is changed since the last export to this path
+
+        :return
+            (bool): True when the export is skipped by cache
+    """
+    from . import export_cache
+
+    if not file_path:
+        file_path = get_filepath("Pose", True, QtWidgets.QFileDialog.AnyFile)
+
+    fingerprint = None
+    if use_cache:
+        # Reference file is part of the result
+        reference_time = os.path.getmtime(reference) if reference and os.path.isfile(reference) else None
+        options = {"frames": get_frame_range(frame_range) if anim_export else [frame_number], "anim": anim_export,
+                   "reference": [reference, reference_time], "tolerance": tolerance,
+                   "file": os.path.basename(file_path)}
+        fingerprint = export_cache.get_fingerprint(get_pose_transforms(obj), "Pose", options)
+        if export_cache.is_cached(file_path, fingerprint):
+            return True
+
+    for _ in iter_pose_export(obj, frame_number, file_path, anim_export, frame_range, reference, tolerance):
+        pass
+
+    export_cache.record(file_path, fingerprint)
+    return False
+
+
+def iter_pose_export(obj, frame_number, file_path, anim_export=False, frame_range=None, reference=None,
+                     tolerance=1e-4):
+    """
+        Export pose data step by step
+
+        :param
+            obj(str, list): Name of object, all objects of list go to one file
+            frame_number(int): Fame number which data will export
+            file_path(str): Output path
+            anim_export(bool): export animation or static
+            frame_range(tuple): Start and end frame, playback range is used when it is not given
+            reference(str): "default" or pose file path, only attributes which differ from it are written
+            tolerance(float): Values closer than this to the reference are not written
+
+        :return
+            (generator): Stage name, done and total count after each step
+    """
+    from . import pose_library, post_export
+
+    transforms = get_pose_transforms(obj)
+    anim_data = {"data_trader": "Pose"}
+
+    if anim_export:
+        frames = get_frames(frame_range)
+        anim_data["data_trader_frames"] = frames
+        for done in iter_capture_pose_animation(transforms, frames, anim_data):
+            yield "gather", done, len(frames)
+    else:
+        if frame_number:
+            cmds.currentTime(frame_number)
+        anim_data.update(capture_pose(transforms))
+        yield "gather", 1, 1
+
+    if reference:
+        if reference == "default":
+            reference_data = capture_default_pose(transforms)
+        else:
+            reference_data = pose_library.read_pose_file(reference)
+            if reference_data is None:
+                raise ValueError("Reference pose can not be read: {0}".format(reference))
+
+        anim_data = get_pose_delta(anim_data, reference_data, tolerance)
+        anim_data["data_trader_delta"] = {"reference": reference, "tolerance": tolerance}
+
+    if pose_format.is_binary_pose(file_path):
+        # Binary file would drop these values without a word, json pose file keeps all of them
+        unpackable = pose_format.get_unpackable(anim_data)
+        if unpackable:
+            raise ValueError("Values can not be written to {0} pose file, use .json: {1}{2}".format(
+                pose_format.EXTENSION, ", ".join(unpackable[:10]), " ..." if len(unpackable) > 10 else ""))
+        pose_format.write_pose(file_path, anim_data)
+    else:
+        with open(file_path, "w") as out_file:
+            json.dump(anim_data, out_file, indent=4)
+    yield "write", 1, 1
+
+    # Catalog is updated when the file is written into pose library
+    pose_library.update_catalog(file_path, anim_data)
+    post_export.submit(file_path)
+    yield "post", 1, 1
+
+
+def get_maya_ascii_hash(file_path):
+    """
+        Hash of maya ascii file without the header comments, they change on every save
+
+        :param
+            file_path(str): Maya ascii file path
+
+        :return
+            (str): Hex digest of the content
+    """
+    content_hash = hashlib.sha1()
+    with open(file_path, "rb") as in_file:
+        for line in in_file:
+            if not line.startswith(b"//"):
+                content_hash.update(line)
+    return content_hash.hexdigest()
+
+
+def export_shader_file(shaders, shader_path, previous_hash=None):
+    """
+        Export shading networks to a local temp file and copy it only when the content is changed
+
+        :param
+            shaders(list): Name of shading engines and their upstream nodes
+            shader_path(str): Output maya ascii path
+            previous_hash(str): Hash of the last export from the manifest
+
+        :return
+            (str): Hash of the exported content
+    """
+    handle, temp_path = tempfile.mkstemp(suffix=".ma", prefix="data_trader_")
+    os.close(handle)
+    try:
+        cmds.select(shaders, replace=True, noExpand=True)
+        cmds.file(temp_path, force=True, type="mayaAscii", exportSelected=True)
+        content_hash = get_maya_ascii_hash(temp_path)
+
+        if content_hash != previous_hash or not os.path.isfile(shader_path):
+            if os.path.isfile(shader_path):
+                os.remove(shader_path)
+            shutil.move(temp_path, shader_path)
+    finally:
+        if os.path.isfile(temp_path):
+            os.remove(temp_path)
+
+    return content_hash
+
+
+def encode_members(members):
+    """
+        Encode set members as merged index ranges per node
+
+        :param
+            members(list): Members from cmds.sets query like pCube1.f[0:5]
+
+        :return
+            (dict): Whole objects, ranges as flat start end list per node and component, members which are not parsed
+    """
+    encoded = {"objects": list(), "components": dict(), "raw": list()}
+    indices = dict()
+
+    for member in members or []:
+        match = COMPONENT_PATTERN.match(member)
+        if match:
+            node, component, start, end = match.groups()
+            indices.setdefault((node, component), list()).append((int(start), int(end or start)))
+        elif "." in member:
+            encoded["raw"].append(member)
+        else:
+            encoded["objects"].append(member)
+
+    for (node, component), ranges in indices.items():
+        merged = list()
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1] + 1:
+                merged[-1] = max(merged[-1], end)
+            else:
+                merged.extend([start, end])
+        encoded["components"].setdefault(node, dict())[component] = merged
+
+    return encoded
+
+
+def decode_members(encoded):
+    """
+        Decode members into range form component names for cmds.sets
+
+        :param
+            encoded(dict): Data from encode_members
+
+        :return
+            (list): Members like pCube1.f[0:5]
+    """
+    members = list(encoded.get("objects", []))
+    for node, components in encoded.get("components", {}).items():
+        for component, ranges in components.items():
+            for index in range(0, len(ranges), 2):
+                start, end = ranges[index], ranges[index + 1]
+                if start == end:
+                    members.append("{0}.{1}[{2}]".format(node, component, start))
+                else:
+                    members.append("{0}.{1}[{2}:{3}]".format(node, component, start, end))
+
+    members.extend(encoded.get("raw", []))
+    return members
+
+
+def write_assign_info(file_path, shader_data, compress=False):
+    """
+        Write shader assignment with range encoding and without indentation
+
+        :param
+            file_path(str): Shader directory
+            shader_data(dict): Members per shader
+            compress(bool): Write gzip compressed file
+    """
+    assign_data = {"data_trader_encoding": "ranges", "data_trader_version": ASSIGN_VERSION}
+    for shader, members in shader_data.items():
+        assign_data[shader] = members if shader.startswith("data_trader") else encode_members(members)
+
+    json_file = os.path.join(file_path, ASSIGN_INFO)
+    content = json.dumps(assign_data, separators=(",", ":")).encode("utf-8")
+    if compress:
+        with gzip.open(json_file + ".gz", "wb") as out_file:
+            out_file.write(content)
+    else:
+        with open(json_file, "wb") as out_file:
+            out_file.write(content)
+
+    # Old file in other format must not be picked on import
+    old_file = json_file if compress else json_file + ".gz"
+    if os.path.isfile(old_file):
+        os.remove(old_file)
+
+
+def read_assign_info(file_path):
+    """
+        Read shader assignment, plain and compressed files with or without range encoding
+
+        :param
+            file_path(str): Shader directory
+
+        :return
+            (dict): Members per shader and file version, None when file is missing
+    """
+    json_file = os.path.join(file_path, ASSIGN_INFO)
+    # Gzip left by an older export must not win over the json written after it
+    if os.path.isfile(json_file + ".gz") and \
+            (not os.path.isfile(json_file) or os.path.getmtime(json_file + ".gz") >= os.path.getmtime(json_file)):
+        with gzip.open(json_file + ".gz", "rb") as in_file:
+            in_data = json.loads(in_file.read().decode("utf-8"))
+    elif os.path.isfile(json_file):
+        with open(json_file, "r") as in_file:
+            in_data = json.load(in_file)
+    else:
+        return None
+
+    if in_data.pop("data_trader_encoding", None) == "ranges":
+        for shader, members in in_data.items():
+            if not shader.startswith("data_trader"):
+                in_data[shader] = decode_members(members)
+
+    # Files of older exports have members of the whole scene
+    in_data.setdefault("data_trader_version", 1)
+    return in_data
+
+
+def get_shader_network(meshes):
+    """
+        Find shading engines of the meshes and upstream network of each engine in one pass, the graph is
+        queried once per level of the network for all the nodes of the level, not per mesh or engine
+
+        :param
+            meshes(list): Full path of meshes
+
+        :return
+            (dict): Members and upstream nodes per engine, engines per member node, nodes used by many engines
+    """
+    network = {"engines": dict(), "meshes": dict(), "shared": list()}
+    if not meshes:
+        return network
+
+    engines = sorted(set(cmds.listConnections(meshes, type="shadingEngine") or []))
+    parents = cmds.listRelatives(meshes, parent=True, fullPath=True) or []
+    names = set(cmds.ls(meshes + parents) or [])
+
+    # Set query gives members of the whole scene, other objects are left out, see ASSIGN_VERSION
+    for engine in engines:
+        members = [member for member in cmds.sets(engine, query=True) or [] if member.split(".")[0] in names]
+        network["engines"][engine] = {"members": members, "network": list()}
+        for member in members:
+            network["meshes"].setdefault(member.split(".")[0], list()).append(engine)
+
+    # Geometry and set membership connections are not part of the shading network
+    sources = dict()
+    visited = set(engines)
+    frontier = engines
+    while frontier:
+        connections = cmds.listConnections(frontier, source=True, destination=False, connections=True) or []
+        pairs = [(plug.split(".")[0], source) for plug, source in zip(connections[0::2], connections[1::2])
+                 if plug.split(".", 1)[1].split("[")[0] not in SET_MEMBER_ATTRIBUTES]
+
+        new_nodes = set(source for node, source in pairs) - visited
+        geometry = set(cmds.ls(list(new_nodes), shapes=True) or []) if new_nodes else set()
+        for node, source in pairs:
+            if source not in geometry:
+                sources.setdefault(node, set()).add(source)
+
+        visited.update(new_nodes)
+        frontier = sorted(new_nodes - geometry)
+
+    users = dict()
+    for engine in engines:
+        upstream = set()
+        stack = list(sources.get(engine, []))
+        while stack:
+            node = stack.pop()
+            if node not in upstream:
+                upstream.add(node)
+                stack.extend(sources.get(node, []))
+        upstream.discard(engine)
+
+        network["engines"][engine]["network"] = sorted(upstream)
+        for node in upstream:
+            users[node] = users.get(node, 0) + 1
+
+    network["shared"] = sorted(node for node, count in users.items() if count > 1)
+    return network
+
+
+def shader_export(obj, file_path=None, bundle=False, compress=False):
+    """
+        Export shader data
+
+        :param
+            obj(str): Name of object
+            file_path(str): Output directory, ask the user when it is not given
+            bundle(bool): Write all the shading networks into one maya file
+            compress(bool): Write gzip compressed assignment file
+
+        :return
+            (dict): Written, skipped and failed shaders and network nodes shared by many shaders
+    """
+    if not file_path:
+        file_path = get_filepath("Shader", True, QtWidgets.QFileDialog.Directory)
+
+    export_info = dict()
+    for _ in iter_shader_export(obj, file_path, export_info, bundle, compress):
+        pass
+    return export_info
+
+
+def get_shader_folder(obj, file_path):
+    """
+        :param
+            obj(str): Name of object
+            file_path(str): Output directory
+
+        :return
+            (str): Folder which shader export writes for the object
+    """
+    # Name should not contain : so replace them with __
+    tmp_name = obj.split("|")[-1]
+    tmp_name = tmp_name.replace(":", "__") if ":" in tmp_name else tmp_name
+    return os.path.join(file_path, tmp_name).replace("\\", "/")
+
+
+def iter_shader_export(obj, file_path, export_info, bundle=False, compress=False):
+    """
+        Export shader data step by step
+
+        :param
+            obj(str): Name of object
+            file_path(str): Output directory
+            export_info(dict): Written, skipped, failed shaders and shared network nodes are added to it
+            bundle(bool): Write all the shading networks into one maya file
+            compress(bool): Write gzip compressed assignment file
+
+        :return
+            (generator): Stage name, done and total count after each step
+    """
+    from . import post_export
+
+    # Create folder for the selected object
+    file_path = get_shader_folder(obj, file_path)
+
+    if not os.path.exists(file_path):
+        os.makedirs(file_path)
+
+    meshes = cmds.listRelatives(obj, allDescendents=True, type="mesh", fullPath=True) or []
+
+    # Members and upstream nodes of all the engines, shared nodes are listed once
+    network = get_shader_network(meshes)
+
+    manifest_file = os.path.join(file_path, SHADER_MANIFEST)
+    manifest = dict()
+    if os.path.isfile(manifest_file):
+        with open(manifest_file, "r") as in_file:
+            manifest = json.load(in_file)
+
+    shader_data = {"data_trader": "Shader"}
+    export_info.update({"written": list(), "skipped": list(), "failed": list(), "shared": network["shared"]})
+    for shader, info in network["engines"].items():
+        shader_data[shader] = info["members"]
+    shaders = sorted(shader for shader in network["engines"] if shader != "initialShadingGroup")
+
+    def get_export_nodes(export_shaders):
+        nodes = set()
+        for shader in export_shaders:
+            nodes.update(network["engines"][shader]["network"])
+        return export_shaders + sorted(nodes)
+
+    # Each item is manifest key, shading engines and output file
+    if bundle:
+        shader_data["data_trader_bundle"] = SHADER_BUNDLE
+        export_items = [("data_trader_bundle", shaders, os.path.join(file_path, SHADER_BUNDLE))] if shaders else []
+    else:
+        export_items = list()
+        for shader in shaders:
+            tmp_name = shader.replace(":", "__") if ":" in shader else shader
+            export_items.append((shader, [shader], os.path.join(file_path, tmp_name + ".ma")))
+    yield "gather", 0, len(export_items)
+
+    for done, (key, export_shaders, shader_path) in enumerate(export_items):
+        try:
+            content_hash = export_shader_file(get_export_nodes(export_shaders), shader_path, manifest.get(key))
+        except Exception:
+            export_info["failed"].extend(export_shaders)
+            yield "write", done + 1, len(export_items)
+            continue
+
+        if manifest.get(key) == content_hash:
+            export_info["skipped"].extend(export_shaders)
+        else:
+            export_info["written"].extend(export_shaders)
+        manifest[key] = content_hash
+        yield "write", done + 1, len(export_items)
+
+    write_assign_info(file_path, shader_data, compress)
+
+    with open(manifest_file, "w") as out_file:
+        json.dump(manifest, out_file, indent=4)
+
+    post_export.submit(file_path)
+    yield "post", len(export_items), len(export_items)
+
+
+def get_scene_name():
+    return cmds.file(query=True, sceneName=True) or "untitled"
+
+
+def get_batch_output(file_path, template, root, export_type, frame_number=None, scene=None):
+    """
+        Build output file path from name template
+
+        :param
+            file_path(str): Output directory
+            template(str): Output file name with {scene}, {root}, {type} and {frame} tokens
+            root(str): Name of root object
+            export_type(str): Type of export
+            frame_number(int): Frame number which data will export
+            scene(str): Scene file path, it is queried when it is not given, pass it when naming many roots
+
+        :return
+            (str): Output file path with extension
+    """
+    # Batch module brings subprocess, socket and multiprocessing, only export needs them
+    from . import batch_export
+
+    if scene is None:
+        scene = get_scene_name()
+    name = batch_export.format_output(template, scene, root, export_type, frame_number)
+    return os.path.join(file_path, name + EXPORT_EXTENSIONS[export_type]).replace("\\", "/")
+
+
+def export_batch(objs, export_type, anim_export, frame_number=None, file_path=None, template="{scene}_{root}",
+                 pose_reference=None):
+    """
+        Export many objects in one pass, alembic writes a file per object with single AbcExport call,
+        FBX, Obj and Pose write all the objects to one file and shader writes a folder per object
+
+        :param
+            objs(list): Name of objects
+            export_type(str): Type of export
+            anim_export(bool): export animation or static
+            frame_number(int): Frame number which data will export
+            file_path(str): Output directory, ask the user when it is not given
+            template(str): Output file name with {scene}, {root}, {type} and {frame} tokens
+            pose_reference(str): "default" or pose file path to write delta pose
+
+        :return
+            (list): Exported file paths
+    """
+    if not file_path:
+        file_path = get_filepath(export_type, True, QtWidgets.QFileDialog.Directory)
+    if not file_path:
+        return list()
+
+    scene = get_scene_name()
+
+    def get_output(root):
+        return get_batch_output(file_path, template, root, export_type, frame_number, scene)
+
+    if export_type == "Alembic":
+        outputs = [get_output(obj) for obj in objs]
+        alembic_export_batch(objs, outputs, anim_export, frame_number)
+    elif export_type == "Shader":
+        outputs = list()
+        for obj in objs:
+            shader_export(obj, file_path)
+            outputs.append(get_shader_folder(obj, file_path))
+    else:
+        outputs = [get_output("batch")]
+        if export_type == "FBX":
+            fbx_export(objs, outputs[0])
+        elif export_type == "Obj":
+            obj_export(objs, frame_number, outputs[0], anim_export)
+        elif export_type == "Pose":
+            pose_export(objs, frame_number, outputs[0], anim_export, reference=pose_reference)
+
+    return outputs
+
+
+"""Export Code Block End"""
+"""Import Code Block Start"""
+
+
+def import_file(import_type):
+    """
+        Import file like obj, fbx, abc
+        :param
+            import_type(str): Type of file that is needed
+    """
+    file_path = get_filepath(import_type, False, QtWidgets.QFileDialog.ExistingFile)
+    if file_path:
+        import_path(file_path, import_type)
+
+
+def import_path(file_path, import_type):
+    """
+        Import file without dialog
+
+        :param
+            file_path(str): File path
+            import_type(str): Alembic, FBX or Obj
+    """
+    if import_type == "Alembic":
+        load_plugin("AbcImport")
+        mel.eval('AbcImport -mode import "{0}";'.format(file_path.replace("\\", "/")))
+
+    elif import_type == "FBX":
+        load_plugin("fbxmaya")
+        cmds.file(file_path, i=True, type="FBX", mergeNamespacesOnClash=True, namespace=":", options="fbx",
+                  importTimeRange="combine")
+
+    elif import_type == "Obj":
+        load_plugin("objExport")
+        cmds.file(file_path, i=True, type="OBJ", mergeNamespacesOnClash=True, namespace=":", options="mo=1",
+                  importTimeRange="combine")
+
+
+def validate_import_file(file_path):
+    """
+        Check that the file is the type its extension says, only the start of the file is read
+
+        :param
+            file_path(str): File path
+
+        :return
+            (dict): File, type, size and error, error is None for valid file
+    """
+    import_type = IMPORT_TYPES.get(os.path.splitext(file_path)[1].lower())
+    info = {"file": file_path, "type": import_type, "size": 0, "error": None}
+    if import_type is None:
+        info["error"] = "Extension is not supported"
+        return info
+
+    try:
+        info["size"] = os.path.getsize(file_path)
+        with open(file_path, "rb") as in_file:
+            header = in_file.read(4096)
+    except (IOError, OSError) as error:
+        info["error"] = str(error)
+        return info
+
+    if not header:
+        info["error"] = "File is empty"
+    elif import_type == "Alembic" and not header.startswith((b"Ogawa", b"\x89HDF\r\n\x1a\n")):
+        info["error"] = "Not an alembic archive"
+    elif import_type == "FBX" and not header.startswith(b"Kaydara FBX Binary") and \
+            not header.lstrip().startswith((b";", b"FBXHeaderExtension")):
+        info["error"] = "Not a fbx file"
+    elif import_type == "Obj":
+        # Last line can be cut by the read size
+        lines = header.splitlines()[:-1] if len(header) == 4096 else header.splitlines()
+        words = [line.split()[0].decode("ascii", "replace") for line in lines if line.strip()]
+        if b"\x00" in header or not any(word.startswith("#") or word in OBJ_KEYWORDS for word in words) or \
+                not all(word.startswith("#") or word.replace("_", "").isalpha() for word in words):
+            info["error"] = "Not an obj file"
+    return info
+
+
+def import_batch(paths, workers=8, undo="off"):
+    """
+        Import many caches back to back, files are validated in parallel first and imported with
+        viewport refresh suspended and evaluation manager in DG mode
+
+        :param
+            paths(str, list): Directory or list of files
+            workers(int): Number of threads for validation
+            undo(str): "off" to disable undo while importing, "chunk" to undo the whole import at once
+
+        :return
+            (dict): Timing and error of every file
+    """
+    if not isinstance(paths, (list, tuple)):
+        paths = [os.path.join(paths, name) for name in sorted(os.listdir(paths))
+                 if os.path.splitext(name)[1].lower() in IMPORT_TYPES]
+
+    start = time.time()
+    pool = ThreadPool(max(1, min(workers, len(paths))))
+    try:
+        files = pool.map(validate_import_file, paths)
+    finally:
+        pool.close()
+    report = {"files": files, "validate_time": time.time() - start}
+
+    start = time.time()
+    evaluation_mode = cmds.evaluationManager(query=True, mode=True)[0]
+    undo_state = cmds.undoInfo(query=True, state=True)
+    if undo == "chunk":
+        cmds.undoInfo(openChunk=True, chunkName="data_trader_import_batch")
+    else:
+        cmds.undoInfo(stateWithoutFlush=False)
+    cmds.refresh(suspend=True)
+    cmds.evaluationManager(mode="off")
+    try:
+        for info in files:
+            info["time"] = 0.0
+            if info["error"]:
+                info["status"] = "invalid"
+                continue
+
+            file_start = time.time()
+            try:
+                import_path(info["file"], info["type"])
+                info["status"] = "ok"
+            except Exception as error:
+                info["status"] = "failed"
+                info["error"] = str(error)
+            info["time"] = time.time() - file_start
+    finally:
+        # Graph of the parallel evaluation is built once for all the imported nodes
+        cmds.evaluationManager(mode=evaluation_mode)
+        cmds.refresh(suspend=False)
+        if undo == "chunk":
+            cmds.undoInfo(closeChunk=True)
+        else:
+            cmds.undoInfo(stateWithoutFlush=undo_state)
+
+    report["import_time"] = time.time() - start
+    for status in ("ok", "failed", "invalid"):
+        report[status] = len([info for info in files if info["status"] == status])
+    return report
+
+
+def set_plug_keys(plug_name, frames, values):
+    """
+        Write all keys of attribute with one setAttr on the key list of new anim curve, every command is
+        undoable so the keys are part of the open undo chunk
+
+        :param
+            plug_name(str): Name of plug like node.attribute
+            frames(list): Key frames
+            values(list): Value for each frame in ui unit
+    """
+    selection = OpenMaya.MSelectionList()
+    selection.add(plug_name)
+    plug = selection.getPlug(0)
+    if plug.isLocked or not frames:
+        return
+
+    curve_type = "animCurveTU"
+    attribute = plug.attribute()
+    if attribute.hasFn(OpenMaya.MFn.kUnitAttribute):
+        unit_type = OpenMaya.MFnUnitAttribute(attribute).unitType()
+        if unit_type == OpenMaya.MFnUnitAttribute.kAngle:
+            curve_type = "animCurveTA"
+        elif unit_type == OpenMaya.MFnUnitAttribute.kDistance:
+            curve_type = "animCurveTL"
+        elif unit_type == OpenMaya.MFnUnitAttribute.kTime:
+            curve_type = "animCurveTT"
+
+    # Old keys are replaced, curve is deleted with its keys
+    if cmds.listConnections(plug_name, source=True, destination=False, type="animCurve"):
+        cmds.cutKey(plug_name, clear=True)
+
+    # Key list takes time and value in ui unit like maya ascii file
+    node_name, attr = plug_name.rsplit(".", 1)
+    curve = cmds.createNode(curve_type, name="{0}_{1}".format(node_name.rsplit("|", 1)[-1].replace(":", "_"), attr))
+    key_values = list()
+    for frame, value in zip(frames, values):
+        key_values.extend([frame, float(value)])
+    cmds.setAttr("{0}.ktv[0:{1}]".format(curve, len(frames) - 1), *key_values)
+    cmds.connectAttr(curve + ".output", plug_name, force=True)
+
+
+def remap_namespace(name, namespace_map):
+    """
+        Replace namespaces of every path component
+
+        :param
+            name(str): Node name or full path
+            namespace_map(dict): Old namespace to new namespace, "" key is used for nodes without namespace
+
+        :return
+            (str): Node name with new namespaces
+    """
+    parts = list()
+    for part in name.split("|"):
+        if ":" in part:
+            namespace, leaf = part.rsplit(":", 1)
+            namespace = namespace_map.get(namespace, namespace)
+        else:
+            namespace, leaf = namespace_map.get("", ""), part
+
+        parts.append(namespace + ":" + leaf if namespace and leaf else leaf)
+    return "|".join(parts)
+
+
+def is_compound_value(value):
+    """
+        :param
+            value(bool, int, float, list): Value from pose data
+
+        :return
+            (bool): True for compound value which comes as [(x, y, z)] from getAttr
+    """
+    return isinstance(value, (list, tuple)) and len(value) == 1 and isinstance(value[0], (list, tuple)) and \
+        all(isinstance(item, (bool, int, float)) for item in value[0])
+
+
+def get_key_kind(value, frames):
+    """
+        Tell key data from static value by the frame count and the type of the items, static compound value
+        of one frame pose has as many items as the frames too
+
+        :param
+            value(bool, int, float, list): Value from pose data
+            frames(list): Frames of animated pose
+
+        :return
+            (str): "keys" for number per frame, "compound" for compound value per frame, None for static value
+    """
+    if not frames or not isinstance(value, list) or len(value) != len(frames):
+        return None
+    if all(isinstance(item, (bool, int, float)) for item in value):
+        return "keys"
+    if all(is_compound_value(item) for item in value):
+        return "compound"
+    return None
+
+
+def get_child_keys(node_name, plug, values):
+    """
+        Split keys of compound plug to keys of its children
+
+        :param
+            node_name(str): Node name
+            plug(OpenMaya.MPlug): Compound plug
+            values(list): Compound value for each frame
+
+        :return
+            (list): Child plug name and its values, None when the values do not match the children
+    """
+    if not plug.isCompound or plug.numChildren() != len(values[0][0]):
+        return None
+
+    child_keys = list()
+    for index in range(plug.numChildren()):
+        child_name = node_name + "." + plug.child(index).partialName(useLongNames=True)
+        child_keys.append((child_name, [value[0][index] for value in values]))
+    return child_keys
+
+
+def build_pose_plan(pose_data, namespace_map=None, tolerance=1e-6):
+    """
+        Resolve pose data against the scene before anything is changed
+
+        :param
+            pose_data(dict): Loaded pose file data
+            namespace_map(dict): Old namespace to new namespace
+            tolerance(float): Values closer than this to the current value are skipped
+
+        :return
+            (dict): Plan with attributes to set, keys to write and skipped items, animated compounds which
+                    can not be split to their children are in unsupported
+    """
+    frames = pose_data.get("data_trader_frames")
+    plan = {"set": list(), "keys": list(), "frames": frames, "missing": list(), "locked": list(),
+            "unsupported": list(), "unchanged": 0}
+
+    for obj, values in pose_data.items():
+        if obj.startswith("data_trader"):
+            continue
+
+        node_name = remap_namespace(obj, namespace_map) if namespace_map else obj
+        selection = OpenMaya.MSelectionList()
+        try:
+            selection.add(node_name)
+        except RuntimeError:
+            plan["missing"].append(node_name)
+            continue
+        fn_node = OpenMaya.MFnDependencyNode(selection.getDependNode(0))
+
+        for attr, value in values.items():
+            plug_name = node_name + "." + attr
+            try:
+                plug = fn_node.findPlug(attr, False)
+            except RuntimeError:
+                plan["missing"].append(plug_name)
+                continue
+
+            if plug.isLocked:
+                plan["locked"].append(plug_name)
+                continue
+
+            key_kind = get_key_kind(value, frames)
+            if key_kind == "keys":
+                plan["keys"].append((plug_name, value))
+                continue
+            elif key_kind == "compound":
+                child_keys = get_child_keys(node_name, plug, value)
+                if child_keys is None:
+                    plan["unsupported"].append(plug_name)
+                else:
+                    plan["keys"].extend(child_keys)
+                continue
+
+            current_value = get_plug_value(plug)
+            if current_value is not None and not isinstance(value, list) and \
+                    abs(float(current_value) - float(value)) <= tolerance:
+                plan["unchanged"] += 1
+                continue
+
+            plan["set"].append((plug_name, value))
+
+    return plan
+
+
+def apply_pose_plan(plan):
+    """
+        Apply resolved pose plan as single undo step with viewport refresh suspended
+
+        :param
+            plan(dict): Plan from build_pose_plan
+
+        :return
+            (list): Plugs which could not be set, unsupported plugs of the plan are included
+    """
+    failed = list(plan.get("unsupported", []))
+    cmds.undoInfo(openChunk=True, chunkName="data_trader_import_pose")
+    cmds.refresh(suspend=True)
+    try:
+        for plug_name, value in plan["set"]:
+            try:
+                # Compound value comes as [(x, y, z)] from getAttr
+                if isinstance(value, list) and value and isinstance(value[0], (list, tuple)):
+                    cmds.setAttr(plug_name, *value[0])
+                else:
+                    cmds.setAttr(plug_name, value)
+            except Exception:
+                failed.append(plug_name)
+
+        for plug_name, values in plan["keys"]:
+            try:
+                set_plug_keys(plug_name, plan["frames"], values)
+            except Exception:
+                failed.append(plug_name)
+    finally:
+        cmds.refresh(suspend=False)
+        cmds.undoInfo(closeChunk=True)
+
+    return failed
+
+
+def import_pose(file_path=None, namespace_map=None):
+    """
+        Import pose value from file
+
+        :param
+            file_path(str): Pose file path, ask the user when it is not given, json or binary pose file
+            namespace_map(dict): Old namespace to new namespace
+
+        :return
+            (dict): Applied plan with the failed plugs
+    """
+    if not file_path:
+        file_path = get_filepath("Pose", False, QtWidgets.QFileDialog.ExistingFile)
+
+    if pose_format.is_binary_pose(file_path):
+        in_data = pose_format.read_pose(file_path)
+    else:
+        with open(file_path, "r") as in_file:
+            in_data = json.load(in_file)
+
+    if in_data["data_trader"] != "Pose":
+        message_box("This file is not supported", QtWidgets.QMessageBox.Critical)
+        return
+
+    plan = build_pose_plan(in_data, namespace_map)
+    plan["failed"] = apply_pose_plan(plan)
+    return plan
+
+
+def shader_assign(obj, shader):
+    """
+        Assign shader to all the objects with one forceElement call.
+        forceElement removes the members from their current shading engine.
+
+        :param
+            obj(list): Objects which will get the shader.
+            shader(str): Name of the shader
+
+        :return
+            (dict): Number of assigned members and the members which could not be resolved
+    """
+    members = obj or []
+    assign_info = {"assigned": 0, "unresolved": list()}
+
+    if not cmds.objExists(shader):
+        assign_info["unresolved"] = list(members)
+        return assign_info
+
+    # Existence is checked once per node, not per component
+    nodes = set(member.split(".")[0] for member in members)
+    existing = set(node for node in nodes if cmds.objExists(node))
+
+    current = set(cmds.sets(shader, query=True) or [])
+    to_assign = list()
+    for member in members:
+        if member.split(".")[0] not in existing:
+            assign_info["unresolved"].append(member)
+        elif member not in current:
+            to_assign.append(member)
+
+    if not to_assign:
+        return assign_info
+
+    try:
+        cmds.sets(to_assign, edit=True, forceElement=shader)
+        assign_info["assigned"] = len(to_assign)
+    except Exception:
+        # Find the member which break the batch
+        for member in to_assign:
+            try:
+                cmds.sets(member, edit=True, forceElement=shader)
+                assign_info["assigned"] += 1
+            except Exception:
+                assign_info["unresolved"].append(member)
+
+    return assign_info
+
+
+def import_shader_bundle(bundle_path, shaders):
+    """
+        Import the shaders which are missing in the scene from bundle file with single import
+
+        :param
+            bundle_path(str): Shader bundle maya file
+            shaders(list): Name of shading engines
+    """
+    missing = set(shader for shader in shaders if not cmds.objExists(shader))
+    if not missing or not os.path.isfile(bundle_path):
+        return
+
+    namespace = "data_trader_bundle"
+    index = 1
+    while cmds.namespace(exists=namespace):
+        namespace = "data_trader_bundle{0}".format(index)
+        index += 1
+
+    cmds.file(bundle_path, i=True, type="mayaAscii", namespace=namespace)
+
+    # Remove the networks which are already in the scene, nodes shared with missing network stay
+    keep = set()
+    for shader in missing:
+        if cmds.objExists(namespace + ":" + shader):
+            keep.update(cmds.listHistory(namespace + ":" + shader, pruneDagObjects=True) or [])
+
+    remove = set()
+    for shader in shaders:
+        if shader not in missing and cmds.objExists(namespace + ":" + shader):
+            duplicate = namespace + ":" + shader
+            remove.update(cmds.listHistory(duplicate, pruneDagObjects=True) or [])
+            remove.update(cmds.listConnections(duplicate, type="materialInfo") or [])
+
+    remove = [node for node in remove - keep if cmds.objExists(node)]
+    if remove:
+        cmds.delete(remove)
+
+    cmds.namespace(moveNamespace=(namespace, ":"), force=True)
+    cmds.namespace(removeNamespace=namespace)
+
+
+def import_shader(file_path=None):
+    """
+        Import shaders and assign them to the objects
+
+        :param
+            file_path(str): Shader directory, ask the user when it is not given
+
+        :return
+            (dict): Members which could not be resolved per shader
+    """
+    if not file_path:
+        file_path = get_filepath("Shader", False, QtWidgets.QFileDialog.Directory)
+    in_data = read_assign_info(file_path)
+
+    if in_data is None:
+        message_box("Json file is missing", QtWidgets.QMessageBox.Critical)
+        return
+
+    if in_data["data_trader"] != "Shader":
+        message_box("This file is not supported", QtWidgets.QMessageBox.Critical)
+        return
+
+    shaders = [shader for shader in in_data.keys() if not shader.startswith("data_trader")]
+    if in_data.get("data_trader_bundle"):
+        import_shader_bundle(os.path.join(file_path, in_data["data_trader_bundle"]), shaders)
+
+    unresolved = dict()
+    for shader in shaders:
+        if not cmds.objExists(shader):
+            tmp_name = shader.replace(":", "__") if ":" in shader else shader
+            shader_path = os.path.join(file_path, tmp_name + ".ma")
+            if os.path.isfile(shader_path):
+                cmds.file(shader_path, i=True, type="mayaAscii", mergeNamespacesOnClash=True, namespace=":")
+
+        assign_info = shader_assign(in_data[shader], shader)
+        if assign_info["unresolved"]:
+            unresolved[shader] = assign_info["unresolved"]
+
+    if unresolved:
+        count = sum(len(members) for members in unresolved.values())
+        message = "{0} members of {1} shaders could not be assigned".format(count, len(unresolved))
+        if in_data["data_trader_version"] < ASSIGN_VERSION:
+            message += ", file of older export lists the members of every object in its scene"
+        message_box(message, QtWidgets.QMessageBox.Warning)
+    return unresolved
 
 
 """Import Code Block End"""